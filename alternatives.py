@@ -0,0 +1,221 @@
+"""
+Alternatives - Plato (plateau) yöntemiyle alternatif rotalar
+CENG 3511 - Artificial Intelligence Final Project
+
+Kaynaktan ileri, hedeften geri iki arama ağacı kurulur; her ikisi de
+en iyi mesafenin (1 + esneme) katıyla sınırlıdır. Bir v düğümü
+üzerinden geçen aday yol, kaynak -> v (ileri ağaç) ve v -> hedef (geri
+ağaç) parçalarından oluşur. İki ağacın ortak kenar zincirleri (platolar)
+yerel olarak en kısa olan bölümlerdir; uzun plato = doğal bir
+alternatif. Tüm adaylar aynı iki ağaçtan çıkarılır (Yen gibi yol
+başına yeni arama yapılmaz).
+
+Adaylar süzülür:
+    - döngüsüz: kaynak -> v ve v -> hedef parçaları ortak düğüm içermez
+    - esneme: mesafe <= en iyi mesafe * max_stretch
+    - yerel en iyilik: plato uzunluğu >= en iyi mesafe * MIN_PLATEAU
+    - örtüşme: daha önce seçilen rotalarla ortak uzunluk <= mesafe * max_overlap
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+from dijkstra import Graph, build_path_result
+
+# Tek istekte en fazla alternatif sayısı
+MAX_ALTERNATIVES = 5
+
+# Alternatif en fazla bu kadar kat uzun olabilir
+DEFAULT_MAX_STRETCH = 1.25
+
+# Seçilmiş rotalarla en fazla ortak uzunluk oranı
+DEFAULT_MAX_OVERLAP = 0.7
+
+# Plato en az en iyi mesafenin bu oranı kadar olmalı (yerel en iyilik)
+MIN_PLATEAU = 0.2
+
+# Alternatif aramasının süre sınırı (saniye); aşılırsa bulunanlar döner
+DEFAULT_TIME_LIMIT = 0.5
+
+# Süre kontrolü her bu kadar düğümde bir yapılır
+_DEADLINE_CHECK_INTERVAL = 256
+
+
+def _search_tree(offsets, neighbors, weights, source: int, budget: float,
+                 deadline: float, stats: Dict) -> Optional[Tuple[Dict[int, float], Dict[int, int]]]:
+    """
+    Mesafe bütçesiyle sınırlı en kısa yol ağacı
+
+    Returns:
+        (mesafeler, önceki düğümler) veya süre aşıldıysa None
+    """
+    inf = float('inf')
+    distances = {source: 0}
+    previous = {source: -1}
+    settled = set()
+    pq = [(0, source)]
+    pushed = 1
+
+    while pq:
+        current_distance, current = heapq.heappop(pq)
+        if current in settled:
+            continue
+        settled.add(current)
+        if len(settled) % _DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            return None
+
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[k]
+            new_distance = current_distance + weights[k]
+            if new_distance <= budget and new_distance < distances.get(neighbor, inf):
+                distances[neighbor] = new_distance
+                previous[neighbor] = current
+                heapq.heappush(pq, (new_distance, neighbor))
+                pushed += 1
+
+    stats['settled'] = stats.get('settled', 0) + len(settled)
+    stats['pushed'] = stats.get('pushed', 0) + pushed
+    return distances, previous
+
+
+def _plateaus(forward: Dict[int, float], previous: Dict[int, int],
+              backward: Dict[int, float], following: Dict[int, int]) -> List[Tuple[float, int]]:
+    """
+    İki ağacın ortak kenar zincirleri
+
+    u -> v kenarı ileri ağaçta (previous[v] == u) ve geri ağaçta
+    (following[u] == v) ise platodadır. Zincirler ayrıktır; her biri
+    sonundan geriye bir kez yürünür.
+
+    Returns:
+        [(plato uzunluğu, platodaki bir düğüm), ...]
+    """
+    def on_plateau(u: int, v: int) -> bool:
+        return u >= 0 and v >= 0 and previous.get(v) == u and following.get(u) == v
+
+    plateaus = []
+    for v in forward:
+        if v not in backward or not on_plateau(previous[v], v):
+            continue
+        # Sadece zincir sonlarından başlanır
+        if on_plateau(v, following[v]):
+            continue
+        start = v
+        while on_plateau(previous[start], start):
+            start = previous[start]
+        plateaus.append((forward[v] - forward[start], v))
+
+    return plateaus
+
+
+def _via_path(via: int, previous: Dict[int, int], following: Dict[int, int]) -> List[int]:
+    """kaynak -> via (ileri ağaç) + via -> hedef (geri ağaç)"""
+    path = []
+    current = via
+    while current != -1:
+        path.append(current)
+        current = previous[current]
+    path.reverse()
+
+    current = following[via]
+    while current != -1:
+        path.append(current)
+        current = following[current]
+    return path
+
+
+def _edge_lengths(graph: Graph, path: List[int]) -> Dict[Tuple[int, int], float]:
+    """Yoldaki kenarlar -> ağırlık (paralel kenarlarda en kısası)"""
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    edges = {}
+    for u, v in zip(path, path[1:]):
+        edges[(u, v)] = min(weights[k] for k in range(offsets[u], offsets[u + 1]) if targets[k] == v)
+    return edges
+
+
+def alternative_routes(graph: Graph, source: int, target: int, primary_path: List[int],
+                       primary_distance: float, count: int,
+                       max_stretch: float = DEFAULT_MAX_STRETCH,
+                       max_overlap: float = DEFAULT_MAX_OVERLAP,
+                       time_limit: float = DEFAULT_TIME_LIMIT,
+                       stats: Optional[Dict] = None) -> Tuple[List[Dict], bool]:
+    """
+    En iyi rotanın yanında en fazla count farklı alternatif bulur
+
+    Args:
+        source, target: Düğüm indeksleri
+        primary_path: En iyi rotanın indeks yolu (örtüşme buna göre de ölçülür)
+        primary_distance: En iyi rotanın mesafesi
+        count: İstenen alternatif sayısı
+        max_stretch: Mesafe üst sınırı (en iyi mesafenin katı)
+        max_overlap: Seçilmiş rotalarla en fazla ortak uzunluk oranı
+        time_limit: Süre sınırı (saniye)
+        stats: Verilirse iki ağacın 'settled' ve 'pushed' toplamları yazılır
+
+    Returns:
+        (alternatifler, tamamlandı mı) - her alternatif build_path_result
+        çıktısı + 'stretch' ve 'overlap'; süre aşılırsa o ana kadar
+        seçilenler ve False döner
+    """
+    deadline = time.perf_counter() + time_limit
+    if stats is None:
+        stats = {}
+    if count <= 0 or source == target or not primary_distance:
+        return [], True
+
+    budget = primary_distance * max_stretch
+    with metrics.phase('search'):
+        forward_tree = _search_tree(graph.offsets, graph.targets, graph.weights,
+                                    source, budget, deadline, stats)
+        backward_tree = None
+        if forward_tree is not None:
+            backward_tree = _search_tree(*graph.get_reverse_arrays(), target, budget, deadline, stats)
+    metrics.observe('route_search_settled_nodes', stats.get('settled', 0), algorithm='alternatives')
+    metrics.observe('route_search_pushed_nodes', stats.get('pushed', 0), algorithm='alternatives')
+    if backward_tree is None:
+        return [], False
+
+    forward, previous = forward_tree
+    backward, following = backward_tree
+
+    # Seçilmiş rotaların kenarları (en iyi rota dahil)
+    chosen_edges = _edge_lengths(graph, primary_path)
+
+    alternatives = []
+    complete = True
+    min_plateau = primary_distance * MIN_PLATEAU
+    candidates = [(length, via) for length, via in _plateaus(forward, previous, backward, following)
+                  if length >= min_plateau and forward[via] + backward[via] <= budget]
+    # Uzun platolu (daha doğal) adaylar önce denenir
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+
+    with metrics.phase('reconstruct'):
+        for plateau, via in candidates:
+            if len(alternatives) >= count:
+                break
+            if time.perf_counter() > deadline:
+                complete = False
+                break
+
+            distance = forward[via] + backward[via]
+            path = _via_path(via, previous, following)
+            # İki ağaç parçası ortak düğümden geçiyorsa yol döngü içerir
+            if len(set(path)) != len(path):
+                continue
+            edges = _edge_lengths(graph, path)
+            shared = sum(length for edge, length in edges.items() if edge in chosen_edges)
+            overlap = shared / distance
+            if overlap > max_overlap:
+                continue
+
+            result = build_path_result(graph, path, distance)
+            result['stretch'] = round(distance / primary_distance, 3)
+            result['overlap'] = round(overlap, 3)
+            alternatives.append(result)
+            chosen_edges.update(edges)
+
+    return alternatives, complete
@@ -3,45 +3,561 @@ Flask Web Server
 CENG 3511 - Artificial Intelligence Final Project
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+import gzip
+import hashlib
+import hmac
+import itertools
 import json
+import math
 import os
-from dijkstra import Graph, dijkstra, find_nearest_node, find_optimal_route_tsp
+import time
+from dijkstra import (Graph, dijkstra, find_nearest_nodes, find_optimal_route_tsp, iter_optimal_routes_tsp,
+                      resolve_algorithm)
+from tsp_solver import DEFAULT_TIME_LIMIT
+from distance_matrix import compute_distance_matrix, iter_source_rows
+from contraction import ContractionHierarchy, hierarchy_path_for
+from landmarks import LandmarkTable, landmark_path_for
+from binary_graph import binary_path_for, load_binary_graph
+from route_cache import MISSING, RouteCache
+from route_geometry import compact_route, compact_tsp_result
+from isochrone import DEFAULT_CELL_SIZE, isochrone
+from alternatives import DEFAULT_TIME_LIMIT as ALTERNATIVES_TIME_LIMIT, MAX_ALTERNATIVES, alternative_routes
+from vehicle_routing import (DEFAULT_TIME_LIMIT as VRP_TIME_LIMIT, MAX_STOPS, MAX_TIME_LIMIT as VRP_MAX_TIME_LIMIT,
+                             MAX_VEHICLES, find_vehicle_routes)
+from edge_updates import (apply_edge_updates, changes_to, file_stamp, locked_updates_file,
+                          overrides_to_json, parse_updates, read_updates_file,
+                          updates_path_for, write_updates_file)
+from graph_registry import (DEFAULT_MEMORY_BUDGET, GraphRegistry, RegionError, UnknownRegionError,
+                            read_regions_file)
+import metrics
+
+try:
+    import orjson  # Opsiyonel: daha hızlı JSON serileştirme
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 CORS(app)  # CORS izinleri (frontend-backend iletişimi için)
 
-# Global değişkenler
-graph_data = None
-graph = None
+# Graph dosyası (ikili graph, CH hiyerarşisi ve landmark tabloları aynı
+# klasörde mugla_full.graph / mugla_full.ch / mugla_full.alt olarak aranır)
+GRAPH_FILE = 'mugla_full.json'
+
+# Çok bölgeli sunum: bölge dosyası (graph_registry.py); verilmezse tek
+# bölge olarak GRAPH_FILE sunulur
+REGIONS_FILE = os.environ.get('ROUTE_REGIONS') or None
+
+# Yüklü bölge graph'larının tahmini bellek bütçesi (bayt); aşılınca boştaki
+# bölgeler boşaltılır (serve.py'de bütçe worker başınadır)
+REGION_MEMORY_BUDGET = int(float(os.environ.get('ROUTE_REGION_MEMORY_MB', 0)) * 1024 * 1024) or DEFAULT_MEMORY_BUDGET
+
+# Rota/eşleme önbelleği boyutu (bayt)
+ROUTE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Önceden serileştirilmiş graph yanıtları için önbellek boyutu (bayt)
+RESPONSE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+# Bölge (bbox/tile) sorgusunda döndürülebilecek en fazla düğüm
+GRAPH_REGION_MAX_NODES = 50000
+
+# gzip sıkıştırma seviyesi (yanıt başına bir kez yapılır)
+GZIP_LEVEL = 6
+
+# Yönetim API'si (kenar güncellemeleri) için anahtar; verilmezse API kapalıdır
+ADMIN_TOKEN = os.environ.get('ROUTE_ADMIN_TOKEN') or None
+
+# Diğer worker'ların yazdığı kenar güncellemelerini kontrol etme aralığı (saniye)
+EDGE_UPDATES_POLL_INTERVAL = 1.0
+
+# Mesafe matrisi isteğinde en fazla kaynak (ve hedef) sayısı
+MAX_MATRIX_POINTS = 1000
+
+# Toplu rota isteğinde en fazla çift sayısı
+MAX_BATCH_PAIRS = 10000
+
+# Anytime TSP akışı (/api/find-optimal-route/stream) için süre bütçesi (saniye)
+ANYTIME_TIME_LIMIT = 10.0
+ANYTIME_MAX_TIME_LIMIT = 60.0
+
+# Koordinatlar sadece ana bağlı bileşene eşlenir (kopuk küçük parçalara
+# eşlenen tıklamalar 404 veriyordu); ROUTE_SNAP_ALL_COMPONENTS=1 ile kapatılır
+SNAP_TO_MAIN_COMPONENT = os.environ.get('ROUTE_SNAP_ALL_COMPONENTS', '') in ('', '0')
+
+# Anahtarlar graph sürümünü içerir; graph yeniden yüklenince eski girdiler eşleşmez
+# (sürümler tüm graph'larda tekildir, bölgeler de birbirine karışmaz)
+route_cache = RouteCache(ROUTE_CACHE_MAX_BYTES)
+
+# Graph yanıtları: anahtar -> (etag, json bayt, gzip bayt)
+response_cache = RouteCache(RESPONSE_CACHE_MAX_BYTES, namespaces=('response',))
+
+# İstek gövdesinde bölge seçimi için aranan koordinat anahtarları
+REGION_POINT_KEYS = (('lat', 'lon'), ('start_lat', 'start_lon'))
+
+
+def read_graph_file(path=None) -> Graph:
+    """
+    Graph'ı okur: ikili dosya (mugla_full.graph) varsa mmap ile açılır,
+    yoksa mugla_full.json ayrıştırılır
+    """
+    path = path or GRAPH_FILE
+    binary_path = binary_path_for(path)
+    if os.path.exists(binary_path) and os.path.exists(path) and \
+            os.path.getmtime(path) > os.path.getmtime(binary_path):
+        # JSON güncellendiyse eski ikili graph sessizce sunulmasın
+        print(f"⚠️  İkili graph {path} dosyasından eski, JSON kullanılıyor "
+              f"(yeniden oluşturun: python binary_graph.py {path})")
+    elif os.path.exists(binary_path):
+        try:
+            loaded = load_binary_graph(binary_path)
+            print(f"✅ İkili graph mmap ile açıldı: {binary_path}")
+            return loaded
+        except ValueError as e:
+            print(f"⚠️  İkili graph kullanılamıyor, JSON'a dönülüyor: {e}")
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    return Graph(data['nodes'], data['edges'])
+
+
+def load_region_graph(region) -> Graph:
+    """Bölgenin graph'ını okur ve ön işleme verilerini (varsa) yükler"""
+    graph = read_graph_file(region.path)
+    
+    # En yakın düğüm sorguları için spatial index (bir kez oluşturulur)
+    graph.build_spatial_index()
+    
+    # Sadeleştirilmiş graph (simplify.py): yollar ara noktalarla genişletilir
+    if graph.shapes is not None:
+        print(f"✅ Sadeleştirilmiş graph: {len(graph.shapes[2])} ara nokta kenar şekillerinde")
+    
+    # Bağlı bileşenler: ulaşılamaz sorgular aramasız reddedilir
+    components = graph.build_components()
+    print(f"✅ Bağlı bileşenler: {components.strong_count} güçlü, {components.weak_count} zayıf; "
+          f"ana bileşen {components.main_size} düğüm")
+    
+    # Önceden hesaplanmış CH hiyerarşisi varsa yükle
+    hierarchy_path = hierarchy_path_for(region.path)
+    if os.path.exists(hierarchy_path):
+        try:
+            graph.hierarchy = ContractionHierarchy.load(hierarchy_path, graph)
+            print(f"✅ CH hiyerarşisi yüklendi: {graph.hierarchy.shortcut_count} kısayol")
+        except ValueError as e:
+            print(f"⚠️  CH hiyerarşisi kullanılamıyor: {e}")
+    
+    # ALT landmark tabloları varsa yükle
+    landmark_path = landmark_path_for(region.path)
+    if os.path.exists(landmark_path):
+        try:
+            graph.landmarks = LandmarkTable.load(landmark_path, graph)
+            print(f"✅ ALT landmark tabloları yüklendi: {len(graph.landmarks.landmarks)} landmark")
+        except ValueError as e:
+            print(f"⚠️  Landmark tabloları kullanılamıyor: {e}")
+    
+    return graph
+
+
+# Bölge adı -> graph; bölgeler ilk istekte yüklenir (load_graph_data yapılandırır)
+registry = GraphRegistry(load_region_graph, REGION_MEMORY_BUDGET)
+
+
+def configure_regions() -> GraphRegistry:
+    """REGIONS_FILE'daki bölgeleri (yoksa sadece GRAPH_FILE'ı) yeni bir registry'ye kaydeder"""
+    configured = GraphRegistry(load_region_graph, REGION_MEMORY_BUDGET)
+    if REGIONS_FILE is None:
+        configured.add(os.path.splitext(os.path.basename(GRAPH_FILE))[0], GRAPH_FILE)
+        return configured
+    
+    default, regions = read_regions_file(REGIONS_FILE)
+    for name, entry in regions.items():
+        configured.add(name, entry['graph'], entry['bounds'], default=name == default)
+    print(f"🗺️  {len(regions)} bölge kayıtlı: {', '.join(regions)} (varsayılan: {configured.default})")
+    return configured
 
 
 def load_graph_data():
-    """mugla_full.json dosyasını yükler"""
-    global graph_data, graph
+    """
+    Bölgeleri kaydeder ve varsayılan bölgenin graph'ını (mugla_full.graph
+    veya mugla_full.json) yükler; diğer bölgeler ilk istekte yüklenir
+    
+    Yükleme başarısız olursa önceki bölgeler ve graph'lar kullanılmaya devam eder.
+    """
+    global registry
     
     try:
-        with open('mugla_full.json', 'r', encoding='utf-8') as f:
-            graph_data = json.load(f)
+        configured = configure_regions()
+        region = configured.region()
+        configured.acquire(region)
+        configured.release(region)
+        
+        # Kayıtlı kapanma/yoğunluk güncellemeleri yeni graph'a da uygulanır
+        graph = sync_edge_updates(region, force=True)
+        if graph.weight_overrides:
+            print(f"🚧 Kenar güncellemeleri uygulandı: {len(graph.weight_overrides)} kenar")
+        
+        registry = configured
+        
+        # Yeni graph yeni sürüm alır; eski girdiler zaten eşleşmez, belleği boşalt
+        route_cache.clear()
+        response_cache.clear()
         
-        graph = Graph(graph_data['nodes'], graph_data['edges'])
         print("✅ Graph verisi başarıyla yüklendi!")
-        print(f"   - Toplam düğüm: {len(graph_data['nodes'])}")
-        print(f"   - Toplam bağlantı: {sum(len(edges) for edges in graph_data['edges'].values()) // 2}")
+        print(f"   - Toplam düğüm: {graph.node_count}")
+        print(f"   - Toplam bağlantı: {graph.edge_count // 2}")
         return True
-    except FileNotFoundError:
-        print("❌ HATA: mugla_full.json dosyası bulunamadı!")
-        print("   Lütfen mugla_full.json dosyasını backend/ klasörüne koyun.")
-        return False
-    except json.JSONDecodeError:
-        print("❌ HATA: mugla_full.json dosyası geçerli bir JSON değil!")
+    except RegionError as e:
+        cause = e.__cause__
+        if isinstance(cause, FileNotFoundError):
+            print(f"❌ HATA: {cause.filename} dosyası bulunamadı!")
+            print("   Lütfen mugla_full.json dosyasını backend/ klasörüne koyun.")
+        elif isinstance(cause, json.JSONDecodeError):
+            print("❌ HATA: Graph dosyası geçerli bir JSON değil!")
+        else:
+            print(f"❌ HATA: Graph verisi yüklenirken hata: {e}")
         return False
     except Exception as e:
         print(f"❌ HATA: Graph verisi yüklenirken hata: {e}")
         return False
 
 
+def default_graph():
+    """Varsayılan bölgenin yüklü graph'ı (yüklemeden; yoksa None)"""
+    if registry.default is None:
+        return None
+    return registry.region().graph
+
+
+def use_graph(new_graph, name='default') -> GraphRegistry:
+    """
+    Hazır bir Graph'ı tek bölge olarak sunar (ör. benchmark.py)
+    
+    Returns:
+        Önceki registry (geri yüklemek için app.registry'ye atanabilir)
+    """
+    global registry
+    previous = registry
+    configured = GraphRegistry(load_region_graph, REGION_MEMORY_BUDGET)
+    region = configured.add(name, GRAPH_FILE)
+    configured.attach(region, new_graph)
+    # Hazır graph'a GRAPH_FILE'ın kayıtlı güncellemeleri uygulanmaz
+    region.updates_stamp = file_stamp(updates_path_for(region.path))
+    registry = configured
+    return previous
+
+
+def sync_edge_updates(region, force=False):
+    """
+    Güncellemeler dosyası değiştiyse (ör. başka bir worker yazdıysa)
+    içindeki durumu bölgenin graph'ına uygular; aralıklı olarak sadece
+    stat yapılır
+    
+    Returns:
+        Bölgenin güncel graph'ı
+    """
+    now = time.monotonic()
+    if not force and now - region.updates_checked < EDGE_UPDATES_POLL_INTERVAL:
+        return region.graph
+    region.updates_checked = now
+    
+    path = updates_path_for(region.path)
+    stamp = file_stamp(path)
+    if stamp == region.updates_stamp:
+        return region.graph
+    
+    with region.update_lock:
+        current_graph = region.graph
+        try:
+            overrides = read_updates_file(path, current_graph)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Kenar güncellemeleri okunamadı: {e}")
+            return current_graph
+        region.graph = apply_edge_updates(current_graph, changes_to(current_graph, overrides))
+        region.updates_stamp = stamp
+    return region.graph
+
+
+def first_point(value, depth=3):
+    """İstek gövdesindeki ilk koordinat (lat, lon), yoksa None"""
+    if isinstance(value, dict):
+        for lat_key, lon_key in REGION_POINT_KEYS:
+            if lat_key in value and lon_key in value:
+                try:
+                    return float(value[lat_key]), float(value[lon_key])
+                except (TypeError, ValueError):
+                    return None
+        children = value.values()
+    elif isinstance(value, list):
+        children = value
+    else:
+        return None
+    
+    if depth > 0:
+        for child in children:
+            if isinstance(child, (dict, list)):
+                point = first_point(child, depth - 1)
+                if point is not None:
+                    return point
+    return None
+
+
+def request_graph(point=None) -> Graph:
+    """
+    İsteğin bölgesinin graph'ı (istek boyunca aynı nesne)
+    
+    Bölge: 'region' (query veya JSON gövdesi), yoksa point veya gövdedeki
+    ilk koordinatı içeren bölge, yoksa varsayılan bölge. Bölge gerekirse
+    yüklenir ve istek bitene kadar boşaltılmaz.
+    
+    Raises:
+        RegionError: Bölge bilinmiyorsa veya graph yüklenemiyorsa
+    """
+    current_graph = g.get('graph')
+    if current_graph is not None:
+        return current_graph
+    
+    data = request.get_json(silent=True) if request.is_json else None
+    name = request.args.get('region')
+    if name is None and isinstance(data, dict):
+        name = data.get('region')
+    
+    current_registry = registry
+    if name is not None:
+        region = current_registry.region(str(name))
+    else:
+        point = point or first_point(data)
+        region = current_registry.region() if point is None else current_registry.region_for_point(*point)
+    
+    current_registry.acquire(region)
+    g.region = region
+    g.region_registry = current_registry
+    g.graph = sync_edge_updates(region)
+    return g.graph
+
+
+def graph_error(point=None):
+    """İsteğin bölgesi seçilemiyor veya graph'ı yüklenemiyorsa hata yanıtı, yoksa None"""
+    if registry.default is None:
+        return jsonify({
+            'error': 'Graph verisi yüklenmedi',
+            'message': 'mugla_full.json dosyasını backend/ klasörüne koyun'
+        }), 500
+    try:
+        request_graph(point)
+    except UnknownRegionError as e:
+        return jsonify({'error': 'Bilinmeyen bölge', 'message': str(e)}), 400
+    except RegionError as e:
+        return jsonify({'error': 'Graph verisi yüklenmedi', 'message': str(e)}), 500
+    return None
+
+
+# Önbellekte saklanan yol sonucu alanları (build_path_result çıktısı +
+# alternatifler için aramanın indeks yolu)
+ROUTE_FIELDS = ('path', 'distance', 'coordinates', 'node_count', 'path_indices')
+
+
+@app.before_request
+def start_request_timer():
+    if metrics.ENABLED:
+        g.metrics_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('metrics_started', None) if metrics.ENABLED else None
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.inc('route_requests_total', endpoint=endpoint, method=request.method,
+                    status=response.status_code)
+        metrics.observe('route_request_seconds', time.perf_counter() - started,
+                        endpoint=endpoint, method=request.method)
+        metrics.maybe_write_snapshot()
+    region = g.get('region')
+    if region is not None:
+        response.headers['X-Route-Region'] = region.name
+    return response
+
+
+@app.teardown_request
+def release_region(exc=None):
+    # Akan yanıtlarda (batch-routes) akış bitince çağrılır
+    region = g.pop('region', None)
+    if region is not None:
+        g.pop('region_registry').release(region)
+
+
+def snap_points(points):
+    """Koordinatları en yakın düğümlere eşler (önbellekli, eksikler tek çağrıda)"""
+    with metrics.phase('snap'):
+        return _snap_points(points)
+
+
+def _snap_points(points):
+    current_graph = request_graph()
+    version = current_graph.version
+    node_ids = [route_cache.get('snap', version, point) for point in points]
+    
+    missing = [i for i, node_id in enumerate(node_ids) if node_id is MISSING]
+    if missing:
+        snapped = find_nearest_nodes([points[i] for i in missing], current_graph,
+                                     SNAP_TO_MAIN_COMPONENT)
+        for i, node_id in zip(missing, snapped):
+            node_ids[i] = node_id
+            route_cache.put('snap', version, points[i], node_id)
+    
+    return node_ids
+
+
+def cached_route(start_node, end_node, algorithm=None):
+    """
+    dijkstra() sonucunu önbellekten döndürür, yoksa hesaplayıp saklar
+    Önbellekten gelen sonuçta settled_nodes 0'dır ve cached True olur
+    """
+    # Kenar güncellemesi sırasında da sonuç ve anahtar aynı graph sürümüne ait olur
+    current_graph = request_graph()
+    algorithm = resolve_algorithm(current_graph, algorithm)
+    # Anahtar algoritmayı da içerir: bir algoritmanın sonucu başka bir
+    # algoritmanın adıyla dönmez (TSP segmentleri (a, b) anahtarını kullanır)
+    key = (start_node, end_node, algorithm)
+    
+    cached = route_cache.get('route', current_graph.version, key)
+    if cached is not MISSING:
+        if cached is None:
+            return None
+        result = dict(cached)
+        result['settled_nodes'] = 0
+        result['algorithm'] = algorithm
+        result['cached'] = True
+        return result
+    
+    result = dijkstra(current_graph, start_node, end_node, algorithm)
+    route_cache.put('route', current_graph.version, key,
+                    None if result is None else {field: result[field] for field in ROUTE_FIELDS})
+    if result is not None:
+        result['cached'] = False
+    return result
+
+
+def route_alternatives(data, start_node, end_node, result, compact=False):
+    """
+    İstekte alternatives: k verildiyse en iyi rotanın yanına en fazla k
+    alternatif ekler (tamamlanmış sonuçlar önbelleğe alınır)
+    Request: alternatives (opsiyonel, 0-5), alternatives_time_limit (opsiyonel, saniye)
+    """
+    count = int(data.get('alternatives', 0))
+    if count <= 0:
+        if count < 0:
+            raise ValueError("alternatives negatif olamaz")
+        return {}
+    if count > MAX_ALTERNATIVES:
+        raise ValueError(f"En fazla {MAX_ALTERNATIVES} alternatif istenebilir")
+    time_limit = float(data.get('alternatives_time_limit', ALTERNATIVES_TIME_LIMIT))
+    
+    current_graph = request_graph()
+    key = ('alternatives', start_node, end_node, count)
+    cached = route_cache.get('route', current_graph.version, key)
+    if cached is not MISSING:
+        alternatives, complete = cached, True
+    else:
+        # result['path'] sadeleştirilmiş graph'ta ara nokta ID'leri de içerir;
+        # aramanın indeks yolu doğrudan kullanılır
+        path_indices = result['path_indices']
+        alternatives, complete = alternative_routes(
+            current_graph, path_indices[0], path_indices[-1], path_indices,
+            result['distance'], count, time_limit=time_limit)
+        if complete:
+            route_cache.put('route', current_graph.version, key, alternatives)
+    
+    print(f"🔀 {len(alternatives)} alternatif rota" + ("" if complete else " (süre sınırı doldu)"))
+    if compact:
+        alternatives = [compact_route(alternative) for alternative in alternatives]
+    return {'alternatives': alternatives, 'alternatives_complete': complete}
+
+
+def serialized_response(key, build):
+    """
+    build(graph) sonucunu graph sürümü başına bir kez JSON'a çevirip gzip'ler;
+    ETag ile koşullu istekleri (304) ve Accept-Encoding ile gzip'i destekler
+    """
+    current_graph = request_graph()
+    entry = response_cache.get('response', current_graph.version, key)
+    if entry is MISSING:
+        with metrics.phase('serialize'):
+            body = dump_json(build(current_graph))
+        etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        entry = (etag, body, gzip.compress(body, GZIP_LEVEL))
+        response_cache.put('response', current_graph.version, key, entry)
+    
+    etag, body, compressed = entry
+    use_gzip = 'gzip' in request.accept_encodings
+    if use_gzip:
+        # Sıkıştırılmış gösterim ayrı bir ETag alır
+        etag += '-gzip'
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(compressed if use_gzip else body, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def region_response(key, min_lat, min_lon, max_lat, max_lon):
+    """Kutu içindeki düğümleri ve kenarlarını döndürür (spatial index ile)"""
+    indices = request_graph().spatial_index.within_bbox(min_lat, min_lon, max_lat, max_lon)
+    if len(indices) > GRAPH_REGION_MAX_NODES:
+        return jsonify({
+            'error': 'Bölge çok büyük',
+            'message': f'{len(indices)} düğüm (en fazla {GRAPH_REGION_MAX_NODES}); daha küçük bir alan isteyin'
+        }), 413
+    
+    def build(current_graph):
+        region = current_graph.region_dict(indices)
+        region['stats'] = {
+            'node_count': len(indices),
+            'edge_count': sum(len(neighbors) for neighbors in region['edges'].values())
+        }
+        region['bbox'] = [min_lat, min_lon, max_lat, max_lon]
+        return region
+    
+    return serialized_response(key, build)
+
+
+def tile_bbox(z, x, y):
+    """Slippy map (z/x/y) karosunun (min_lat, min_lon, max_lat, max_lon) kutusu"""
+    n = 2 ** z
+    if not 0 <= x < n or not 0 <= y < n:
+        raise ValueError(f"Geçersiz karo: {z}/{x}/{y}")
+    
+    def tile_lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    
+    return tile_lat(y + 1), x / n * 360.0 - 180.0, tile_lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def dump_json(payload) -> bytes:
+    """JSON serileştirme (orjson varsa onunla, yoksa standart json)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), check_circular=False).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Yanıtı serileştirir; boyutu X-Payload-Bytes başlığında bildirir"""
+    with metrics.phase('serialize'):
+        body = dump_json(payload)
+    print(f"📦 Yanıt boyutu: {len(body)} bayt")
+    response = Response(body, status=status, mimetype='application/json')
+    response.headers['X-Payload-Bytes'] = str(len(body))
+    return response
+
+
 @app.route('/')
 def index():
     """Ana sayfa"""
@@ -66,21 +582,82 @@ def index():
                 
                 <div class="endpoint">
                     <strong>GET /api/graph</strong><br>
-                    Graph verilerini döndürür (düğümler ve kenarlar)
+                    Graph verilerini döndürür (düğümler ve kenarlar)<br>
+                    Bölge için: <code>/api/graph?bbox=min_lat,min_lon,max_lat,max_lon</code>
+                </div>
+                
+                <div class="endpoint">
+                    <strong>GET /api/graph/tiles/&lt;z&gt;/&lt;x&gt;/&lt;y&gt;</strong><br>
+                    Bir harita karosundaki düğümleri ve kenarları döndürür
+                </div>
+                
+                <div class="endpoint">
+                    <strong>GET /api/graph/stats</strong><br>
+                    Sadece düğüm/kenar sayıları, graph sınırları ve bağlı bileşen özeti
                 </div>
                 
                 <div class="endpoint">
                     <strong>POST /api/find-path</strong><br>
                     En kısa yolu hesaplar<br>
-                    Body: <code>{"start_lat": 37.21, "start_lon": 28.36, "end_lat": 37.22, "end_lon": 28.37}</code>
+                    Body: <code>{"start_lat": 37.21, "start_lon": 28.36, "end_lat": 37.22, "end_lon": 28.37}</code><br>
+                    <code>"compact": true</code> ile koordinatlar encoded polyline (<code>geometry</code>) olarak döner<br>
+                    <code>"alternatives": 3</code> ile en fazla 3 farklı alternatif rota da döner (<code>alternatives_time_limit</code> saniye ile sınırlı)
+                </div>
+                
+                <div class="endpoint">
+                    <strong>POST /api/find-optimal-route</strong><br>
+                    Tüm ara duraklara uğrayan en kısa rotayı hesaplar (TSP)<br>
+                    Body: <code>{"start_lat": 37.21, "start_lon": 28.36, "waypoints": [{"lat": 37.215, "lon": 28.365}], "end_lat": 37.22, "end_lon": 28.37, "compact": true}</code><br>
+                    Yanıt boyutu <code>X-Payload-Bytes</code> başlığında bildirilir
+                </div>
+                
+                <div class="endpoint">
+                    <strong>POST /api/find-optimal-route/stream</strong><br>
+                    Anytime TSP: o ana kadarki en iyi rota (mesafe, sıra, geometri) Server-Sent Events olarak akar<br>
+                    Body: <code>/api/find-optimal-route</code> ile aynı, <code>"time_limit"</code> en fazla 60 saniye<br>
+                    Olaylar: <code>route</code> (her iyileşme), <code>done</code> (<code>reason</code>: <code>converged</code> veya <code>deadline</code>); istemci bağlantıyı kapatınca arama durur
+                </div>
+                
+                <div class="endpoint">
+                    <strong>POST /api/vrp</strong><br>
+                    Çok araçlı, kapasiteli rota optimizasyonu (50-500 durak); her araç için sıralı bir rota döner<br>
+                    Body: <code>{"depot": {"lat": 37.21, "lon": 28.36}, "stops": [{"lat": 37.215, "lon": 28.365, "demand": 2}, "node_10"], "vehicles": [{"capacity": 20}, {"capacity": 15}], "time_limit": 2, "compact": true}</code><br>
+                    Kapasiteye sığmayan duraklar <code>unassigned</code>, depodan ulaşılamayanlar <code>unreachable</code> listesinde döner
                 </div>
                 
                 <div class="endpoint">
                     <strong>POST /api/dijkstra</strong><br>
                     İki düğüm ID'si ile en kısa yolu hesaplar<br>
-                    Body: <code>{"start_node": "node_0", "end_node": "node_10"}</code>
+                    Body: <code>{"start_node": "node_0", "end_node": "node_10", "algorithm": "astar"}</code><br>
+                    <code>algorithm</code>: <code>dijkstra</code>, <code>astar</code>, <code>bidirectional</code>, <code>ch</code> veya <code>alt</code> (varsayılan: yüklü ön işlemeye göre)
+                </div>
+                
+                <div class="endpoint">
+                    <strong>POST /api/distance-matrix</strong><br>
+                    Kaynaklar ve hedefler arasındaki mesafe matrisini hesaplar<br>
+                    Body: <code>{"sources": [{"lat": 37.21, "lon": 28.36}, "node_0"], "targets": ["node_10"], "include_paths": false}</code>
                 </div>
                 
+                <div class="endpoint">
+                    <strong>POST /api/batch-routes</strong><br>
+                    Çok sayıda çifti tek istekte hesaplar; sonuçlar NDJSON olarak akar<br>
+                    Body: <code>{"pairs": [{"source": "node_0", "target": {"lat": 37.22, "lon": 28.37}}], "include_paths": false}</code>
+                </div>
+                
+                <div class="endpoint">
+                    <strong>POST /api/isochrone</strong><br>
+                    Bir noktadan verilen mesafeler içinde ulaşılabilen alanlar (GeoJSON MultiPolygon bantları)<br>
+                    Body: <code>{"lat": 37.21, "lon": 28.36, "bands": [1, 2, 5], "cell_size": 100, "direction": "from"}</code>
+                </div>
+                
+                <div class="endpoint">
+                    <strong>GET/POST/DELETE /api/admin/edge-updates</strong><br>
+                    Yol kapanmaları ve yoğunluk için canlı kenar ağırlığı güncellemeleri (<code>ROUTE_ADMIN_TOKEN</code> ile açılır)<br>
+                    Body: <code>{"updates": [{"from": "node_0", "to": "node_1", "closed": true, "bidirectional": true}, {"from": "node_2", "to": "node_3", "weight": 1.8}]}</code>
+                </div>
+                
+                <p>Çok bölgeli sunumda (<code>ROUTE_REGIONS</code>) bölge koordinatlardan seçilir; <code>?region=ad</code> veya gövdede <code>"region": "ad"</code> ile açıkça verilebilir. Seçilen bölge <code>X-Route-Region</code> başlığında döner, bölgeler <code>/health</code> altında listelenir.</p>
+                
                 <p><a href="/api/graph">Graph verisini görüntüle</a></p>
             </div>
         </body>
@@ -90,31 +667,95 @@ def index():
 
 @app.route('/api/graph', methods=['GET'])
 def get_graph():
-    """Graph verisini döndürür"""
-    if graph_data is None:
-        return jsonify({
-            'error': 'Graph verisi yüklenmedi',
-            'message': 'mugla_full.json dosyasını backend/ klasörüne koyun'
-        }), 500
+    """
+    Graph verisini döndürür
+    Query: bbox=min_lat,min_lon,max_lat,max_lon (opsiyonel, verilmezse tüm graph)
+    """
+    bbox = request.args.get('bbox')
+    if bbox is None:
+        error = graph_error()
+        if error is not None:
+            return error
+        return serialized_response('graph', lambda current_graph: {
+            'nodes': current_graph.nodes,
+            'edges': current_graph.edges,
+            'stats': {
+                'node_count': current_graph.node_count,
+                'edge_count': current_graph.edge_count // 2
+            }
+        })
     
-    return jsonify({
-        'nodes': graph_data['nodes'],
-        'edges': graph_data['edges'],
-        'stats': {
-            'node_count': len(graph_data['nodes']),
-            'edge_count': sum(len(edges) for edges in graph_data['edges'].values()) // 2
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(value) for value in bbox.split(','))
+    except ValueError:
+        return jsonify({'error': 'Geçersiz bbox: min_lat,min_lon,max_lat,max_lon bekleniyor'}), 400
+    
+    # Bölge verilmezse kutunun merkezini içeren bölge kullanılır
+    error = graph_error(((min_lat + max_lat) / 2, (min_lon + max_lon) / 2))
+    if error is not None:
+        return error
+    
+    return region_response(('bbox', min_lat, min_lon, max_lat, max_lon),
+                           min_lat, min_lon, max_lat, max_lon)
+
+
+@app.route('/api/graph/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_graph_tile(z, x, y):
+    """Slippy map karosundaki düğümleri ve kenarları döndürür"""
+    try:
+        min_lat, min_lon, max_lat, max_lon = tile_bbox(z, x, y)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    error = graph_error(((min_lat + max_lat) / 2, (min_lon + max_lon) / 2))
+    if error is not None:
+        return error
+    
+    return region_response(('tile', z, x, y), min_lat, min_lon, max_lat, max_lon)
+
+
+@app.route('/api/graph/stats', methods=['GET'])
+def get_graph_stats():
+    """Düğüm/kenar sayıları ve graph sınırları (graph verisi gönderilmez)"""
+    error = graph_error()
+    if error is not None:
+        return error
+    
+    def build(current_graph):
+        bounds = None
+        if current_graph.node_count:
+            bounds = {
+                'min_lat': min(current_graph.lat), 'min_lon': min(current_graph.lon),
+                'max_lat': max(current_graph.lat), 'max_lon': max(current_graph.lon)
+            }
+        components = current_graph.components
+        return {
+            'region': g.region.name,
+            'node_count': current_graph.node_count,
+            'edge_count': current_graph.edge_count // 2,
+            'bounds': bounds,
+            'components': None if components is None else components.summary()
         }
-    })
+    
+    return serialized_response('stats', build)
 
 
 @app.route('/api/find-path', methods=['POST'])
 def find_path():
     """
     Koordinatlardan en kısa yolu bulur
-    Request body: {start_lat, start_lon, end_lat, end_lon}
+    Request body: {start_lat, start_lon, end_lat, end_lon, algorithm (opsiyonel),
+                   compact (opsiyonel), alternatives (opsiyonel),
+                   alternatives_time_limit (opsiyonel)}
+    algorithm: 'dijkstra', 'astar', 'bidirectional', 'ch' veya 'alt'
+    (verilmezse yüklü ön işlemeye göre 'ch', 'alt' veya 'dijkstra')
+    compact: true ise coordinates yerine encoded polyline (geometry) döner
+    alternatives: k ise en fazla k farklı alternatif rota da döner
+    (her biri distance, coordinates, stretch ve overlap içerir)
     """
-    if graph is None:
-        return jsonify({'error': 'Graph verisi yüklenmedi'}), 500
+    error = graph_error()
+    if error is not None:
+        return error
     
     try:
         data = request.get_json()
@@ -124,15 +765,16 @@ def find_path():
         start_lon = float(data['start_lon'])
         end_lat = float(data['end_lat'])
         end_lon = float(data['end_lon'])
+        algorithm = data.get('algorithm')
+        compact = bool(data.get('compact', False))
         
         # En yakın düğümleri bul
-        start_node = find_nearest_node(start_lat, start_lon, graph)
-        end_node = find_nearest_node(end_lat, end_lon, graph)
+        start_node, end_node = snap_points([(start_lat, start_lon), (end_lat, end_lon)])
         
         print(f"🔍 Yol aranıyor: {start_node} → {end_node}")
         
-        # Dijkstra algoritmasını çalıştır
-        result = dijkstra(graph, start_node, end_node)
+        # Dijkstra algoritmasını çalıştır (önbellekte yoksa)
+        result = cached_route(start_node, end_node, algorithm)
         
         if result is None:
             return jsonify({
@@ -142,15 +784,20 @@ def find_path():
         
         print(f"✅ Yol bulundu! Mesafe: {result['distance']} km")
         
-        return jsonify({
+        response = {
             'success': True,
             'start_node': start_node,
             'end_node': end_node,
             'path': result['path'],
             'coordinates': result['coordinates'],
             'distance': result['distance'],
-            'node_count': result['node_count']
-        })
+            'node_count': result['node_count'],
+            'algorithm': result['algorithm'],
+            'settled_nodes': result['settled_nodes'],
+            'cached': result['cached']
+        }
+        response.update(route_alternatives(data, start_node, end_node, result, compact))
+        return json_response(compact_route(response) if compact else response)
         
     except KeyError as e:
         return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
@@ -164,19 +811,23 @@ def find_path():
 def dijkstra_endpoint():
     """
     İki düğüm ID'si ile en kısa yolu bulur
-    Request body: {start_node, end_node}
+    Request body: {start_node, end_node, algorithm (opsiyonel), compact (opsiyonel),
+                   alternatives (opsiyonel), alternatives_time_limit (opsiyonel)}
     """
-    if graph is None:
-        return jsonify({'error': 'Graph verisi yüklenmedi'}), 500
+    error = graph_error()
+    if error is not None:
+        return error
     
     try:
         data = request.get_json()
         start_node = data['start_node']
         end_node = data['end_node']
+        algorithm = data.get('algorithm')
+        compact = bool(data.get('compact', False))
         
         print(f"🔍 Dijkstra çalıştırılıyor: {start_node} → {end_node}")
         
-        result = dijkstra(graph, start_node, end_node)
+        result = cached_route(start_node, end_node, algorithm)
         
         if result is None:
             return jsonify({
@@ -186,16 +837,23 @@ def dijkstra_endpoint():
         
         print(f"✅ Yol bulundu! Mesafe: {result['distance']} km")
         
-        return jsonify({
+        response = {
             'success': True,
             'path': result['path'],
             'coordinates': result['coordinates'],
             'distance': result['distance'],
-            'node_count': result['node_count']
-        })
+            'node_count': result['node_count'],
+            'algorithm': result['algorithm'],
+            'settled_nodes': result['settled_nodes'],
+            'cached': result['cached']
+        }
+        response.update(route_alternatives(data, start_node, end_node, result, compact))
+        return json_response(compact_route(response) if compact else response)
         
     except KeyError as e:
         return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
+    except ValueError as e:
+        return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
 
@@ -207,11 +865,15 @@ def find_optimal_route():
     Request body: {
         start_lat, start_lon, 
         waypoints: [{lat, lon}, ...],
-        end_lat, end_lon
+        end_lat, end_lon,
+        time_limit (opsiyonel, saniye),
+        compact (opsiyonel): true ise tek bir ortak polyline geometrisi döner,
+                 segmentler bu geometriye indeks aralığıyla bakar
     }
     """
-    if graph is None:
-        return jsonify({'error': 'Graph verisi yüklenmedi'}), 500
+    error = graph_error()
+    if error is not None:
+        return error
     
     try:
         data = request.get_json()
@@ -222,24 +884,16 @@ def find_optimal_route():
         end_lat = float(data['end_lat'])
         end_lon = float(data['end_lon'])
         
-        # Waypoints
-        waypoints_coords = data.get('waypoints', [])
-        
-        # En yakın düğümleri bul
-        start_node = find_nearest_node(start_lat, start_lon, graph)
-        end_node = find_nearest_node(end_lat, end_lon, graph)
-        
-        waypoint_nodes = []
-        for wp in waypoints_coords:
-            wp_node = find_nearest_node(wp['lat'], wp['lon'], graph)
-            waypoint_nodes.append(wp_node)
+        # Sezgisel çözücü için süre bütçesi (saniye, opsiyonel)
+        time_limit = float(data.get('time_limit', DEFAULT_TIME_LIMIT))
+        compact = bool(data.get('compact', False))
         
-        print(f"🔍 TSP: Başlangıç: {start_node}")
-        print(f"🔍 TSP: Waypoints: {waypoint_nodes}")
-        print(f"🔍 TSP: Bitiş: {end_node}")
+        start_node, waypoint_nodes, end_node = tsp_stops(data, start_lat, start_lon, end_lat, end_lon)
+        metrics.observe('route_waypoints', len(waypoint_nodes), endpoint='/api/find-optimal-route')
         
         # TSP ile en iyi rotayı bul
-        result = find_optimal_route_tsp(graph, start_node, waypoint_nodes, end_node)
+        result = find_optimal_route_tsp(request_graph(), start_node, waypoint_nodes, end_node, time_limit,
+                                        cache=route_cache)
         
         if result is None:
             return jsonify({
@@ -249,13 +903,99 @@ def find_optimal_route():
         
         print(f"✅ En iyi rota bulundu! Mesafe: {result['total_distance']} km")
         
-        return jsonify({
-            'success': True,
-            'optimal_order': result['optimal_order'],
-            'total_distance': result['total_distance'],
-            'segments': result['segments'],
-            'coordinates': result['coordinates']
-        })
+        response = tsp_payload(result, compact)
+        response['success'] = True
+        return json_response(response)
+        
+    except KeyError as e:
+        return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
+    except ValueError as e:
+        return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
+
+def tsp_stops(data, start_lat, start_lon, end_lat, end_lon):
+    """İstekteki başlangıç, waypoint'ler ve bitişi tek çağrıda en yakın düğümlere eşler"""
+    # En yakın düğümleri tek çağrıda bul: [başlangıç, waypoint'ler..., bitiş]
+    points = [(start_lat, start_lon)]
+    points.extend((float(wp['lat']), float(wp['lon'])) for wp in data.get('waypoints', []))
+    points.append((end_lat, end_lon))
+    
+    snapped = snap_points(points)
+    start_node = snapped[0]
+    waypoint_nodes = snapped[1:-1]
+    end_node = snapped[-1]
+    
+    print(f"🔍 TSP: Başlangıç: {start_node}")
+    print(f"🔍 TSP: Waypoints: {waypoint_nodes}")
+    print(f"🔍 TSP: Bitiş: {end_node}")
+    return start_node, waypoint_nodes, end_node
+
+
+def tsp_payload(result, compact):
+    """find_optimal_route_tsp() sonucunun yanıt biçimi (compact ise tek polyline)"""
+    if compact:
+        return compact_tsp_result(result)
+    return {
+        'optimal_order': result['optimal_order'],
+        'total_distance': result['total_distance'],
+        'segments': result['segments'],
+        'coordinates': result['coordinates']
+    }
+
+
+def sse_event(event, payload) -> bytes:
+    """Server-Sent Events mesajı (JSON tek satırdır, tek data alanı yeterli)"""
+    return b'event: ' + event.encode('ascii') + b'\ndata: ' + dump_json(payload) + b'\n\n'
+
+
+@app.route('/api/find-optimal-route/stream', methods=['POST'])
+def find_optimal_route_stream():
+    """
+    Anytime TSP: o ana kadarki en iyi rota Server-Sent Events olarak akar
+    Request body: /api/find-optimal-route ile aynı (time_limit varsayılanı
+    ANYTIME_TIME_LIMIT, en fazla ANYTIME_MAX_TIME_LIMIT saniye)
+    
+    Olaylar:
+        route: En iyi rota iyileştikçe (en fazla PROGRESS_INTERVAL'de bir);
+               /api/find-optimal-route yanıtı + improvement, elapsed_ms
+        done:  {reason: 'converged' | 'deadline', total_distance, improvements, elapsed_ms}
+    Arada iyileşme yoksa ': keepalive' yorumu gönderilir; istemci bağlantıyı
+    kapatınca arama durur. Geçerli rota yoksa akış başlamadan 404 döner.
+    """
+    error = graph_error()
+    if error is not None:
+        return error
+    
+    started = time.perf_counter()
+    try:
+        data = request.get_json()
+        start_lat = float(data['start_lat'])
+        start_lon = float(data['start_lon'])
+        end_lat = float(data['end_lat'])
+        end_lon = float(data['end_lon'])
+        
+        time_limit = float(data.get('time_limit', ANYTIME_TIME_LIMIT))
+        if not 0 < time_limit <= ANYTIME_MAX_TIME_LIMIT:
+            raise ValueError(f"Süre sınırı 0-{ANYTIME_MAX_TIME_LIMIT} saniye arasında olmalı: {time_limit}")
+        compact = bool(data.get('compact', False))
+        
+        start_node, waypoint_nodes, end_node = tsp_stops(data, start_lat, start_lon, end_lat, end_lon)
+        metrics.observe('route_waypoints', len(waypoint_nodes), endpoint='/api/find-optimal-route/stream')
+        
+        results = iter_optimal_routes_tsp(request_graph(), start_node, waypoint_nodes, end_node, time_limit,
+                                          cache=route_cache)
+        
+        # İlk geçerli rota akış başlamadan beklenir; hiç yoksa normal hata yanıtı döner
+        first = None
+        if results is not None:
+            first = next((result for result in results if result is not None), None)
+        if first is None:
+            return jsonify({
+                'error': 'En iyi rota bulunamadı',
+                'message': 'Bu noktalar arasında geçerli bir rota yok'
+            }), 404
         
     except KeyError as e:
         return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
@@ -263,14 +1003,429 @@ def find_optimal_route():
         return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+    
+    def generate():
+        improvements = 0
+        best = first
+        try:
+            for result in itertools.chain([first], results):
+                if result is None:
+                    yield b': keepalive\n\n'
+                    continue
+                improvements += 1
+                best = result
+                payload = tsp_payload(result, compact)
+                payload['improvement'] = improvements
+                payload['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                yield sse_event('route', payload)
+            
+            elapsed = time.perf_counter() - started
+            reason = 'deadline' if elapsed >= time_limit else 'converged'
+            print(f"✅ Anytime TSP bitti ({reason}): {best['total_distance']} km, {improvements} iyileşme")
+            yield sse_event('done', {
+                'reason': reason,
+                'total_distance': best['total_distance'],
+                'improvements': improvements,
+                'elapsed_ms': round(elapsed * 1000, 1)
+            })
+        except GeneratorExit:
+            print(f"🔌 Anytime TSP: istemci ayrıldı, arama durduruldu ({best['total_distance']} km)")
+            raise
+        finally:
+            results.close()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Ters vekil sunucular (nginx) olayları tamponlamasın
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/api/vrp', methods=['POST'])
+def vrp_endpoint():
+    """
+    Çok araçlı, kapasiteli rota optimizasyonu (VRP)
+    Request body: {
+        depot: {lat, lon} veya "node_id",
+        stops: [{lat, lon, demand} veya {node, demand} veya "node_id", ...],
+        vehicles: araç sayısı veya [{capacity}, ...] (capacity yoksa sınırsız),
+        round_trip (opsiyonel, varsayılan true): false ise araçlar son durakta biter,
+        time_limit (opsiyonel, saniye, varsayılan 2),
+        compact (opsiyonel): true ise her araç için tek polyline geometrisi döner
+    }
+    Her araç için sıralı bir rota döner; demand verilmezse 1 sayılır.
+    'stops' alanları istekteki durak sıralarıdır. Amaç toplam mesafe
+    olduğundan kapasite sınırı yoksa durakların hepsi tek araca düşebilir.
+    """
+    error = graph_error()
+    if error is not None:
+        return error
+    
+    try:
+        data = request.get_json()
+        current_graph = request_graph()
+        
+        stops = data['stops']
+        if not 1 <= len(stops) <= MAX_STOPS:
+            raise ValueError(f"Durak sayısı 1-{MAX_STOPS} arasında olmalı: {len(stops)}")
+        
+        points = [data['depot']]
+        demands = []
+        for stop in stops:
+            if isinstance(stop, str):
+                points.append(stop)
+                demands.append(1)
+                continue
+            points.append(stop['node'] if 'node' in stop else stop)
+            demand = float(stop.get('demand', 1))
+            if not math.isfinite(demand) or demand < 0:
+                raise ValueError(f"Talep sonlu ve negatif olmayan bir sayı olmalı: {demand}")
+            demands.append(demand)
+        
+        vehicles = data.get('vehicles', 1)
+        if isinstance(vehicles, int):
+            vehicles = [{}] * vehicles
+        if not 1 <= len(vehicles) <= MAX_VEHICLES:
+            raise ValueError(f"Araç sayısı 1-{MAX_VEHICLES} arasında olmalı: {len(vehicles)}")
+        capacities = []
+        for vehicle in vehicles:
+            capacity = vehicle.get('capacity')
+            if capacity is not None:
+                capacity = float(capacity)
+                if math.isnan(capacity) or capacity < 0:
+                    raise ValueError(f"Kapasite negatif olmayan bir sayı olmalı: {capacity}")
+            capacities.append(capacity)
+        
+        time_limit = float(data.get('time_limit', VRP_TIME_LIMIT))
+        if not 0 < time_limit <= VRP_MAX_TIME_LIMIT:
+            raise ValueError(f"Süre sınırı 0-{VRP_MAX_TIME_LIMIT} saniye arasında olmalı: {time_limit}")
+        round_trip = bool(data.get('round_trip', True))
+        compact = bool(data.get('compact', False))
+        
+        nodes = resolve_points(points)
+        metrics.observe('route_waypoints', len(stops), endpoint='/api/vrp')
+        
+        result = find_vehicle_routes(current_graph, nodes[0], nodes[1:], demands, capacities,
+                                     time_limit, round_trip, cache=route_cache)
+        
+        if compact:
+            routes = []
+            for route in result['routes']:
+                compacted = compact_tsp_result(route)
+                compacted.update((key, route[key]) for key in ('vehicle', 'capacity', 'load', 'stops'))
+                routes.append(compacted)
+            result['routes'] = routes
+        
+        result['success'] = True
+        result['depot'] = nodes[0]
+        return json_response(result)
+        
+    except KeyError as e:
+        return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
+
+@app.route('/api/isochrone', methods=['POST'])
+def isochrone_endpoint():
+    """
+    Bir noktadan belirli mesafeler içinde ulaşılabilen alanlar (servis alanı)
+    Request body: {
+        lat, lon (veya node: "node_id"),
+        bands: [km, ...] (ör. [1, 2, 5]),
+        cell_size (opsiyonel, metre, varsayılan 100),
+        direction (opsiyonel): 'from' (noktadan, varsayılan) veya 'to' (noktaya),
+        include_nodes (opsiyonel): true ise ulaşılan düğümler ve mesafeleri de döner
+    }
+    Yanıt GeoJSON FeatureCollection'dır; her bant bir MultiPolygon'dur
+    """
+    error = graph_error()
+    if error is not None:
+        return error
+    
+    try:
+        data = request.get_json()
+        current_graph = request_graph()
+        
+        if 'node' in data:
+            source_node = data['node']
+            if not current_graph.node_exists(source_node):
+                raise ValueError(f"Düğüm bulunamadı: {source_node}")
+        else:
+            source_node = snap_points([(float(data['lat']), float(data['lon']))])[0]
+        
+        bands = [float(band) for band in data['bands']]
+        cell_size = float(data.get('cell_size', DEFAULT_CELL_SIZE))
+        direction = data.get('direction', 'from')
+        if direction not in ('from', 'to'):
+            raise ValueError(f"Bilinmeyen yön: {direction} ('from' veya 'to')")
+        include_nodes = bool(data.get('include_nodes', False))
+        
+        print(f"🔍 Isochrone: {source_node}, bantlar {bands} km")
+        
+        source = current_graph.get_node_index(source_node)
+        result = isochrone(current_graph, source, bands, cell_size, reverse=direction == 'to')
+        
+        reached = result.pop('reached')
+        result['source'] = source_node
+        result['direction'] = direction
+        result['reached_nodes'] = len(reached)
+        if include_nodes:
+            node_ids = current_graph.node_ids
+            result['nodes'] = {node_ids[node]: round(distance, 3) for node, distance in reached.items()}
+        
+        return json_response(result)
+        
+    except KeyError as e:
+        return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
+
+def resolve_points(points):
+    """
+    Koordinat veya düğüm ID'si listesini düğüm ID'lerine çevirir
+    Her eleman ya "node_123" gibi bir ID ya da {lat, lon} objesidir
+    """
+    node_ids = [None] * len(points)
+    coords = []
+    coord_positions = []
+    
+    for i, point in enumerate(points):
+        if isinstance(point, str):
+            if not request_graph().node_exists(point):
+                raise ValueError(f"Düğüm bulunamadı: {point}")
+            node_ids[i] = point
+        else:
+            coords.append((float(point['lat']), float(point['lon'])))
+            coord_positions.append(i)
+    
+    # Koordinatlar tek çağrıda eşlenir
+    for i, node_id in zip(coord_positions, snap_points(coords)):
+        node_ids[i] = node_id
+    
+    return node_ids
+
+
+@app.route('/api/distance-matrix', methods=['POST'])
+def distance_matrix():
+    """
+    Kaynaklar ve hedefler arasındaki mesafe matrisini hesaplar
+    Request body: {
+        sources: [{lat, lon} veya "node_id", ...],
+        targets: [...] (opsiyonel, verilmezse sources kullanılır),
+        include_paths: bool (opsiyonel)
+    }
+    sources ve targets en fazla MAX_MATRIX_POINTS nokta içerebilir
+    """
+    error = graph_error()
+    if error is not None:
+        return error
+    
+    try:
+        data = request.get_json()
+        
+        sources = data['sources']
+        targets = data.get('targets', sources)
+        for name, points in (('sources', sources), ('targets', targets)):
+            if len(points) > MAX_MATRIX_POINTS:
+                raise ValueError(f"{name} en fazla {MAX_MATRIX_POINTS} nokta içerebilir: {len(points)}")
+        
+        source_nodes = resolve_points(sources)
+        target_nodes = resolve_points(targets)
+        include_paths = bool(data.get('include_paths', False))
+        
+        print(f"🔍 Mesafe matrisi: {len(source_nodes)} x {len(target_nodes)}")
+        
+        result = compute_distance_matrix(request_graph(), source_nodes, target_nodes, include_paths)
+        
+        response = {
+            'success': True,
+            'sources': source_nodes,
+            'targets': target_nodes,
+            'distances': result['distances']
+        }
+        if include_paths:
+            response['paths'] = result['paths']
+        
+        return jsonify(response)
+        
+    except KeyError as e:
+        return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+
+
+@app.route('/api/batch-routes', methods=['POST'])
+def batch_routes():
+    """
+    Çok sayıda başlangıç-bitiş çiftini tek istekte hesaplar
+    Request body: {
+        pairs: [{source: {lat, lon} veya "node_id", target: ...}, ...],
+        include_paths: bool (opsiyonel, varsayılan false),
+        compact: bool (opsiyonel, yollar encoded polyline olarak döner)
+    }
+    Yanıt NDJSON'dur (her satır bir JSON objesi) ve kaynak grupları
+    tamamlandıkça akar; satır sırası istek sırası değildir:
+        {"index": i, "source": id, "target": id, "distance": km veya null, ...}
+    Son satır: {"done": true, "count": çift sayısı, "sources": arama sayısı}
+    En fazla MAX_BATCH_PAIRS çift istenebilir; aramalar process'in paylaşılan
+    işlem havuzunda (serve.py worker'larında seri) yapılır
+    """
+    error = graph_error()
+    if error is not None:
+        return error
+    
+    try:
+        data = request.get_json()
+        pairs = data['pairs']
+        if len(pairs) > MAX_BATCH_PAIRS:
+            raise ValueError(f"En fazla {MAX_BATCH_PAIRS} çift istenebilir: {len(pairs)}")
+        include_paths = bool(data.get('include_paths', False))
+        compact = bool(data.get('compact', False))
+        
+        # Tüm noktalar toplu olarak eşlenir
+        source_nodes = resolve_points([pair['source'] for pair in pairs])
+        target_nodes = resolve_points([pair['target'] for pair in pairs])
+    except KeyError as e:
+        return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
+    
+    # Akış sırasında graph yeniden yüklenirse bu istek eski graph ile biter
+    current_graph = request_graph()
+    node_index = current_graph.node_index
+    
+    # Aynı kaynaktan çıkan çiftler tek bir aramayı paylaşır
+    groups = {}
+    for position, (source, target) in enumerate(zip(source_nodes, target_nodes)):
+        targets = groups.setdefault(node_index[source], {})
+        targets.setdefault(node_index[target], []).append(position)
+    
+    print(f"🔍 Toplu rota: {len(pairs)} çift, {len(groups)} kaynak")
+    
+    def generate():
+        search_groups = {source: list(targets) for source, targets in groups.items()}
+        for source, row in iter_source_rows(current_graph, search_groups, include_paths):
+            for k, (target, positions) in enumerate(groups[source].items()):
+                line = {
+                    'source': source_nodes[positions[0]],
+                    'target': target_nodes[positions[0]],
+                    'distance': row['distances'][k]
+                }
+                if include_paths and row['paths'][k] is not None:
+                    path_result = row['paths'][k]
+                    if compact:
+                        path_result = compact_route(path_result)
+                    line.update((key, value) for key, value in path_result.items() if key != 'distance')
+                
+                for position in positions:
+                    line['index'] = position
+                    yield dump_json(line) + b'\n'
+        
+        yield dump_json({'done': True, 'count': len(pairs), 'sources': len(groups)}) + b'\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def admin_error():
+    """Yönetim API'si kapalıysa veya anahtar yanlışsa hata yanıtı, yoksa None"""
+    if ADMIN_TOKEN is None:
+        return jsonify({'error': 'Yönetim API\'si kapalı', 'message': 'ROUTE_ADMIN_TOKEN ile başlatın'}), 404
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {ADMIN_TOKEN}'.encode('utf-8')):
+        return jsonify({'error': 'Yetkisiz', 'message': 'Authorization: Bearer <anahtar> gerekli'}), 401
+    return None
+
+
+def edge_updates_response(current_graph):
+    return jsonify({
+        'success': True,
+        'version': current_graph.version,
+        'updates': overrides_to_json(current_graph),
+        'algorithm': resolve_algorithm(current_graph),
+        'hierarchy_suspended': current_graph.suspended_hierarchy is not None
+    })
+
+
+@app.route('/api/admin/edge-updates', methods=['GET', 'POST', 'DELETE'])
+def edge_updates_endpoint():
+    """
+    Kenar ağırlığı güncellemeleri (kapanma, yoğunluk) - Authorization: Bearer <ROUTE_ADMIN_TOKEN>
+    GET: etkin güncellemeler
+    POST: {updates: [{from, to, weight | closed: true | reset: true, bidirectional (opsiyonel)}, ...]}
+          Grup bütün olarak uygulanır; bir eleman geçersizse hiçbiri uygulanmaz
+    DELETE: tüm güncellemeleri kaldırır (temel ağırlıklara döner)
+    """
+    error = admin_error()
+    if error is not None:
+        return error
+    error = graph_error()
+    if error is not None:
+        return error
+    
+    if request.method == 'GET':
+        return edge_updates_response(request_graph())
+    
+    try:
+        changes = parse_updates(request_graph(), request.get_json()['updates']) if request.method == 'POST' else None
+    except KeyError as e:
+        return jsonify({'error': f'Eksik parametre: {str(e)}'}), 400
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Geçersiz değer: {str(e)}'}), 400
+    
+    # Her bölgenin güncellemeleri kendi graph dosyasının yanında tutulur
+    region = g.region
+    path = updates_path_for(region.path)
+    try:
+        with region.update_lock, locked_updates_file(path):
+            # Önce diğer worker'ların yazdığı durum alınır, grup onun üzerine uygulanır
+            current_graph = region.graph
+            current_graph = apply_edge_updates(current_graph, changes_to(
+                current_graph, read_updates_file(path, current_graph)))
+            if changes is None:
+                changes = changes_to(current_graph, {})
+            updated = apply_edge_updates(current_graph, changes)
+            
+            # Dosya yazılamazsa graph değişmez
+            write_updates_file(path, updated)
+            region.graph = updated
+            region.updates_stamp = file_stamp(path)
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'Sunucu hatası: {str(e)}'}), 500
+    
+    print(f"🚧 Kenar güncellemesi ({region.name}): {len(changes)} kenar, "
+          f"{len(updated.weight_overrides)} etkin güncelleme (sürüm {updated.version})")
+    return edge_updates_response(updated)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metin biçiminde metrikler (ROUTE_METRICS=1 ile açılır)"""
+    if not metrics.ENABLED:
+        return jsonify({'error': 'Metrikler kapalı', 'message': 'ROUTE_METRICS=1 ile başlatın'}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/health', methods=['GET'])
 def health():
-    """Server sağlık kontrolü"""
+    """Server sağlık kontrolü (varsayılan bölge; diğer bölgeler 'regions' altında)"""
+    graph = default_graph()
     return jsonify({
         'status': 'healthy',
-        'graph_loaded': graph is not None
+        'graph_loaded': graph is not None,
+        'hierarchy_loaded': graph is not None and graph.hierarchy is not None,
+        'landmarks_loaded': graph is not None and graph.landmarks is not None,
+        'edge_updates': 0 if graph is None else len(graph.weight_overrides),
+        'components': None if graph is None or graph.components is None else graph.components.summary(),
+        'regions': registry.summary(),
+        'cache': route_cache.stats()
     })
 
 
@@ -284,6 +1439,7 @@ if __name__ == '__main__':
         print("\n✅ Server başlatılıyor...")
         print("📍 URL: http://localhost:5000")
         print("📍 API: http://localhost:5000/api/graph")
+        print("💡 Çok çekirdekli production modu için: python serve.py --workers N")
         print("\n⚠️  Server'ı durdurmak için: Ctrl+C\n")
         
         app.run(debug=False, host='127.0.0.1', port=8000, use_reloader=False)
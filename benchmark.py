@@ -0,0 +1,389 @@
+"""
+Benchmark - Sentetik yol ağı üzerinde tekrarlanabilir performans ölçümü
+CENG 3511 - Artificial Intelligence Final Project
+
+Tohumlu (seed) üreteç, mugla_full.json ile aynı {nodes, edges} biçiminde
+yol benzeri bir graph oluşturur: düzlemsel ızgara, koordinat sapmaları,
+rastgele eksik yollar ve tek yönlü kenarlar. Aynı seed ve boyut her
+zaman aynı graph'ı ve aynı sorguları üretir.
+
+Ölçülenler: graph yükleme, find_nearest_node, dijkstra (algoritma başına),
+find_optimal_route_tsp (ara durak sayısına göre) ve Flask endpoint'lerinin
+test client üzerinden uçtan uca gecikmesi. Sonuçlar JSON olarak yazılır;
+--compare ile önceki bir çalıştırmayla karşılaştırılabilir.
+
+Kullanım:
+    python benchmark.py --nodes 200000 --output results.json
+    python benchmark.py --nodes 50000 --algorithms dijkstra,astar,ch --compare results.json
+    python benchmark.py --nodes 100000 --save-graph synthetic.json   # sadece graph üret
+    python benchmark.py --nodes 20000 --shape-points 4 --save-graph shaped.json   # simplify.py için
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from dijkstra import (Graph, dijkstra, find_nearest_node, find_optimal_route_tsp,
+                      haversine_distance)
+
+# Varsayılan ayarlar
+DEFAULT_SEED = 42
+DEFAULT_NODES = 100000
+DEFAULT_QUERIES = 50
+DEFAULT_WAYPOINT_COUNTS = (2, 5, 10, 15, 25)
+DEFAULT_ALGORITHMS = ('dijkstra', 'astar', 'bidirectional')
+
+# Üreteç parametreleri: Muğla merkezine yakın bir başlangıç noktası
+ORIGIN = (37.2156, 28.3638)
+GRID_SPACING = 0.001        # Izgara aralığı (derece, ~100 m)
+JITTER = 0.3                # Aralığa oranla koordinat sapması
+DROP_RATIO = 0.05           # Hiç yol olmayan ızgara bağlantısı oranı
+ONE_WAY_RATIO = 0.1         # Tek yönlü yol oranı
+DETOUR_RANGE = (1.0, 1.3)   # Yol uzunluğu / kuş uçuşu mesafe oranı
+
+# TSP ölçümünde sezgisel çözücünün süre bütçesi (saniye)
+TSP_TIME_LIMIT = 0.5
+
+# Doğrusal tarama çok yavaş olduğu için daha az sorguyla ölçülür
+LINEAR_SCAN_QUERIES = 5
+
+
+def generate_road_graph(node_count: int, seed: int = DEFAULT_SEED, shape_points: int = 0) -> Dict:
+    """
+    Yol benzeri sentetik graph üretir
+
+    Args:
+        node_count: Yaklaşık kavşak sayısı (kare ızgaraya yuvarlanır)
+        seed: Rastgelelik tohumu
+        shape_points: Her yola eklenen en fazla ara nokta (OSM şekil
+            noktaları gibi; 0 = yok). Ara noktalar düğüm sayısına eklenir.
+
+    Returns:
+        {'nodes': {id: {lat, lon}}, 'edges': {id: [{node, weight}]}}
+    """
+    rng = random.Random(seed)
+    side = max(2, math.isqrt(node_count))
+    jitter = GRID_SPACING * JITTER
+
+    nodes = {}
+    edges = {}
+    for row in range(side):
+        for col in range(side):
+            node_id = f"node_{row * side + col}"
+            nodes[node_id] = {
+                'lat': round(ORIGIN[0] + row * GRID_SPACING + rng.uniform(-jitter, jitter), 7),
+                'lon': round(ORIGIN[1] + col * GRID_SPACING + rng.uniform(-jitter, jitter), 7)
+            }
+            edges[node_id] = []
+
+    for row in range(side):
+        for col in range(side):
+            a = f"node_{row * side + col}"
+            for next_row, next_col in ((row, col + 1), (row + 1, col)):
+                if next_row >= side or next_col >= side or rng.random() < DROP_RATIO:
+                    continue
+                b = f"node_{next_row * side + next_col}"
+                detour = rng.uniform(*DETOUR_RANGE)
+                one_way = rng.random() < ONE_WAY_RATIO
+                start, end = (b, a) if one_way and rng.random() < 0.5 else (a, b)
+
+                # Yol, aralarına ara noktalar eklenmiş parçalardan oluşur
+                count = rng.randint(0, shape_points) if shape_points else 0
+                chain = [start]
+                for i in range(count):
+                    point_id = f"{start}_{end}_{i}"
+                    fraction = (i + 1) / (count + 1)
+                    nodes[point_id] = {
+                        'lat': round(nodes[start]['lat'] + (nodes[end]['lat'] - nodes[start]['lat']) * fraction
+                                     + rng.uniform(-jitter, jitter) / 4, 7),
+                        'lon': round(nodes[start]['lon'] + (nodes[end]['lon'] - nodes[start]['lon']) * fraction
+                                     + rng.uniform(-jitter, jitter) / 4, 7)
+                    }
+                    edges[point_id] = []
+                    chain.append(point_id)
+                chain.append(end)
+
+                for source, target in zip(chain, chain[1:]):
+                    distance = haversine_distance(nodes[source]['lat'], nodes[source]['lon'],
+                                                  nodes[target]['lat'], nodes[target]['lon'])
+                    weight = round(distance * detour, 4)
+
+                    # Tek yönlü yollar rastgele yönde
+                    edges[source].append({'node': target, 'weight': weight})
+                    if not one_way:
+                        edges[target].append({'node': source, 'weight': weight})
+
+    return {'nodes': nodes, 'edges': edges}
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Süre örneklerini (saniye) milisaniye istatistiklerine çevirir"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    return {
+        'count': len(samples),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 4),
+        'median_ms': round(statistics.median(samples) * 1000, 4),
+        'p95_ms': round(p95 * 1000, 4),
+        'min_ms': round(ordered[0] * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4)
+    }
+
+
+def measure(function: Callable, arguments: List) -> Dict:
+    """function(*args) çağrılarını tek tek ölçer (stdout bastırılır)"""
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for args in arguments:
+            started = time.perf_counter()
+            function(*args)
+            samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def measure_once(function: Callable) -> float:
+    """Tek seferlik işlemin süresi (saniye), stdout bastırılır"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        function()
+        return time.perf_counter() - started
+
+
+def bench_loading(data: Dict, results: Dict) -> Graph:
+    """JSON ve ikili graph yükleme sürelerini ölçer; Graph'ı döndürür"""
+    from binary_graph import load_binary_graph, write_binary_graph
+
+    with tempfile.TemporaryDirectory() as workdir:
+        json_path = os.path.join(workdir, 'graph.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        def load_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            return Graph(loaded['nodes'], loaded['edges'])
+
+        results['load.json'] = summarize([measure_once(load_json)])
+
+        graph = Graph(data['nodes'], data['edges'])
+        binary_path = os.path.join(workdir, 'graph.graph')
+        write_binary_graph(graph, binary_path)
+        results['load.binary'] = summarize([measure_once(lambda: load_binary_graph(binary_path))])
+
+    results['load.spatial_index'] = summarize([measure_once(graph.build_spatial_index)])
+    return graph
+
+
+def random_points(graph: Graph, rng: random.Random, count: int) -> List:
+    """Graph sınırları içinde rastgele koordinatlar"""
+    min_lat, max_lat = min(graph.lat), max(graph.lat)
+    min_lon, max_lon = min(graph.lon), max(graph.lon)
+    return [(rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)) for _ in range(count)]
+
+
+def bench_nearest(graph: Graph, rng: random.Random, queries: int, results: Dict):
+    points = random_points(graph, rng, queries)
+    results['nearest.kdtree'] = measure(find_nearest_node, [(lat, lon, graph) for lat, lon in points])
+
+    spatial_index = graph.spatial_index
+    graph.spatial_index = None
+    try:
+        results['nearest.linear'] = measure(
+            find_nearest_node, [(lat, lon, graph) for lat, lon in points[:LINEAR_SCAN_QUERIES]])
+    finally:
+        graph.spatial_index = spatial_index
+
+
+def bench_search(graph: Graph, rng: random.Random, queries: int,
+                 algorithms: List[str], results: Dict):
+    if 'ch' in algorithms:
+        from contraction import build_hierarchy
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph.hierarchy = build_hierarchy(graph, verbose=False)
+        results['preprocess.ch'] = summarize([time.perf_counter() - started])
+
+    if 'alt' in algorithms:
+        from landmarks import compute_landmark_table
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph.landmarks = compute_landmark_table(graph)
+        results['preprocess.alt'] = summarize([time.perf_counter() - started])
+
+    node_ids = graph.node_ids
+    pairs = [(node_ids[rng.randrange(graph.node_count)], node_ids[rng.randrange(graph.node_count)])
+             for _ in range(queries)]
+    for algorithm in algorithms:
+        results[f'search.{algorithm}'] = measure(
+            dijkstra, [(graph, start, end, algorithm) for start, end in pairs])
+
+
+def bench_tsp(graph: Graph, rng: random.Random, waypoint_counts: List[int], results: Dict):
+    node_ids = graph.node_ids
+    # Ara durak sayısı başına az sayıda tekrar (büyük örneklerde tek çağrı saniyeler sürer)
+    repeats = 3
+    for count in waypoint_counts:
+        arguments = []
+        for _ in range(repeats):
+            stops = [node_ids[rng.randrange(graph.node_count)] for _ in range(count + 2)]
+            arguments.append((graph, stops[0], stops[1:-1], stops[-1], TSP_TIME_LIMIT))
+        results[f'tsp.waypoints_{count}'] = measure(find_optimal_route_tsp, arguments)
+
+
+def bench_endpoints(graph: Graph, rng: random.Random, queries: int, results: Dict):
+    """Flask endpoint'lerinin test client ile uçtan uca gecikmesi"""
+    import app as app_module
+
+    previous = app_module.use_graph(graph)
+    app_module.route_cache.clear()
+    app_module.response_cache.clear()
+    client = app_module.app.test_client()
+
+    def post(url, body):
+        response = client.post(url, json=body)
+        response.get_data()
+
+    def get(url):
+        response = client.get(url)
+        response.get_data()
+
+    try:
+        points = random_points(graph, rng, queries * 2)
+        path_bodies = [
+            ({'start_lat': a[0], 'start_lon': a[1], 'end_lat': b[0], 'end_lon': b[1]},)
+            for a, b in zip(points[::2], points[1::2])
+        ]
+        results['endpoint.find_path'] = measure(lambda body: post('/api/find-path', body), path_bodies)
+        # Aynı istekler tekrarlandığında önbellek etkisi
+        results['endpoint.find_path_cached'] = measure(lambda body: post('/api/find-path', body), path_bodies)
+
+        tsp_bodies = []
+        for _ in range(max(1, queries // 10)):
+            stops = random_points(graph, rng, 7)
+            tsp_bodies.append(({
+                'start_lat': stops[0][0], 'start_lon': stops[0][1],
+                'waypoints': [{'lat': lat, 'lon': lon} for lat, lon in stops[1:-1]],
+                'end_lat': stops[-1][0], 'end_lon': stops[-1][1],
+                'time_limit': TSP_TIME_LIMIT
+            },))
+        results['endpoint.find_optimal_route'] = measure(
+            lambda body: post('/api/find-optimal-route', body), tsp_bodies)
+
+        results['endpoint.graph_stats'] = measure(lambda: get('/api/graph/stats'), [()] * queries)
+        results['endpoint.health'] = measure(lambda: get('/health'), [()] * queries)
+    finally:
+        app_module.registry = previous
+        app_module.route_cache.clear()
+        app_module.response_cache.clear()
+
+
+def compare(current: Dict, previous: Dict) -> List[str]:
+    """İki çalıştırmanın medyan sürelerini karşılaştırır"""
+    lines = []
+    for name, stats in current['results'].items():
+        old = previous.get('results', {}).get(name)
+        if old is None or not old['median_ms']:
+            continue
+        ratio = stats['median_ms'] / old['median_ms']
+        lines.append(f"{name:32s} {old['median_ms']:10.3f} -> {stats['median_ms']:10.3f} ms  (x{ratio:.2f})")
+    return lines
+
+
+def run(args) -> Dict:
+    rng = random.Random(args.seed)
+    results = {}
+
+    started = time.perf_counter()
+    data = generate_road_graph(args.nodes, args.seed)
+    generation_time = time.perf_counter() - started
+    print(f"🔧 Sentetik graph: {len(data['nodes'])} düğüm ({generation_time:.1f} sn)")
+
+    graph = bench_loading(data, results)
+    del data
+    print(f"   - Toplam kenar: {graph.edge_count}")
+
+    print("📏 En yakın düğüm ölçülüyor...")
+    bench_nearest(graph, rng, args.queries, results)
+
+    print(f"📏 Arama ölçülüyor: {', '.join(args.algorithms)}")
+    bench_search(graph, rng, args.queries, args.algorithms, results)
+
+    print(f"📏 TSP ölçülüyor: {', '.join(map(str, args.waypoints))} ara durak")
+    bench_tsp(graph, rng, args.waypoints, results)
+
+    if not args.skip_endpoints:
+        print("📏 Flask endpoint'leri ölçülüyor...")
+        bench_endpoints(graph, rng, args.queries, results)
+
+    return {
+        'meta': {
+            'seed': args.seed,
+            'nodes': graph.node_count,
+            'edges': graph.edge_count,
+            'queries': args.queries,
+            'algorithms': list(args.algorithms),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        },
+        'results': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Smart Route Navigator benchmark')
+    parser.add_argument('--nodes', type=int, default=DEFAULT_NODES, help='Yaklaşık düğüm sayısı')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Rastgelelik tohumu')
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES, help='Ölçüm başına sorgu sayısı')
+    parser.add_argument('--algorithms', default=','.join(DEFAULT_ALGORITHMS),
+                        help="Virgülle ayrılmış: dijkstra,astar,bidirectional,ch,alt")
+    parser.add_argument('--waypoints', default=','.join(map(str, DEFAULT_WAYPOINT_COUNTS)),
+                        help='TSP için virgülle ayrılmış ara durak sayıları')
+    parser.add_argument('--skip-endpoints', action='store_true', help="Flask ölçümlerini atla")
+    parser.add_argument('--output', help='Sonuç JSON dosyası (verilmezse stdout)')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki sonuç JSON dosyası')
+    parser.add_argument('--shape-points', type=int, default=0,
+                        help='Yol başına en fazla ara nokta (sadeleştirme denemeleri için)')
+    parser.add_argument('--save-graph', help='Sadece sentetik graph\'ı bu dosyaya yaz ve çık')
+    args = parser.parse_args()
+
+    if args.save_graph:
+        data = generate_road_graph(args.nodes, args.seed, args.shape_points)
+        with open(args.save_graph, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        print(f"💾 {len(data['nodes'])} düğümlü graph kaydedildi: {args.save_graph}")
+        return
+
+    args.algorithms = [name for name in args.algorithms.split(',') if name]
+    args.waypoints = [int(count) for count in args.waypoints.split(',') if count]
+
+    report = run(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"💾 Sonuçlar kaydedildi: {args.output}")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"\n📊 Karşılaştırma (medyan): {args.compare}")
+        for line in compare(report, previous):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
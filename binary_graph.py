@@ -0,0 +1,248 @@
+"""
+Binary Graph - Hızlı yüklenen, bellek eşlemeli (mmap) graph dosyası
+CENG 3511 - Artificial Intelligence Final Project
+
+mugla_full.json bir kez ikili biçime çevrilir; sunucu bu dosyayı mmap
+ile açar. Diziler doğrudan dosya sayfalarına bakan memoryview'lerdir,
+bu yüzden aynı dosyayı açan tüm process'ler sayfaları paylaşır ve
+JSON ayrıştırma maliyeti ortadan kalkar.
+
+Dosya düzeni (little-endian, bölümler 8 byte hizalı):
+    başlık:  MAGIC, sürüm, düğüm sayısı, kenar sayısı, ID blob boyutu
+    lat      float64 x n
+    lon      float64 x n
+    offsets  int64   x (n + 1)     CSR satır başlangıçları
+    targets  int32   x m
+    weights  float64 x m
+    id_offsets int64 x (n + 1)     ID tablosu
+    id_blob  UTF-8 (sıralı düğüm ID'leri art arda)
+
+Sadeleştirilmiş graph'larda (simplify.py) ardından isteğe bağlı şekil bölümü:
+    SHAPE_MAGIC, ara nokta sayısı s, şekil ID blob boyutu
+    shape_offsets    int64   x (m + 1)   kenar başına ara nokta aralığı
+    shape_lat        float64 x s
+    shape_lon        float64 x s
+    shape_id_offsets int64   x (s + 1)
+    shape_id_blob    UTF-8
+Bölüm yoksa dosya eski okuyucularla da açılır.
+
+Kullanım:
+    python binary_graph.py mugla_full.json
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterator, Optional
+
+from dijkstra import Graph
+
+# Dosya başlığı: sihirli değer + sürüm
+GRAPH_MAGIC = b'MUGLAGR\0'
+GRAPH_VERSION = 1
+
+# sürüm, bayt sırası işareti, düğüm sayısı, kenar sayısı, ID blob boyutu
+_HEADER = struct.Struct('<IIqqq')
+_BYTE_ORDER_MARK = 0x01020304
+
+# İsteğe bağlı kenar şekli bölümü: sihirli değer + (ara nokta sayısı, ID blob boyutu)
+SHAPE_MAGIC = b'MUGLASH\0'
+_SHAPE_HEADER = struct.Struct('<qq')
+
+
+def binary_path_for(graph_path: str) -> str:
+    """mugla_full.json -> mugla_full.graph"""
+    return os.path.splitext(graph_path)[0] + '.graph'
+
+
+def _padding(size: int) -> int:
+    return (-size) % 8
+
+
+class StringTable:
+    """mmap üzerindeki ID tablosuna liste gibi erişim (kopyalamadan)"""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        start = self._offsets[index]
+        end = self._offsets[index + 1]
+        return bytes(self._blob[start:end]).decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIdIndex:
+    """
+    Sıralı ID tablosu üzerinde ikili arama ile ID -> indeks eşlemesi
+
+    Graph düğüm ID'lerini sıralı tuttuğu için dict kurmaya gerek yoktur;
+    böylece eşleme de process'ler arasında paylaşılan sayfalarda kalır.
+    """
+
+    def __init__(self, table: StringTable):
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def get(self, node_id: str, default: Optional[int] = None) -> Optional[int]:
+        if not isinstance(node_id, str):
+            return default
+        i = bisect_left(self._table, node_id)
+        if i < len(self._table) and self._table[i] == node_id:
+            return i
+        return default
+
+    def __contains__(self, node_id) -> bool:
+        return self.get(node_id) is not None
+
+    def __getitem__(self, node_id: str) -> int:
+        index = self.get(node_id)
+        if index is None:
+            raise KeyError(node_id)
+        return index
+
+
+def _encode_ids(ids):
+    """ID listesi -> (ofsetler, UTF-8 blob)"""
+    encoded_ids = [node_id.encode('utf-8') for node_id in ids]
+    id_offsets = [0]
+    for encoded in encoded_ids:
+        id_offsets.append(id_offsets[-1] + len(encoded))
+    return id_offsets, b''.join(encoded_ids)
+
+
+def write_binary_graph(graph: Graph, path: str):
+    """Graph'ı ikili biçimde yazar"""
+    if sys.byteorder != 'little':
+        raise ValueError("İkili graph biçimi little-endian makine gerektirir")
+
+    id_offsets, id_blob = _encode_ids(graph.node_ids)
+
+    n = graph.node_count
+    m = graph.edge_count
+
+    def section(f, data: bytes):
+        f.write(data)
+        f.write(b'\0' * _padding(len(data)))
+
+    with open(path, 'wb') as f:
+        f.write(GRAPH_MAGIC)
+        f.write(_HEADER.pack(GRAPH_VERSION, _BYTE_ORDER_MARK, n, m, id_offsets[-1]))
+        section(f, array('d', graph.lat).tobytes())
+        section(f, array('d', graph.lon).tobytes())
+        section(f, array('q', graph.offsets).tobytes())
+        section(f, array('i', graph.targets).tobytes())
+        section(f, array('d', graph.weights).tobytes())
+        section(f, array('q', id_offsets).tobytes())
+        section(f, id_blob)
+
+        if graph.shapes is not None:
+            shape_offsets, shape_ids, shape_lat, shape_lon = graph.shapes
+            shape_id_offsets, shape_id_blob = _encode_ids(shape_ids)
+            f.write(SHAPE_MAGIC)
+            f.write(_SHAPE_HEADER.pack(len(shape_lat), shape_id_offsets[-1]))
+            section(f, array('q', shape_offsets).tobytes())
+            section(f, array('d', shape_lat).tobytes())
+            section(f, array('d', shape_lon).tobytes())
+            section(f, array('q', shape_id_offsets).tobytes())
+            section(f, shape_id_blob)
+
+
+def load_binary_graph(path: str) -> Graph:
+    """
+    İkili graph dosyasını mmap ile açar
+
+    Raises:
+        ValueError: Dosya biçimi, sürümü veya bayt sırası uyuşmuyorsa
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if bytes(view[:len(GRAPH_MAGIC)]) != GRAPH_MAGIC:
+        raise ValueError(f"{path} geçerli bir graph dosyası değil")
+
+    position = len(GRAPH_MAGIC)
+    version, byte_order, n, m, blob_size = _HEADER.unpack_from(view, position)
+    if version != GRAPH_VERSION:
+        raise ValueError(f"Desteklenmeyen graph sürümü: {version}")
+
+    # Diziler yerel bayt sırasıyla okunur; little-endian olmayan makinede kullanılamaz
+    if byte_order != _BYTE_ORDER_MARK or sys.byteorder != 'little':
+        raise ValueError(f"{path} bu makinenin bayt sırasıyla uyumlu değil")
+
+    position += _HEADER.size
+    position += _padding(position)
+
+    def take(count: int, itemsize: int, fmt: Optional[str]) -> memoryview:
+        nonlocal position
+        size = count * itemsize
+        if position + size > len(view):
+            raise ValueError(f"{path} eksik veya bozuk")
+        part = view[position:position + size]
+        position += size + _padding(size)
+        return part.cast(fmt) if fmt else part
+
+    lat = take(n, 8, 'd')
+    lon = take(n, 8, 'd')
+    offsets = take(n + 1, 8, 'q')
+    targets = take(m, 4, 'i')
+    weights = take(m, 8, 'd')
+    id_offsets = take(n + 1, 8, 'q')
+    blob = take(blob_size, 1, None)
+
+    node_ids = StringTable(id_offsets, blob)
+    graph = Graph.from_arrays(node_ids, lat, lon, offsets, targets, weights,
+                              node_index=SortedIdIndex(node_ids))
+
+    if bytes(view[position:position + len(SHAPE_MAGIC)]) == SHAPE_MAGIC:
+        position += len(SHAPE_MAGIC)
+        if position + _SHAPE_HEADER.size > len(view):
+            raise ValueError(f"{path} eksik veya bozuk")
+        point_count, shape_blob_size = _SHAPE_HEADER.unpack_from(view, position)
+        position += _SHAPE_HEADER.size
+        shape_offsets = take(m + 1, 8, 'q')
+        shape_lat = take(point_count, 8, 'd')
+        shape_lon = take(point_count, 8, 'd')
+        shape_id_offsets = take(point_count + 1, 8, 'q')
+        shape_ids = StringTable(shape_id_offsets, take(shape_blob_size, 1, None))
+        graph.shapes = (shape_offsets, shape_ids, shape_lat, shape_lon)
+
+    # mmap, memoryview'ler yaşadığı sürece açık kalmalı
+    graph.storage = mapped
+    return graph
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    graph_path = sys.argv[1] if len(sys.argv) > 1 else 'mugla_full.json'
+    output_path = binary_path_for(graph_path)
+
+    print(f"🔧 İkili graph dönüştürme: {graph_path}")
+    started = time.perf_counter()
+    with open(graph_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    graph = Graph(data['nodes'], data['edges'])
+    write_binary_graph(graph, output_path)
+    print(f"✅ {graph.node_count} düğüm, {graph.edge_count} kenar "
+          f"({time.perf_counter() - started:.1f} sn)")
+    print(f"💾 İkili graph kaydedildi: {output_path}")
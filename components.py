@@ -0,0 +1,178 @@
+"""
+Components - Güçlü ve zayıf bağlı bileşenler (ulaşılamaz sorguların erken reddi)
+CENG 3511 - Artificial Intelligence Final Project
+
+OSM kesitlerinde ana yol ağına bağlı olmayan küçük parçalar bulunur.
+Farklı parçalardaki iki düğüm arasında arama, kaynağın ulaşabildiği
+bölgenin tamamını gezdikten sonra başarısız olur. Bileşenler yükleme
+sırasında bir kez hesaplanır ve bu tür sorgular O(1)'de reddedilir:
+    - Zayıf bileşenleri farklı olan düğümler arasında yol yoktur
+    - Ana bileşen (en büyük güçlü bileşen) M ise: M'ye ulaşabilen bir
+      düğüme ulaşan da M'ye ulaşır, M'den ulaşılan bir düğümden ulaşılan
+      da M'den ulaşılır; bu iki özelliği bozan çiftler arasında yol yoktur
+
+Bileşenler ağırlıklara değil topolojiye göre hesaplanır (kapalı yollar
+da kenar sayılır): kapanmalar sadece yol kaldırdığı için red kararları
+canlı güncellemelerden sonra da doğrudur, bileşenler yeniden hesaplanmaz.
+"""
+
+from array import array
+from typing import Dict
+
+from dijkstra import Graph
+
+
+def _strong_components(offsets, targets, n: int) -> array:
+    """Özyinelemesiz Tarjan algoritması; düğüm -> güçlü bileşen numarası"""
+    index = [-1] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    component = array('i', [-1]) * n
+    stack = []
+    counter = 0
+    count = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # (düğüm, sıradaki kenar konumu)
+        work = [(root, offsets[root])]
+
+        while work:
+            v, k = work[-1]
+            end = offsets[v + 1]
+            descended = False
+            while k < end:
+                w = targets[k]
+                k += 1
+                if index[w] == -1:
+                    work[-1] = (v, k)
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append((w, offsets[w]))
+                    descended = True
+                    break
+                if on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = count
+                    if w == v:
+                        break
+                count += 1
+
+    return component
+
+
+def _mark_reachable(offsets, neighbors, seeds, n: int) -> bytearray:
+    """seeds'ten (verilen yönde) ulaşılan düğümler"""
+    reached = bytearray(n)
+    queue = list(seeds)
+    for node in queue:
+        reached[node] = 1
+    while queue:
+        node = queue.pop()
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[k]
+            if not reached[neighbor]:
+                reached[neighbor] = 1
+                queue.append(neighbor)
+    return reached
+
+
+class ConnectedComponents:
+    """
+    Düğüm başına bileşen numaraları ve ana bileşene göre ulaşılabilirlik
+
+    Attributes:
+        strong: Düğüm -> güçlü bileşen numarası
+        weak: Düğüm -> zayıf bileşen numarası
+        main: Ana (en büyük) güçlü bileşenin numarası
+        in_main: Ana bileşendeki düğümler (en yakın düğüm maskesi)
+        reaches_main: Ana bileşene yol olan düğümler
+        reached_from_main: Ana bileşenden yol olan düğümler
+    """
+
+    def __init__(self, graph: Graph):
+        n = graph.node_count
+        offsets = graph.offsets
+        targets = graph.targets
+        rev_offsets, rev_sources, _ = graph.get_reverse_arrays()
+
+        self.strong = _strong_components(offsets, targets, n)
+        self.strong_count = max(self.strong) + 1 if n else 0
+
+        # Zayıf bileşenler: kenar yönleri yok sayılarak BFS
+        weak = array('i', [-1]) * n
+        count = 0
+        for root in range(n):
+            if weak[root] != -1:
+                continue
+            weak[root] = count
+            queue = [root]
+            while queue:
+                node = queue.pop()
+                for arrays in ((offsets, targets), (rev_offsets, rev_sources)):
+                    node_offsets, neighbors = arrays
+                    for k in range(node_offsets[node], node_offsets[node + 1]):
+                        neighbor = neighbors[k]
+                        if weak[neighbor] == -1:
+                            weak[neighbor] = count
+                            queue.append(neighbor)
+            count += 1
+        self.weak = weak
+        self.weak_count = count
+
+        sizes = [0] * self.strong_count
+        for component in self.strong:
+            sizes[component] += 1
+        self.main = max(range(self.strong_count), key=sizes.__getitem__) if n else -1
+        self.main_size = sizes[self.main] if n else 0
+
+        main_nodes = [node for node in range(n) if self.strong[node] == self.main]
+        self.in_main = bytearray(n)
+        for node in main_nodes:
+            self.in_main[node] = 1
+        self.reached_from_main = _mark_reachable(offsets, targets, main_nodes, n)
+        self.reaches_main = _mark_reachable(rev_offsets, rev_sources, main_nodes, n)
+
+    def unreachable(self, source: int, target: int) -> bool:
+        """
+        source'tan target'a yol olmadığı kesinse True
+
+        False "yol var" demek değildir; sadece bileşenlerden karar
+        verilemez ve arama yapılmalıdır.
+        """
+        if self.weak[source] != self.weak[target]:
+            return True
+        if self.strong[source] == self.strong[target]:
+            return False
+        if self.reaches_main[target] and not self.reaches_main[source]:
+            return True
+        return bool(self.reached_from_main[source] and not self.reached_from_main[target])
+
+    def summary(self) -> Dict:
+        """API için özet (bileşen sayıları ve ana bileşen oranı)"""
+        n = len(self.strong)
+        return {
+            'strong': self.strong_count,
+            'weak': self.weak_count,
+            'main_size': self.main_size,
+            'main_share': round(self.main_size / n, 4) if n else 0.0
+        }
@@ -0,0 +1,452 @@
+"""
+Contraction Hierarchies - Ön işlemeli hızlı en kısa yol sorguları
+CENG 3511 - Artificial Intelligence Final Project
+
+Çevrimdışı adım düğümleri önem sırasına göre "daraltır" ve korunması
+gereken en kısa yollar için kısayol (shortcut) kenarları ekler. Sonuç
+hiyerarşi mugla_full.json'un yanına mugla_full.ch olarak yazılır.
+
+Kullanım:
+    python contraction.py mugla_full.json
+"""
+
+import heapq
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from dijkstra import Graph, graph_fingerprint
+
+# Dosya başlığı: sihirli değer + sürüm
+CH_MAGIC = b'MUGLACH\0'
+CH_VERSION = 1
+
+# Witness (tanık) aramasında en fazla kesinleşecek düğüm sayısı
+WITNESS_SETTLE_LIMIT = 200
+
+# Dosyadaki dizilerin sırası ve tipleri
+_ARRAY_LAYOUT = (
+    ('rank', 'i'),
+    ('up_offsets', 'q'), ('up_targets', 'i'), ('up_weights', 'd'), ('up_middle', 'i'),
+    ('down_offsets', 'q'), ('down_sources', 'i'), ('down_weights', 'd'), ('down_middle', 'i'),
+)
+
+
+def hierarchy_path_for(graph_path: str) -> str:
+    """mugla_full.json -> mugla_full.ch"""
+    return os.path.splitext(graph_path)[0] + '.ch'
+
+
+class ContractionHierarchy:
+    """
+    Daraltılmış graph üzerinde sorgu motoru
+
+    up_*: her düğümden daha yüksek sıralı düğümlere giden kenarlar
+          (ileri arama bunları kullanır)
+    down_*: her düğüme daha yüksek sıralı düğümlerden gelen kenarlar
+            (geri arama bunları ters yönde kullanır)
+    *_middle: kısayolun üzerinden geçtiği düğüm (-1 = orijinal kenar)
+    """
+
+    def __init__(self, graph: Graph, arrays: Dict[str, array]):
+        self.graph = graph
+        for name, _ in _ARRAY_LAYOUT:
+            setattr(self, name, arrays[name])
+
+        # Kısayol açma için (u, v) -> orta düğüm
+        n = graph.node_count
+        self._middle = {}
+        for offsets, others, middles, upward in (
+                (self.up_offsets, self.up_targets, self.up_middle, True),
+                (self.down_offsets, self.down_sources, self.down_middle, False)):
+            for u in range(n):
+                for k in range(offsets[u], offsets[u + 1]):
+                    middle = middles[k]
+                    if middle >= 0:
+                        a, b = (u, others[k]) if upward else (others[k], u)
+                        self._middle[a * n + b] = middle
+
+    @property
+    def shortcut_count(self) -> int:
+        return len(self._middle)
+
+    def save(self, path: str):
+        """Hiyerarşiyi ikili dosyaya yazar"""
+        with open(path, 'wb') as f:
+            f.write(CH_MAGIC)
+            f.write(struct.pack('<IIqQ', CH_VERSION, self.graph.node_count,
+                                self.graph.edge_count, graph_fingerprint(self.graph)))
+            for name, _ in _ARRAY_LAYOUT:
+                values = getattr(self, name)
+                f.write(struct.pack('<q', len(values)))
+                values.tofile(f)
+
+    @classmethod
+    def load(cls, path: str, graph: Graph) -> 'ContractionHierarchy':
+        """
+        Hiyerarşiyi dosyadan yükler
+
+        Raises:
+            ValueError: Dosya biçimi veya graph uyuşmuyorsa
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(CH_MAGIC)) != CH_MAGIC:
+                raise ValueError(f"{path} geçerli bir CH dosyası değil")
+
+            version, node_count, edge_count, fingerprint = struct.unpack('<IIqQ', f.read(24))
+            if version != CH_VERSION:
+                raise ValueError(f"Desteklenmeyen CH sürümü: {version}")
+            if (node_count, edge_count) != (graph.node_count, graph.edge_count) \
+                    or fingerprint != graph_fingerprint(graph):
+                raise ValueError(f"{path} bu graph için üretilmemiş, yeniden oluşturun")
+
+            arrays = {}
+            for name, typecode in _ARRAY_LAYOUT:
+                (length,) = struct.unpack('<q', f.read(8))
+                values = array(typecode)
+                values.fromfile(f, length)
+                arrays[name] = values
+
+        return cls(graph, arrays)
+
+    def _upward_search(self, offsets, neighbors, weights, source: int,
+                       stats: Optional[Dict] = None) -> Dict[int, float]:
+        """Tek yönde, yalnızca yukarı kenarlarla tam arama (bucket tablosu için)"""
+        distances = {source: 0}
+        pq = [(0, source)]
+        settled = set()
+        pushed = 1
+
+        while pq:
+            current_distance, current = heapq.heappop(pq)
+            if current in settled:
+                continue
+            settled.add(current)
+
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[k]
+                new_distance = current_distance + weights[k]
+                if new_distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(pq, (new_distance, neighbor))
+                    pushed += 1
+
+        if stats is not None:
+            stats['settled'] = stats.get('settled', 0) + len(settled)
+            stats['pushed'] = stats.get('pushed', 0) + pushed
+        return distances
+
+    def query(self, source: int, target: int,
+              stats: Optional[Dict] = None) -> Tuple[Optional[List[int]], float]:
+        """
+        Çift yönlü yukarı arama ile en kısa yol
+
+        Returns:
+            (kısayolları açılmış indeks yolu veya None, mesafe)
+        """
+        inf = float('inf')
+        if source == target:
+            if stats is not None:
+                stats['settled'] = 1
+                stats['pushed'] = 1
+            return [source], 0
+
+        # Her yön için: (offsets, komşular, ağırlıklar, mesafeler, önceki, kesinleşen, kuyruk)
+        forward = (self.up_offsets, self.up_targets, self.up_weights,
+                   {source: 0}, {source: -1}, set(), [(0, source)])
+        backward = (self.down_offsets, self.down_sources, self.down_weights,
+                    {target: 0}, {target: -1}, set(), [(0, target)])
+
+        best = inf
+        meeting = -1
+        settled = 0
+        pushed = 2
+
+        while True:
+            # Anahtarı en iyi yoldan küçük olan kuyruklar hâlâ aktiftir
+            active = [side for side in (forward, backward) if side[6] and side[6][0][0] < best]
+            if not active:
+                break
+            side = min(active, key=lambda s: s[6][0][0])
+            other = backward if side is forward else forward
+
+            offsets, neighbors, weights, distances, previous, done, pq = side
+            other_distances = other[3]
+
+            current_distance, current = heapq.heappop(pq)
+            if current in done:
+                continue
+            done.add(current)
+            settled += 1
+
+            if current in other_distances:
+                total = current_distance + other_distances[current]
+                if total < best:
+                    best = total
+                    meeting = current
+
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[k]
+                new_distance = current_distance + weights[k]
+                if new_distance < distances.get(neighbor, inf):
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current
+                    heapq.heappush(pq, (new_distance, neighbor))
+                    pushed += 1
+
+        if stats is not None:
+            stats['settled'] = settled
+            stats['pushed'] = pushed
+
+        if meeting < 0:
+            return None, inf
+
+        # Hiyerarşideki yol: kaynak -> buluşma -> hedef
+        up_path = []
+        current = meeting
+        while current != -1:
+            up_path.append(current)
+            current = forward[4][current]
+        up_path.reverse()
+
+        current = backward[4][meeting]
+        while current != -1:
+            up_path.append(current)
+            current = backward[4][current]
+
+        return self.unpack(up_path), best
+
+    def unpack(self, path: List[int]) -> List[int]:
+        """Kısayol kenarlarını orijinal düğüm dizisine açar"""
+        n = self.graph.node_count
+        middle_of = self._middle
+        result = [path[0]]
+
+        # Açılacak kenarlar yığını (ters sırada)
+        stack = [(path[i], path[i + 1]) for i in range(len(path) - 2, -1, -1)]
+        while stack:
+            u, v = stack.pop()
+            middle = middle_of.get(u * n + v)
+            if middle is None:
+                result.append(v)
+            else:
+                stack.append((middle, v))
+                stack.append((u, middle))
+
+        return result
+
+    def distance_table(self, sources: List[int], targets: List[int]) -> List[List[float]]:
+        """
+        Bucket tabanlı çoktan çoğa mesafe tablosu
+
+        Her hedef için bir geri arama, her kaynak için bir ileri arama
+        yapılır; buluşmalar düğüm başına tutulan kovalarda (bucket) bulunur.
+
+        Returns:
+            sources x targets mesafe matrisi (ulaşılamazsa inf)
+        """
+        inf = float('inf')
+        buckets = {}
+        for column, target in enumerate(targets):
+            distances = self._upward_search(self.down_offsets, self.down_sources,
+                                            self.down_weights, target)
+            for node, distance in distances.items():
+                buckets.setdefault(node, []).append((column, distance))
+
+        table = []
+        for source in sources:
+            row = [inf] * len(targets)
+            distances = self._upward_search(self.up_offsets, self.up_targets,
+                                            self.up_weights, source)
+            for node, distance in distances.items():
+                for column, back_distance in buckets.get(node, ()):
+                    total = distance + back_distance
+                    if total < row[column]:
+                        row[column] = total
+            table.append(row)
+
+        return table
+
+
+def _witness_search(out_edges: List[Dict], source: int, excluded: int, goals: set,
+                    limit: float, contracted: bytearray) -> Dict[int, float]:
+    """
+    Daraltılmamış düğümler üzerinde excluded'ı atlayan sınırlı Dijkstra
+
+    Tüm hedefler (goals) kesinleştiğinde, mesafe sınırı aşıldığında veya
+    WITNESS_SETTLE_LIMIT düğüm kesinleştiğinde durur.
+    """
+    distances = {source: 0}
+    pq = [(0, source)]
+    settled = 0
+    remaining = len(goals)
+
+    while pq and settled < WITNESS_SETTLE_LIMIT:
+        current_distance, current = heapq.heappop(pq)
+        if current_distance > distances[current]:
+            continue
+        if current_distance > limit:
+            break
+        settled += 1
+
+        if current in goals:
+            remaining -= 1
+            if not remaining:
+                break
+
+        for neighbor, (weight, _) in out_edges[current].items():
+            if neighbor == excluded or contracted[neighbor]:
+                continue
+            new_distance = current_distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                heapq.heappush(pq, (new_distance, neighbor))
+
+    return distances
+
+
+def _needed_shortcuts(out_edges: List[Dict], in_edges: List[Dict], node: int,
+                      contracted: bytearray) -> List[Tuple[int, int, float]]:
+    """node daraltılırsa eklenmesi gereken (u, w, ağırlık) kısayolları"""
+    shortcuts = []
+    outgoing = [(w, weight) for w, (weight, _) in out_edges[node].items() if not contracted[w]]
+    if not outgoing:
+        return shortcuts
+
+    max_out = max(weight for _, weight in outgoing)
+    goals = {w for w, _ in outgoing}
+
+    for u, (in_weight, _) in in_edges[node].items():
+        if contracted[u]:
+            continue
+        witness = _witness_search(out_edges, u, node, goals - {u}, in_weight + max_out, contracted)
+        for w, out_weight in outgoing:
+            if w == u:
+                continue
+            via = in_weight + out_weight
+            if witness.get(w, float('inf')) > via:
+                shortcuts.append((u, w, via))
+
+    return shortcuts
+
+
+def build_hierarchy(graph: Graph, verbose: bool = True) -> ContractionHierarchy:
+    """
+    Düğümleri sıralayıp kısayolları ekleyerek hiyerarşiyi oluşturur
+
+    Sıralama önceliği: kenar farkı (eklenen kısayol - kaldırılan kenar)
+    + daraltılmış komşu sayısı. Öncelikler tembel (lazy) güncellenir.
+    """
+    n = graph.node_count
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    # Dinamik komşuluk: komşu -> (ağırlık, orta düğüm)
+    out_edges = [dict() for _ in range(n)]
+    in_edges = [dict() for _ in range(n)]
+    for u in range(n):
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if u == v:
+                continue
+            weight = weights[k]
+            if weight < out_edges[u].get(v, (float('inf'), -1))[0]:
+                out_edges[u][v] = (weight, -1)
+                in_edges[v][u] = (weight, -1)
+
+    contracted = bytearray(n)
+    deleted_neighbors = [0] * n
+
+    def priority(node: int) -> int:
+        shortcuts = _needed_shortcuts(out_edges, in_edges, node, contracted)
+        removed = len(out_edges[node]) + len(in_edges[node])
+        return len(shortcuts) - removed + deleted_neighbors[node]
+
+    started = time.perf_counter()
+    pq = [(priority(v), v) for v in range(n)]
+    heapq.heapify(pq)
+
+    rank = array('i', bytes(4 * n))
+    up_edges = [None] * n
+    down_edges = [None] * n
+    next_rank = 0
+
+    while pq:
+        _, node = heapq.heappop(pq)
+        if contracted[node]:
+            continue
+
+        # Tembel güncelleme: öncelik değiştiyse geri koy
+        current_priority = priority(node)
+        if pq and current_priority > pq[0][0]:
+            heapq.heappush(pq, (current_priority, node))
+            continue
+
+        for u, w, weight in _needed_shortcuts(out_edges, in_edges, node, contracted):
+            if weight < out_edges[u].get(w, (float('inf'), -1))[0]:
+                out_edges[u][w] = (weight, node)
+                in_edges[w][u] = (weight, node)
+
+        # Kalan kenarlar daha yüksek sıralı düğümlere gider
+        up_edges[node] = [(w, weight, middle) for w, (weight, middle) in out_edges[node].items()
+                          if not contracted[w]]
+        down_edges[node] = [(u, weight, middle) for u, (weight, middle) in in_edges[node].items()
+                            if not contracted[u]]
+
+        neighbors = [v for v in set(out_edges[node]) | set(in_edges[node]) if not contracted[v]]
+        for neighbor in neighbors:
+            deleted_neighbors[neighbor] += 1
+            out_edges[neighbor].pop(node, None)
+            in_edges[neighbor].pop(node, None)
+
+        contracted[node] = 1
+        rank[node] = next_rank
+        next_rank += 1
+
+        if verbose and next_rank % 10000 == 0:
+            print(f"   - {next_rank}/{n} düğüm daraltıldı ({time.perf_counter() - started:.1f} sn)")
+
+    arrays = {'rank': rank}
+    for prefix, other_name, edge_lists in (('up', 'targets', up_edges), ('down', 'sources', down_edges)):
+        edge_offsets = array('q', [0])
+        others = array('i')
+        edge_weights = array('d')
+        middles = array('i')
+        for node in range(n):
+            for other, weight, middle in edge_lists[node]:
+                others.append(other)
+                edge_weights.append(weight)
+                middles.append(middle)
+            edge_offsets.append(len(others))
+        arrays[f'{prefix}_offsets'] = edge_offsets
+        arrays[f'{prefix}_{other_name}'] = others
+        arrays[f'{prefix}_weights'] = edge_weights
+        arrays[f'{prefix}_middle'] = middles
+
+    hierarchy = ContractionHierarchy(graph, arrays)
+    if verbose:
+        print(f"✅ Hiyerarşi oluşturuldu: {hierarchy.shortcut_count} kısayol, "
+              f"{time.perf_counter() - started:.1f} sn")
+    return hierarchy
+
+
+if __name__ == "__main__":
+    import json
+
+    graph_path = sys.argv[1] if len(sys.argv) > 1 else 'mugla_full.json'
+    output_path = hierarchy_path_for(graph_path)
+
+    print(f"🔧 CH ön işleme: {graph_path}")
+    with open(graph_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    graph = Graph(data['nodes'], data['edges'])
+    print(f"   - Toplam düğüm: {graph.node_count}")
+
+    hierarchy = build_hierarchy(graph)
+    hierarchy.save(output_path)
+    print(f"💾 Hiyerarşi kaydedildi: {output_path}")
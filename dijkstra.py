@@ -3,40 +3,482 @@ Dijkstra's Shortest Path Algorithm Implementation
 CENG 3511 - Artificial Intelligence Final Project
 """
 
+import contextlib
 import heapq
+import itertools
 import math
-from typing import Dict, List, Tuple, Optional
+import os
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
+
+import metrics
+from route_cache import MISSING
+from tsp_solver import DEFAULT_TIME_LIMIT, HELD_KARP_LIMIT, anytime_tsp, solve_path_tsp
+
+# dijkstra() için seçilebilir arama algoritmaları
+ALGORITHMS = ('dijkstra', 'astar', 'bidirectional', 'ch', 'alt')
+
+# Her Graph örneğine verilen sürüm numaraları (önbellek anahtarları için)
+_graph_versions = itertools.count(1)
+
+# Havuzda bekletilen en fazla arama çalışma alanı (her biri düğüm sayısı
+# uzunluğunda dört liste tutar)
+WORKSPACE_POOL_SIZE = 8
 
 
 class Graph:
-    """Graph sınıfı - Düğümler ve kenarları tutar"""
+    """Graph sınıfı - Düğümler ve kenarları tutar
+
+    Veriler dahili olarak CSR (compressed sparse row) düzeninde saklanır:
+    düğümler tamsayı indeksleriyle temsil edilir, komşuluklar ardışık
+    offset/target/weight dizilerinde, koordinatlar ise float dizilerinde
+    tutulur. String ID'ler sadece API sınırında indekse çevrilir.
+    """
     
     def __init__(self, nodes: Dict, edges: Dict):
         """
         Args:
             nodes: {node_id: {lat: float, lon: float}}
             edges: {node_id: [{node: str, weight: float}]}
+                Sadeleştirilmiş graph'larda (simplify.py) kenar ayrıca
+                'shape': [[id, lat, lon], ...] ara noktalarını taşıyabilir
+        """
+        # ID'ler sıralanır; böylece indeks karşılaştırması string
+        # karşılaştırmasıyla aynı sonucu verir (heap eşitlik durumları)
+        node_ids = sorted(nodes)
+        node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        
+        lat = array('d', (nodes[node_id]['lat'] for node_id in node_ids))
+        lon = array('d', (nodes[node_id]['lon'] for node_id in node_ids))
+        
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        
+        # Kenar şekilleri (ara noktalar); sadece dosyada varsa tutulur
+        shape_offsets = array('q', [0])
+        shape_ids = []
+        shape_lat = array('d')
+        shape_lon = array('d')
+        
+        for node_id in node_ids:
+            for neighbor in edges.get(node_id, ()):
+                target = node_index.get(neighbor['node'])
+                # Düğüm listesinde olmayan komşular atlanır
+                if target is None:
+                    continue
+                targets.append(target)
+                weights.append(float(neighbor['weight']))
+                for point_id, point_lat, point_lon in neighbor.get('shape', ()):
+                    shape_ids.append(point_id)
+                    shape_lat.append(point_lat)
+                    shape_lon.append(point_lon)
+                shape_offsets.append(len(shape_ids))
+            offsets.append(len(targets))
+        
+        self._set_arrays(node_ids, node_index, lat, lon, offsets, targets, weights)
+        if shape_ids:
+            self.shapes = (shape_offsets, shape_ids, shape_lat, shape_lon)
+    
+    @classmethod
+    def from_arrays(cls, node_ids: List[str], lat, lon, offsets, targets, weights,
+                    node_index=None) -> 'Graph':
+        """
+        Hazır CSR dizilerinden Graph oluşturur (dict dönüşümü yapmadan)
+        
+        node_ids sıralı olmalıdır. node_index verilmezse dict olarak kurulur;
+        get/__contains__/__getitem__ destekleyen herhangi bir eşleme olabilir.
         """
-        self.nodes = nodes
-        self.edges = edges
+        graph = cls.__new__(cls)
+        if node_index is None:
+            node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        graph._set_arrays(node_ids, node_index, lat, lon, offsets, targets, weights)
+        return graph
+    
+    def _set_arrays(self, node_ids, node_index, lat, lon, offsets, targets, weights):
+        self.node_ids = node_ids
+        self.node_index = node_index
+        self.lat = lat
+        self.lon = lon
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.spatial_index = None
+        
+        # Sadeleştirilmiş graph'ta kenar başına ara noktalar (simplify.py):
+        # (offsets, ids, lat, lon) - k kenarının noktaları offsets[k]:offsets[k+1]
+        # aralığındadır; None = her kenar düz çizgi
+        self.shapes = None
+        
+        # Önbellek anahtarlarında kullanılır; graph değişince yeni sürüm alır
+        self.version = next(_graph_versions)
+        
+        # Dizilerin baktığı tampon (ör. mmap); dizilerle birlikte yaşamalı
+        self.storage = None
+        self._reverse = None
+        self._heuristic_scale = None
+        
+        # Bağlı bileşenler (components.py); ulaşılamaz sorguları erken reddeder
+        self.components = None
+        
+        # Yüklenmiş Contraction Hierarchies motoru (contraction.py)
+        self.hierarchy = None
+        
+        # Yüklenmiş ALT landmark tabloları (landmarks.py)
+        self.landmarks = None
+        
+        # Canlı ağırlık güncellemeleri (edge_updates.py): ön işlemenin yapıldığı
+        # ağırlıklar ve bunlardan sapan (kaynak, hedef) -> ağırlık çiftleri
+        self.base_weights = weights
+        self.weight_overrides = {}
+        
+        # Ağırlıklar temel değerlerden saparken geçersiz olan CH (sapma kalkınca geri gelir)
+        self.suspended_hierarchy = None
+    
+    def build_spatial_index(self):
+        """En yakın düğüm sorguları için KD-tree oluşturur"""
+        from spatial_index import SpatialIndex
+        self.spatial_index = SpatialIndex(self.lat, self.lon)
+        return self.spatial_index
+    
+    def build_components(self):
+        """Güçlü/zayıf bağlı bileşenleri hesaplar (topolojiye göre, bir kez)"""
+        from components import ConnectedComponents
+        self.components = ConnectedComponents(self)
+        return self.components
+    
+    def get_reverse_arrays(self) -> Tuple[array, array, array]:
+        """
+        Ters yönlü CSR dizilerini döndürür (ilk çağrıda oluşturulur)
+        
+        Returns:
+            (offsets, sources, weights) - i düğümüne gelen kenarlar
+            offsets[i]:offsets[i+1] aralığındadır
+        """
+        if self._reverse is None:
+            n = self.node_count
+            offsets = self.offsets
+            targets = self.targets
+            weights = self.weights
+            
+            # Sayma sıralaması ile O(V + E)
+            counts = [0] * (n + 1)
+            for target in targets:
+                counts[target + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+            
+            rev_offsets = array('q', counts)
+            rev_sources = array('i', bytes(4 * len(targets)))
+            rev_weights = array('d', bytes(8 * len(targets)))
+            
+            position = counts[:]
+            for u in range(n):
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    slot = position[v]
+                    rev_sources[slot] = u
+                    rev_weights[slot] = weights[k]
+                    position[v] = slot + 1
+            
+            self._reverse = (rev_offsets, rev_sources, rev_weights)
+        return self._reverse
+    
+    def with_weights(self, weights, changed: List[int]) -> 'Graph':
+        """
+        Aynı topolojide, ağırlıkları değişmiş yeni bir Graph döndürür
+        
+        Düğümler, kenarlar ve spatial index paylaşılır; yeni nesne yeni bir
+        sürüm alır, eski nesneyi kullanan sorgular tutarlı biçimde biter.
+        Ters diziler ve A* ölçeği baştan kurulmaz, yalnızca changed
+        (değişen kenar konumları) üzerinden güncellenir.
+        """
+        graph = Graph.from_arrays(self.node_ids, self.lat, self.lon, self.offsets,
+                                  self.targets, weights, node_index=self.node_index)
+        graph.spatial_index = self.spatial_index
+        graph.shapes = self.shapes
+        graph.components = self.components
+        graph.storage = self.storage
+        graph.base_weights = self.base_weights
+        
+        offsets = self.offsets
+        targets = self.targets
+        
+        if self._reverse is not None:
+            rev_offsets, rev_sources, rev_weights = self._reverse
+            rev_weights = array('d', rev_weights)
+            for k in changed:
+                u = bisect_right(offsets, k) - 1
+                v = targets[k]
+                # Paralel kenarlar ters dizide aynı sırayla yer alır
+                parallel = sum(1 for j in range(offsets[u], k) if targets[j] == v)
+                for slot in range(rev_offsets[v], rev_offsets[v + 1]):
+                    if rev_sources[slot] == u:
+                        if parallel == 0:
+                            rev_weights[slot] = weights[k]
+                            break
+                        parallel -= 1
+            graph._reverse = (rev_offsets, rev_sources, rev_weights)
+        
+        if self._heuristic_scale is not None:
+            # Artan ağırlıklar sezgiseli bozmaz; sadece azalanlar ölçeği küçültebilir
+            scale = self._heuristic_scale
+            for k in changed:
+                if weights[k] < self.weights[k]:
+                    u = bisect_right(offsets, k) - 1
+                    v = targets[k]
+                    length = haversine_distance(self.lat[u], self.lon[u], self.lat[v], self.lon[v])
+                    if length > 0:
+                        scale = min(scale, weights[k] / length * (1 - 1e-9))
+            graph._heuristic_scale = scale
+        
+        return graph
+    
+    def get_heuristic_scale(self) -> float:
+        """
+        A* için ölçek: tüm kenarlarda minimum (ağırlık / haversine km) oranı
+        
+        haversine_distance * ölçek hiçbir zaman gerçek yol maliyetini
+        aşmaz, bu yüzden sezgisel kabul edilebilir (admissible) kalır.
+        """
+        if self._heuristic_scale is None:
+            lat = self.lat
+            lon = self.lon
+            offsets = self.offsets
+            targets = self.targets
+            weights = self.weights
+            
+            scale = float('inf')
+            for u in range(self.node_count):
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    length = haversine_distance(lat[u], lon[u], lat[v], lon[v])
+                    if length > 0:
+                        scale = min(scale, weights[k] / length)
+            
+            # Kenar yoksa sezgisel devre dışı kalır (A* = Dijkstra);
+            # kayan nokta hatalarına karşı küçük bir pay bırakılır
+            self._heuristic_scale = 0.0 if scale == float('inf') else scale * (1 - 1e-9)
+        return self._heuristic_scale
+    
+    @property
+    def node_count(self) -> int:
+        """Toplam düğüm sayısı"""
+        return len(self.node_ids)
+    
+    @property
+    def edge_count(self) -> int:
+        """Toplam (yönlü) kenar sayısı"""
+        return len(self.targets)
+    
+    @property
+    def nodes(self) -> Dict:
+        """Düğümleri eski dict formatında döndürür (her çağrıda yeniden oluşturulur)"""
+        return {
+            node_id: {'lat': self.lat[i], 'lon': self.lon[i]}
+            for i, node_id in enumerate(self.node_ids)
+        }
+    
+    @property
+    def edges(self) -> Dict:
+        """Kenarları eski dict formatında döndürür (her çağrıda yeniden oluşturulur)"""
+        return {node_id: self.get_neighbors(node_id) for node_id in self.node_ids}
+    
+    def region_dict(self, indices) -> Dict:
+        """
+        Verilen düğümleri ve çıkan kenarlarını eski dict formatında döndürür
+        
+        Kenarların bölge dışındaki uç düğümleri de nodes'a eklenir, böylece
+        bölge sınırındaki kenarlar çizilebilir. Sadeleştirilmiş graph'ta
+        kenarlar ara noktalarını 'shape': [[lat, lon], ...] olarak taşır.
+        """
+        node_ids = self.node_ids
+        lat = self.lat
+        lon = self.lon
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        shapes = self.shapes
+        inf = float('inf')
+        
+        nodes = {}
+        edges = {}
+        for i in indices:
+            node_id = node_ids[i]
+            nodes[node_id] = {'lat': lat[i], 'lon': lon[i]}
+            neighbors = []
+            for k in range(offsets[i], offsets[i + 1]):
+                # Kapalı yollar (sonsuz ağırlık) gösterilmez
+                if weights[k] == inf:
+                    continue
+                target = targets[k]
+                target_id = node_ids[target]
+                neighbor = {'node': target_id, 'weight': weights[k]}
+                if shapes is not None and shapes[0][k] != shapes[0][k + 1]:
+                    shape_offsets, _, shape_lat, shape_lon = shapes
+                    neighbor['shape'] = [[shape_lat[j], shape_lon[j]]
+                                         for j in range(shape_offsets[k], shape_offsets[k + 1])]
+                neighbors.append(neighbor)
+                if target_id not in nodes:
+                    nodes[target_id] = {'lat': lat[target], 'lon': lon[target]}
+            edges[node_id] = neighbors
+        
+        return {'nodes': nodes, 'edges': edges}
+    
+    def get_node_index(self, node_id: str) -> Optional[int]:
+        """Düğüm ID'sinin dahili indeksini döndürür"""
+        return self.node_index.get(node_id)
+    
+    def get_node_id(self, index: int) -> str:
+        """Dahili indeksin düğüm ID'sini döndürür"""
+        return self.node_ids[index]
     
     def get_neighbors(self, node_id: str) -> List[Dict]:
         """Bir düğümün komşularını döndürür"""
-        return self.edges.get(node_id, [])
+        i = self.node_index.get(node_id)
+        if i is None:
+            return []
+        inf = float('inf')
+        return [
+            {'node': self.node_ids[self.targets[k]], 'weight': self.weights[k]}
+            for k in range(self.offsets[i], self.offsets[i + 1])
+            if self.weights[k] != inf
+        ]
     
     def node_exists(self, node_id: str) -> bool:
         """Düğüm var mı kontrol eder"""
-        return node_id in self.nodes
+        return node_id in self.node_index
     
     def get_node_coords(self, node_id: str) -> Tuple[float, float]:
         """Düğümün koordinatlarını döndürür (lat, lon)"""
-        node = self.nodes.get(node_id)
-        if node:
-            return (node['lat'], node['lon'])
+        i = self.node_index.get(node_id)
+        if i is not None:
+            return (self.lat[i], self.lon[i])
         return None
 
 
-def dijkstra(graph: Graph, start_node: str, end_node: str) -> Optional[Dict]:
+def graph_fingerprint(graph: Graph) -> int:
+    """Ön işlenmiş dosyaların (CH, landmark) hangi graph için üretildiğini doğrulamak için özet"""
+    checksum = zlib.crc32('\n'.join(graph.node_ids).encode('utf-8'))
+    checksum = zlib.crc32(graph.offsets.tobytes(), checksum)
+    checksum = zlib.crc32(graph.targets.tobytes(), checksum)
+    return zlib.crc32(graph.weights.tobytes(), checksum)
+
+
+def resolve_algorithm(graph: Graph, algorithm: Optional[str] = None) -> str:
+    """
+    İstenen algoritmayı doğrular; None ise yüklü ön işlemeye göre seçer
+    
+    Raises:
+        ValueError: Bilinmeyen algoritma veya ön işlemesi yüklenmemiş 'ch'/'alt'
+    """
+    if algorithm is None:
+        if graph.hierarchy is not None:
+            return 'ch'
+        if graph.landmarks is not None:
+            return 'alt'
+        return 'dijkstra'
+    
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Bilinmeyen algoritma: {algorithm} (seçenekler: {', '.join(ALGORITHMS)})")
+    
+    if algorithm == 'ch' and graph.hierarchy is None and graph.suspended_hierarchy is not None:
+        raise ValueError("CH hiyerarşisi kenar ağırlığı güncellemeleri nedeniyle devre dışı")
+    
+    if algorithm == 'ch' and graph.hierarchy is None:
+        raise ValueError("CH hiyerarşisi yüklenmedi (python contraction.py ile oluşturun)")
+    
+    if algorithm == 'alt' and graph.landmarks is None:
+        raise ValueError("Landmark tabloları yüklenmedi (python landmarks.py ile oluşturun)")
+    
+    return algorithm
+
+
+class SearchWorkspace:
+    """
+    Aramalar arasında yeniden kullanılan düğüm dizileri
+
+    distances başlangıçta tümüyle sonsuzdur; arama sırasında değeri
+    değişen düğümler touched listesine yazılır ve arama bitince yalnızca
+    onlar sıfırlanır. Kesinleşen düğümler settled dizisinde aramanın
+    nesliyle (generation) işaretlenir, bu dizi hiç temizlenmez. Böylece
+    sorgu maliyeti graph boyutuyla değil gezilen bölgeyle orantılıdır.
+    """
+    
+    __slots__ = ('size', 'generation', 'settled', 'distances', 'previous', 'touched', 'heap')
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.generation = 0
+        self.settled = [0] * size
+        self.distances = [float('inf')] * size
+        self.previous = [-1] * size
+        self.touched = []
+        self.heap = []
+    
+    def begin(self, source: int) -> int:
+        """Yeni bir arama başlatır (kaynak mesafesi 0) ve nesli döndürür"""
+        self.generation += 1
+        self.distances[source] = 0
+        self.previous[source] = -1
+        self.touched.append(source)
+        self.heap.clear()
+        return self.generation
+    
+    def reset(self):
+        """Değişen mesafeleri sonsuza döndürür - O(gezilen düğüm)"""
+        distances = self.distances
+        inf = float('inf')
+        for node in self.touched:
+            distances[node] = inf
+        self.touched.clear()
+        self.heap.clear()
+
+
+class _WorkspacePool:
+    """İş parçacıklarının ödünç alıp geri verdiği çalışma alanları"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = []
+    
+    def acquire(self, size: int) -> SearchWorkspace:
+        with self.lock:
+            for i in range(len(self.idle) - 1, -1, -1):
+                if self.idle[i].size == size:
+                    return self.idle.pop(i)
+        return SearchWorkspace(size)
+    
+    def release(self, workspace: SearchWorkspace):
+        workspace.reset()
+        with self.lock:
+            self.idle.append(workspace)
+            # En eski (ör. yeniden yüklenen graph'ın boyutundaki) alanlar bırakılır
+            if len(self.idle) > WORKSPACE_POOL_SIZE:
+                del self.idle[0]
+
+
+_workspaces = _WorkspacePool()
+
+if hasattr(os, 'register_at_fork'):
+    # Fork anında başka bir thread'in tuttuğu kilit çocuk process'te kalmasın
+    os.register_at_fork(after_in_child=_workspaces.__init__)
+
+
+@contextlib.contextmanager
+def search_workspace(graph: Graph) -> Iterator[SearchWorkspace]:
+    """Aramanın süresi boyunca bu thread'e ayrılmış bir çalışma alanı"""
+    workspace = _workspaces.acquire(graph.node_count)
+    try:
+        yield workspace
+    finally:
+        _workspaces.release(workspace)
+
+
+def dijkstra(graph: Graph, start_node: str, end_node: str, algorithm: Optional[str] = None) -> Optional[Dict]:
     """
     Dijkstra algoritması ile en kısa yolu bulur
     
@@ -44,15 +486,23 @@ def dijkstra(graph: Graph, start_node: str, end_node: str) -> Optional[Dict]:
         graph: Graph objesi
         start_node: Başlangıç düğümü ID'si
         end_node: Varış düğümü ID'si
+        algorithm: 'dijkstra', 'astar', 'bidirectional', 'ch' veya 'alt'
+                   (None = hiyerarşi yüklüyse 'ch', landmark tabloları
+                   yüklüyse 'alt', hiçbiri yoksa 'dijkstra')
     
     Returns:
         {
             'path': [node_id1, node_id2, ...],
             'distance': float,
-            'coordinates': [[lat1, lon1], [lat2, lon2], ...]
+            'coordinates': [[lat1, lon1], [lat2, lon2], ...],
+            'path_indices': [int, ...],  # Yalnız graph düğümleri (ara noktasız)
+            'settled_nodes': int,  # Kesinleşen düğüm sayısı
+            'pushed_nodes': int,   # Kuyruğa eklenen düğüm sayısı
+            'algorithm': str
         }
         veya None (yol bulunamazsa)
     """
+    algorithm = resolve_algorithm(graph, algorithm)
     
     # Validasyon
     if not graph.node_exists(start_node):
@@ -63,78 +513,512 @@ def dijkstra(graph: Graph, start_node: str, end_node: str) -> Optional[Dict]:
         print(f"Hata: Varış düğümü '{end_node}' bulunamadı!")
         return None
     
+    # API sınırı: string ID -> tamsayı indeks
+    source = graph.node_index[start_node]
+    target = graph.node_index[end_node]
+    
+    # Farklı bileşenlerdeki düğümler için arama yapılmaz
+    if graph.components is not None and graph.components.unreachable(source, target):
+        print(f"Uyarı: '{start_node}' ile '{end_node}' farklı bağlı bileşenlerde, yol yok!")
+        return None
+    
+    stats = {}
+    
+    with metrics.phase('search'):
+        if algorithm == 'astar':
+            path_indices, distance = astar_search(graph, source, target, stats)
+        elif algorithm == 'bidirectional':
+            path_indices, distance = bidirectional_search(graph, source, target, stats)
+        elif algorithm == 'ch':
+            path_indices, distance = graph.hierarchy.query(source, target, stats)
+        elif algorithm == 'alt':
+            heuristic = graph.landmarks.heuristic_for(source, target)
+            path_indices, distance = astar_search(graph, source, target, stats, heuristic)
+        else:
+            distances, paths = one_to_many(graph, source, [target], stats, paths=True)
+            path_indices, distance = paths[0], distances[0]
+    
+    metrics.observe('route_search_settled_nodes', stats['settled'], algorithm=algorithm)
+    metrics.observe('route_search_pushed_nodes', stats['pushed'], algorithm=algorithm)
+    
+    # Yol bulunamadıysa
+    if path_indices is None:
+        print(f"Uyarı: '{start_node}' ile '{end_node}' arasında yol bulunamadı!")
+        return None
+    
+    with metrics.phase('reconstruct'):
+        result = build_path_result(graph, path_indices, distance)
+    # Sadeleştirilmiş graph'ta path ara noktaları da içerir; indeksler ayrıca tutulur
+    result['path_indices'] = path_indices
+    result['settled_nodes'] = stats['settled']
+    result['pushed_nodes'] = stats['pushed']
+    result['algorithm'] = algorithm
+    return result
+
+
+def shortest_path_tree(graph: Graph, source: int, targets: Optional[List[int]] = None,
+                       stats: Optional[Dict] = None, reverse: bool = False) -> Tuple[List[float], List[int]]:
+    """
+    Tek kaynaktan Dijkstra araması (tam en kısa yol ağacı)
+    
+    Verilen hedeflerin tamamı kesinleştiğinde arama durur; hedef
+    verilmezse tüm ulaşılabilir düğümler gezilir. Graph boyutunda listeler
+    döndürdüğü için tüm ağaca ihtiyaç duyan ön işleme (landmark) içindir;
+    belirli hedefler için one_to_many daha ucuzdur.
+    
+    Args:
+        graph: Graph objesi
+        source: Başlangıç düğümünün indeksi
+        targets: Hedef düğüm indeksleri (None = tümü)
+        stats: Verilirse 'settled' (kesinleşen) ve 'pushed' (kuyruğa eklenen)
+               düğüm sayıları yazılır
+        reverse: True ise ters graph üzerinde arar (düğümlerden kaynağa mesafeler)
+    
+    Returns:
+        (distances, previous) - düğüm indeksine göre mesafe ve önceki düğüm listeleri
+    """
+    if reverse:
+        offsets, targets_arr, weights = graph.get_reverse_arrays()
+    else:
+        offsets = graph.offsets
+        targets_arr = graph.targets
+        weights = graph.weights
+    
     # Mesafeler - başlangıçta tümü sonsuz
-    distances = {node: float('inf') for node in graph.nodes}
-    distances[start_node] = 0
+    inf = float('inf')
+    distances = [inf] * graph.node_count
+    distances[source] = 0
     
     # Önceki düğümleri takip et (yolu geri oluşturmak için)
-    previous = {node: None for node in graph.nodes}
+    previous = [-1] * graph.node_count
+    
+    # Henüz kesinleşmemiş hedefler
+    remaining = set(targets) if targets is not None else None
     
     # Priority queue (min-heap)
-    # Format: (mesafe, düğüm_id)
-    pq = [(0, start_node)]
+    # Format: (mesafe, düğüm_indeksi)
+    pq = [(0, source)]
     
     # Ziyaret edilen düğümler
-    visited = set()
+    visited = bytearray(graph.node_count)
+    settled = 0
+    pushed = 1
     
     while pq:
-        current_distance, current_node = heapq.heappop(pq)
+        current_distance, current = heapq.heappop(pq)
         
         # Zaten ziyaret edildiyse atla
-        if current_node in visited:
+        if visited[current]:
             continue
         
-        visited.add(current_node)
+        visited[current] = 1
+        settled += 1
         
-        # Hedefe ulaştıysak dur
-        if current_node == end_node:
-            break
+        # Tüm hedeflere ulaştıysak dur
+        if remaining is not None and current in remaining:
+            remaining.discard(current)
+            if not remaining:
+                break
         
         # Eğer bu düğüme giden mesafe, kayıtlı mesafeden büyükse atla
-        if current_distance > distances[current_node]:
+        if current_distance > distances[current]:
             continue
         
         # Komşu düğümleri kontrol et
-        neighbors = graph.get_neighbors(current_node)
-        
-        for neighbor in neighbors:
-            neighbor_node = neighbor['node']
-            weight = neighbor['weight']
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = targets_arr[k]
             
             # Yeni mesafeyi hesapla
-            new_distance = current_distance + weight
+            new_distance = current_distance + weights[k]
             
             # Daha kısa bir yol bulduysak güncelle
-            if new_distance < distances[neighbor_node]:
-                distances[neighbor_node] = new_distance
-                previous[neighbor_node] = current_node
-                heapq.heappush(pq, (new_distance, neighbor_node))
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous[neighbor] = current
+                heapq.heappush(pq, (new_distance, neighbor))
+                pushed += 1
     
-    # Yol bulunamadıysa
-    if distances[end_node] == float('inf'):
-        print(f"Uyarı: '{start_node}' ile '{end_node}' arasında yol bulunamadı!")
-        return None
+    if stats is not None:
+        stats['settled'] = settled
+        stats['pushed'] = pushed
     
-    # Yolu geri oluştur
-    path = []
-    current_node = end_node
+    return distances, previous
+
+
+def one_to_many(graph: Graph, source: int, targets: List[int], stats: Optional[Dict] = None,
+                reverse: bool = False,
+                paths: bool = False) -> Tuple[List[float], Optional[List[Optional[List[int]]]]]:
+    """
+    Tek kaynaktan verilen hedeflere Dijkstra araması
     
-    while current_node is not None:
-        path.append(current_node)
-        current_node = previous[current_node]
+    Durum havuzdaki bir SearchWorkspace'te tutulur; graph boyutunda liste
+    ayrılmaz. Hedeflerin tamamı kesinleştiğinde arama durur.
     
-    path.reverse()
+    Args:
+        targets: Hedef düğüm indeksleri
+        stats: Verilirse 'settled' ve 'pushed' sayıları yazılır
+        reverse: True ise ters graph üzerinde arar (hedeflerden kaynağa mesafeler)
+        paths: True ise hedef başına indeks yolu da döner
     
-    # Koordinatları ekle
-    coordinates = []
-    for node_id in path:
-        coords = graph.get_node_coords(node_id)
-        if coords:
-            coordinates.append([coords[0], coords[1]])  # [lat, lon]
+    Returns:
+        (hedef başına mesafe (ulaşılamazsa inf), hedef başına yol veya None)
+    """
+    if reverse:
+        offsets, neighbors, weights = graph.get_reverse_arrays()
+    else:
+        offsets = graph.offsets
+        neighbors = graph.targets
+        weights = graph.weights
+    
+    inf = float('inf')
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    
+    # Bileşenlerden ulaşılamaz olduğu belli hedefler beklenmez
+    components = graph.components
+    if components is None:
+        remaining = set(targets)
+    elif reverse:
+        remaining = {target for target in targets if not components.unreachable(target, source)}
+    else:
+        remaining = {target for target in targets if not components.unreachable(source, target)}
+    if not remaining:
+        if stats is not None:
+            stats['settled'] = 0
+            stats['pushed'] = 0
+        return [inf] * len(targets), [None] * len(targets) if paths else None
+    
+    with search_workspace(graph) as workspace:
+        generation = workspace.begin(source)
+        done = workspace.settled
+        distances = workspace.distances
+        previous = workspace.previous
+        touch = workspace.touched.append
+        pq = workspace.heap
+        pq.append((0, source))
+        settled = 0
+        pushed = 1
+        
+        while pq:
+            current_distance, current = heappop(pq)
+            if done[current] == generation:
+                continue
+            done[current] = generation
+            settled += 1
+            
+            if current in remaining:
+                remaining.discard(current)
+                if not remaining:
+                    break
+            
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[k]
+                new_distance = current_distance + weights[k]
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current
+                    touch(neighbor)
+                    heappush(pq, (new_distance, neighbor))
+                    pushed += 1
+        
+        if stats is not None:
+            stats['settled'] = settled
+            stats['pushed'] = pushed
+        
+        target_distances = [distances[target] for target in targets]
+        target_paths = None
+        if paths:
+            target_paths = [reconstruct_path(previous, target) if distance != inf else None
+                            for target, distance in zip(targets, target_distances)]
+    
+    return target_distances, target_paths
+
+
+def bounded_search(graph: Graph, source: int, max_distance: float,
+                   stats: Optional[Dict] = None, reverse: bool = False) -> Dict[int, float]:
+    """
+    Mesafe bütçesiyle sınırlı tek kaynaklı arama (one-to-all)
+
+    Bütçeyi aşan düğümler kuyruğa girmez; durum havuzdaki bir
+    SearchWorkspace'te tutulur ve süre graph boyutuyla değil, ulaşılan
+    bölgeyle orantılıdır.
+
+    Args:
+        max_distance: Mesafe bütçesi (km)
+        stats: Verilirse 'settled' ve 'pushed' sayıları yazılır
+        reverse: True ise düğümlerden kaynağa mesafeler (ters graph)
+
+    Returns:
+        {düğüm indeksi: mesafe} - mesafesi max_distance'ı aşmayan düğümler
+    """
+    if reverse:
+        offsets, neighbors, weights = graph.get_reverse_arrays()
+    else:
+        offsets = graph.offsets
+        neighbors = graph.targets
+        weights = graph.weights
+
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    reached = {}
+
+    with search_workspace(graph) as workspace:
+        workspace.begin(source)
+        distances = workspace.distances
+        touch = workspace.touched.append
+        pq = workspace.heap
+        pq.append((0, source))
+        pushed = 1
+
+        while pq:
+            current_distance, current = heappop(pq)
+            if current in reached:
+                continue
+            reached[current] = current_distance
+
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[k]
+                new_distance = current_distance + weights[k]
+                if new_distance <= max_distance and new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    touch(neighbor)
+                    heappush(pq, (new_distance, neighbor))
+                    pushed += 1
+
+    if stats is not None:
+        stats['settled'] = len(reached)
+        stats['pushed'] = pushed
+
+    return reached
+
+
+def astar_search(graph: Graph, source: int, target: int, stats: Optional[Dict] = None,
+                 heuristic: Optional[Callable[[int], float]] = None) -> Tuple[Optional[List[int]], float]:
+    """
+    A* araması
+    
+    Args:
+        heuristic: Düğümden hedefe alt sınır fonksiyonu; verilmezse
+                   haversine mesafesi * graph.get_heuristic_scale() kullanılır
+    
+    Returns:
+        (indeks yolu veya None, mesafe)
+    """
+    offsets = graph.offsets
+    targets_arr = graph.targets
+    weights = graph.weights
+    
+    if heuristic is None:
+        lat = graph.lat
+        lon = graph.lon
+        scale = graph.get_heuristic_scale()
+        target_lat = lat[target]
+        target_lon = lon[target]
+        
+        def heuristic(node: int) -> float:
+            return haversine_distance(lat[node], lon[node], target_lat, target_lon) * scale
+    
+    inf = float('inf')
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    
+    with search_workspace(graph) as workspace:
+        generation = workspace.begin(source)
+        visited = workspace.settled
+        distances = workspace.distances
+        previous = workspace.previous
+        touch = workspace.touched.append
+        
+        # Format: (tahmini toplam, mesafe, düğüm_indeksi)
+        pq = workspace.heap
+        pq.append((heuristic(source), 0, source))
+        settled = 0
+        pushed = 1
+        
+        while pq:
+            _, current_distance, current = heappop(pq)
+            
+            if visited[current] == generation:
+                continue
+            
+            visited[current] = generation
+            settled += 1
+            
+            if current == target:
+                break
+            
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets_arr[k]
+                new_distance = current_distance + weights[k]
+                
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current
+                    touch(neighbor)
+                    heappush(pq, (new_distance + heuristic(neighbor), new_distance, neighbor))
+                    pushed += 1
+        
+        if stats is not None:
+            stats['settled'] = settled
+            stats['pushed'] = pushed
+        
+        if distances[target] == inf:
+            return None, inf
+        return reconstruct_path(previous, target), distances[target]
+
+
+def bidirectional_search(graph: Graph, source: int, target: int,
+                         stats: Optional[Dict] = None) -> Tuple[Optional[List[int]], float]:
+    """
+    Çift yönlü Dijkstra: kaynaktan ileri, hedeften ters graph üzerinde geri arar
+    
+    İki kuyruğun en küçük anahtarlarının toplamı bulunan en iyi yoldan
+    (mu) büyük veya eşit olduğunda arama durur.
+    
+    Returns:
+        (indeks yolu veya None, mesafe)
+    """
+    inf = float('inf')
+    n = graph.node_count
+    
+    if source == target:
+        if stats is not None:
+            stats['settled'] = 1
+            stats['pushed'] = 1
+        return [source], 0
+    
+    rev_offsets, rev_sources, rev_weights = graph.get_reverse_arrays()
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    
+    with search_workspace(graph) as forward_workspace, search_workspace(graph) as backward_workspace:
+        # Her yön için: (offsets, komşular, ağırlıklar, çalışma alanı, nesil)
+        forward = (graph.offsets, graph.targets, graph.weights,
+                   forward_workspace, forward_workspace.begin(source))
+        backward = (rev_offsets, rev_sources, rev_weights,
+                    backward_workspace, backward_workspace.begin(target))
+        forward_workspace.heap.append((0, source))
+        backward_workspace.heap.append((0, target))
+        
+        best = inf
+        meeting = -1
+        settled = 0
+        pushed = 2
+        
+        while forward_workspace.heap and backward_workspace.heap:
+            if forward_workspace.heap[0][0] + backward_workspace.heap[0][0] >= best:
+                break
+            
+            # Küçük kuyruğa sahip yön genişletilir
+            if len(forward_workspace.heap) <= len(backward_workspace.heap):
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+            
+            offsets, neighbors, weights, workspace, generation = side
+            distances = workspace.distances
+            previous = workspace.previous
+            visited = workspace.settled
+            pq = workspace.heap
+            other_distances = other[3].distances
+            
+            current_distance, current = heappop(pq)
+            if visited[current] == generation:
+                continue
+            visited[current] = generation
+            settled += 1
+            
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[k]
+                new_distance = current_distance + weights[k]
+                
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current
+                    workspace.touched.append(neighbor)
+                    heappush(pq, (new_distance, neighbor))
+                    pushed += 1
+                
+                # İki arama bu düğümde buluşuyorsa en iyi yolu güncelle
+                total = distances[neighbor] + other_distances[neighbor]
+                if total < best:
+                    best = total
+                    meeting = neighbor
+        
+        if stats is not None:
+            stats['settled'] = settled
+            stats['pushed'] = pushed
+        
+        if meeting < 0:
+            return None, inf
+        
+        # Kaynak -> buluşma (ileri), buluşma -> hedef (geri aramanın önceki listesi)
+        path_indices = reconstruct_path(forward_workspace.previous, meeting)
+        backward_previous = backward_workspace.previous
+        current = backward_previous[meeting]
+        while current != -1:
+            path_indices.append(current)
+            current = backward_previous[current]
+    
+    return path_indices, best
+
+
+def reconstruct_path(previous: List[int], target: int) -> List[int]:
+    """previous listesinden hedefe giden indeks yolunu oluşturur"""
+    path_indices = []
+    current = target
+    
+    while current != -1:
+        path_indices.append(current)
+        current = previous[current]
+    
+    path_indices.reverse()
+    return path_indices
+
+
+def edge_slot(graph: Graph, u: int, v: int) -> int:
+    """u -> v kenarının CSR konumu (paralel kenarlarda en kısası), yoksa -1"""
+    targets = graph.targets
+    weights = graph.weights
+    best = -1
+    for k in range(graph.offsets[u], graph.offsets[u + 1]):
+        if targets[k] == v and (best == -1 or weights[k] < weights[best]):
+            best = k
+    return best
+
+
+def build_path_result(graph: Graph, path_indices: List[int], distance: float) -> Dict:
+    """
+    İndeks yolunu API formatındaki sonuca çevirir
+    
+    Sadeleştirilmiş graph'ta kenarların ara noktaları yola geri eklenir;
+    path ve coordinates özgün graph'takiyle aynı ayrıntıda döner.
+    """
+    node_ids = graph.node_ids
+    lat = graph.lat
+    lon = graph.lon
+    
+    if graph.shapes is None:
+        path = [node_ids[i] for i in path_indices]
+        coordinates = [[lat[i], lon[i]] for i in path_indices]  # [lat, lon]
+    else:
+        shape_offsets, shape_ids, shape_lat, shape_lon = graph.shapes
+        path = []
+        coordinates = []
+        previous = -1
+        for i in path_indices:
+            if previous != -1:
+                k = edge_slot(graph, previous, i)
+                for j in range(shape_offsets[k], shape_offsets[k + 1]):
+                    path.append(shape_ids[j])
+                    coordinates.append([shape_lat[j], shape_lon[j]])
+            path.append(node_ids[i])
+            coordinates.append([lat[i], lon[i]])
+            previous = i
     
     return {
         'path': path,
-        'distance': round(distances[end_node], 3),
+        'distance': round(distance, 3),
         'coordinates': coordinates,
         'node_count': len(path)
     }
@@ -170,7 +1054,7 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return distance
 
 
-def find_nearest_node(lat: float, lon: float, graph: Graph) -> str:
+def find_nearest_node(lat: float, lon: float, graph: Graph, main_component: bool = False) -> str:
     """
     Tıklanan koordinata en yakın düğümü bulur
     
@@ -178,36 +1062,262 @@ def find_nearest_node(lat: float, lon: float, graph: Graph) -> str:
         lat: Tıklanan latitude
         lon: Tıklanan longitude
         graph: Graph objesi
+        main_component: True ise (bileşenler hesaplanmışsa) sadece ana
+                        bileşendeki düğümler aday olur
     
     Returns:
         En yakın düğümün ID'si
     """
-    nearest_node = None
+    mask = graph.components.in_main if main_component and graph.components is not None else None
+    
+    # Spatial index varsa logaritmik sorgu
+    if graph.spatial_index is not None:
+        nearest = graph.spatial_index.nearest(lat, lon, mask)
+        return graph.node_ids[nearest] if nearest >= 0 else None
+    
+    nearest = -1
     min_distance = float('inf')
     
-    for node_id, node_data in graph.nodes.items():
-        distance = haversine_distance(
-            lat, lon, 
-            node_data['lat'], node_data['lon']
-        )
+    node_lat = graph.lat
+    node_lon = graph.lon
+    
+    for i in range(graph.node_count):
+        if mask is not None and not mask[i]:
+            continue
+        
+        distance = haversine_distance(lat, lon, node_lat[i], node_lon[i])
         
         if distance < min_distance:
             min_distance = distance
-            nearest_node = node_id
+            nearest = i
+    
+    nearest_node = graph.node_ids[nearest] if nearest >= 0 else None
     
     return nearest_node
 
 
-def find_optimal_route_tsp(graph: Graph, start_node: str, waypoints: List[str], end_node: str) -> Optional[Dict]:
+def find_nearest_nodes(points: List[Tuple[float, float]], graph: Graph,
+                       main_component: bool = False) -> List[str]:
+    """
+    Birden fazla koordinatı tek çağrıda en yakın düğümlere eşler
+    
+    Args:
+        points: [(lat, lon), ...]
+        graph: Graph objesi
+        main_component: True ise sadece ana bileşendeki düğümlere eşler
+    
+    Returns:
+        Her koordinat için en yakın düğümün ID'si
+    """
+    if graph.spatial_index is None:
+        return [find_nearest_node(lat, lon, graph, main_component) for lat, lon in points]
+    
+    mask = graph.components.in_main if main_component and graph.components is not None else None
+    node_ids = graph.node_ids
+    return [
+        node_ids[i] if i >= 0 else None
+        for i in graph.spatial_index.nearest_many(points, mask)
+    ]
+
+
+def _cached_pair_distances(cache, version: int, stops: List[str]) -> Optional[Dict]:
+    """Tüm durak çiftlerinin mesafeleri önbellekteyse döndürür, değilse None"""
+    pair_distances = {}
+    for stop in stops:
+        pair_distances[(stop, stop)] = 0.0
+        for other in stops:
+            if other == stop:
+                continue
+            distance = cache.get('distance', version, (stop, other))
+            if distance is MISSING:
+                return None
+            if distance is not None:
+                pair_distances[(stop, other)] = distance
+    return pair_distances
+
+
+def _stop_distances(graph: Graph, unique_stops: List[str], stop_indices: List[int],
+                    cache=None) -> Tuple[Dict, Dict]:
+    """
+    Durak çiftleri arasındaki mesafeleri hesaplar (veya önbellekten alır)
+    
+    Returns:
+        (pair_distances, pair_paths): {(a, b): mesafe}, {(a, b): indeks yolu}
+        pair_paths yalnızca one-to-many Dijkstra ile hesaplandığında doludur.
+    """
+    inf = float('inf')
+    version = graph.version
+    pair_paths = {}
+    
+    if cache is not None:
+        pair_distances = _cached_pair_distances(cache, version, unique_stops)
+        if pair_distances is not None:
+            print("⚡ Durak mesafeleri önbellekten alındı")
+            return pair_distances, pair_paths
+    
+    pair_distances = {}
+    if graph.hierarchy is not None:
+        # CH bucket tablosu ile tüm durak mesafeleri; yollar sadece seçilen
+        # segmentler için açılır
+        table = graph.hierarchy.distance_table(stop_indices, stop_indices)
+        for i, stop in enumerate(unique_stops):
+            for j, other in enumerate(unique_stops):
+                if table[i][j] != inf:
+                    pair_distances[(stop, other)] = table[i][j]
+    else:
+        # Her farklı durak için tek bir one-to-many arama yapılır;
+        # durak çiftleri arasındaki yollar indeks listesi olarak saklanır
+        for stop, source in zip(unique_stops, stop_indices):
+            distances, paths = one_to_many(graph, source, stop_indices, paths=True)
+            for other, distance, path_indices in zip(unique_stops, distances, paths):
+                if distance != inf:
+                    pair_paths[(stop, other)] = path_indices
+                    pair_distances[(stop, other)] = distance
+    
+    if cache is not None:
+        # Ulaşılamayan çiftler de (None) saklanır
+        for stop in unique_stops:
+            for other in unique_stops:
+                if other != stop:
+                    cache.put('distance', version, (stop, other), pair_distances.get((stop, other)))
+    
+    return pair_distances, pair_paths
+
+
+def _stops_exist(graph: Graph, start_node: str, waypoints: List[str], end_node: str) -> bool:
+    """Tüm durak düğümleri graph'ta var mı (yoksa hangisinin eksik olduğu yazılır)"""
+    if not graph.node_exists(start_node):
+        print(f"Hata: Başlangıç düğümü '{start_node}' bulunamadı!")
+        return False
+    
+    if not graph.node_exists(end_node):
+        print(f"Hata: Bitiş düğümü '{end_node}' bulunamadı!")
+        return False
+    
+    for wp in waypoints:
+        if not graph.node_exists(wp):
+            print(f"Hata: Waypoint '{wp}' bulunamadı!")
+            return False
+    return True
+
+
+def _tsp_problem(graph: Graph, start_node: str, waypoints: List[str], end_node: str,
+                 cache=None) -> Tuple[List[List[float]], Callable[[List[int], float], Dict]]:
+    """
+    Durak mesafe matrisini hazırlar (en az bir ara durak için)
+    
+    Returns:
+        (matris, sonuç oluşturucu) - sonuç oluşturucu, matris
+        indeksleriyle verilen rotadan find_optimal_route_tsp() biçiminde
+        sonuç üretir (segmentler çağrılar arasında paylaşılır)
+    """
+    # Duraklar: 0 = başlangıç, son = bitiş
+    stops = [start_node] + list(waypoints) + [end_node]
+    n = len(stops)
+    
+    unique_stops = list(dict.fromkeys(stops))
+    stop_indices = [graph.node_index[stop] for stop in unique_stops]
+    
+    inf = float('inf')
+    version = graph.version
+    
+    with metrics.phase('search'):
+        pair_distances, pair_paths = _stop_distances(graph, unique_stops, stop_indices, cache)
+    
+    segment_cache = {}
+    
+    def compute_segment(a: str, b: str) -> Optional[Dict]:
+        key = (a, b)
+        if key not in pair_distances:
+            return None
+        if key in pair_paths:
+            return build_path_result(graph, pair_paths[key], pair_distances[key])
+        source = graph.node_index[a]
+        target = graph.node_index[b]
+        if graph.hierarchy is not None:
+            path_indices, distance = graph.hierarchy.query(source, target)
+        else:
+            # Mesafe önbellekten geldiyse yol tek bir aramayla açılır
+            distances, paths = one_to_many(graph, source, [target], paths=True)
+            path_indices, distance = paths[0], distances[0]
+        return build_path_result(graph, path_indices, distance)
+    
+    def get_segment(a: str, b: str) -> Optional[Dict]:
+        key = (a, b)
+        if key not in segment_cache:
+            segment = MISSING if cache is None else cache.get('route', version, key)
+            if segment is MISSING:
+                segment = compute_segment(a, b)
+                if cache is not None:
+                    cache.put('route', version, key, segment)
+            segment_cache[key] = segment
+        return segment_cache[key]
+    
+    def build_result(route: List[int], distance: float) -> Dict:
+        order = [stops[i] for i in route]
+        with metrics.phase('reconstruct'):
+            segments = [
+                get_segment(order[i], order[i + 1])
+                for i in range(len(order) - 1)
+            ]
+        
+        # Tüm koordinatları birleştir
+        coordinates = []
+        for segment in segments:
+            coordinates.extend(segment['coordinates'])
+        
+        return {
+            'optimal_order': order,
+            'total_distance': round(distance, 3),
+            'segments': segments,
+            'coordinates': coordinates
+        }
+    
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                continue
+            distance = pair_distances.get((stops[i], stops[j]))
+            matrix[i][j] = round(distance, 3) if distance is not None else inf
+    
+    return matrix, build_result
+
+
+def _direct_route(graph: Graph, start_node: str, end_node: str) -> Optional[Dict]:
+    """Ara durak yoksa başlangıçtan bitişe tek segmentli sonuç"""
+    result = dijkstra(graph, start_node, end_node)
+    if result:
+        return {
+            'optimal_order': [start_node, end_node],
+            'total_distance': result['distance'],
+            'segments': [result],
+            'coordinates': result['coordinates']
+        }
+    return None
+
+
+def find_optimal_route_tsp(graph: Graph, start_node: str, waypoints: List[str], end_node: str,
+                           time_limit: float = DEFAULT_TIME_LIMIT,
+                           cache=None) -> Optional[Dict]:
     """
     TSP (Traveling Salesman Problem) yaklaşımı
     Tüm waypoint'lere uğrayarak başlangıç ve bitiş arasındaki en kısa yolu bulur
     
+    HELD_KARP_LIMIT'e kadar ara durak için Held-Karp ile kesin çözüm,
+    daha fazlası için en yakın komşu + 2-opt / Or-opt sezgiseli kullanılır.
+    Durak mesafeleri, hiyerarşi yüklüyse CH tablosundan, değilse her
+    farklı durak için tek bir one-to-many Dijkstra aramasıyla hesaplanır.
+    Önbellek verilirse tüm durak mesafeleri önbellekteyse arama yapılmaz;
+    segmentler de önbellekten okunur.
+    
     Args:
         graph: Graph objesi
         start_node: Başlangıç düğümü ID'si
         waypoints: Ara durak düğüm ID'leri listesi
         end_node: Bitiş düğümü ID'si
+        time_limit: Sıralama çözücüsü için toplam süre bütçesi (saniye)
+        cache: route_cache.RouteCache (opsiyonel)
     
     Returns:
         {
@@ -217,84 +1327,63 @@ def find_optimal_route_tsp(graph: Graph, start_node: str, waypoints: List[str],
             'coordinates': [[lat1, lon1], [lat2, lon2], ...]
         }
     """
-    from itertools import permutations
-    
     # Validasyon
-    if not graph.node_exists(start_node):
-        print(f"Hata: Başlangıç düğümü '{start_node}' bulunamadı!")
+    if not _stops_exist(graph, start_node, waypoints, end_node):
         return None
     
-    if not graph.node_exists(end_node):
-        print(f"Hata: Bitiş düğümü '{end_node}' bulunamadı!")
-        return None
-    
-    for wp in waypoints:
-        if not graph.node_exists(wp):
-            print(f"Hata: Waypoint '{wp}' bulunamadı!")
-            return None
-    
     # Eğer waypoint yoksa, direkt yol hesapla
     if len(waypoints) == 0:
-        result = dijkstra(graph, start_node, end_node)
-        if result:
-            return {
-                'optimal_order': [start_node, end_node],
-                'total_distance': result['distance'],
-                'segments': [result],
-                'coordinates': result['coordinates']
-            }
-        return None
+        return _direct_route(graph, start_node, end_node)
     
-    # Tüm waypoint permütasyonlarını test et
-    best_distance = float('inf')
-    best_order = None
-    best_segments = None
+    matrix, build_result = _tsp_problem(graph, start_node, waypoints, end_node, cache)
     
-    print(f"🔍 TSP: {len(waypoints)} ara durak için {len(list(permutations(waypoints)))} kombinasyon test ediliyor...")
+    solver = 'Held-Karp' if len(waypoints) <= HELD_KARP_LIMIT else 'sezgisel'
+    print(f"🔍 TSP: {len(waypoints)} ara durak, {solver} çözücü kullanılıyor...")
     
-    for perm in permutations(waypoints):
-        # Bu permütasyon için rotayı oluştur: start → perm[0] → perm[1] → ... → end
-        route = [start_node] + list(perm) + [end_node]
-        
-        total_distance = 0
-        segments = []
-        valid = True
-        
-        # Her segment için Dijkstra çalıştır
-        for i in range(len(route) - 1):
-            segment = dijkstra(graph, route[i], route[i + 1])
-            
-            if segment is None:
-                valid = False
-                break
-            
-            total_distance += segment['distance']
-            segments.append(segment)
-        
-        # Eğer bu rota geçerliyse ve daha kısaysa kaydet
-        if valid and total_distance < best_distance:
-            best_distance = total_distance
-            best_order = route
-            best_segments = segments
+    with metrics.phase('tsp_order'):
+        best_route, best_distance = solve_path_tsp(matrix, time_limit)
     
-    if best_order is None:
+    if best_route is None:
         print(" Hiçbir geçerli rota bulunamadı!")
         return None
     
-    # Tüm koordinatları birleştir
-    all_coordinates = []
-    for segment in best_segments:
-        all_coordinates.extend(segment['coordinates'])
+    result = build_result(best_route, best_distance)
     
-    print(f" En kısa rota bulundu: {' → '.join(best_order)}")
+    print(f" En kısa rota bulundu: {' → '.join(result['optimal_order'])}")
     print(f" Toplam mesafe: {best_distance:.3f} km")
     
-    return {
-        'optimal_order': best_order,
-        'total_distance': round(best_distance, 3),
-        'segments': best_segments,
-        'coordinates': all_coordinates
-    }
+    return result
+
+
+def iter_optimal_routes_tsp(graph: Graph, start_node: str, waypoints: List[str], end_node: str,
+                            time_limit: float = DEFAULT_TIME_LIMIT,
+                            cache=None) -> Optional[Iterator[Optional[Dict]]]:
+    """
+    find_optimal_route_tsp()'nin anytime sürümü: en iyi rota iyileştikçe
+    find_optimal_route_tsp() biçiminde sonuç üretir (bkz. anytime_tsp)
+    
+    Durak mesafeleri çağrı sırasında hesaplanır; sıralama araması
+    üreteç ilerledikçe yapılır ve üreteç kapatılınca durur.
+    
+    Returns:
+        Sonuç (veya iyileşme yoksa canlı tutma için None) üreten iterator;
+        düğümlerden biri yoksa None. Geçerli rota yoksa iterator rota
+        üretmeden biter.
+    """
+    if not _stops_exist(graph, start_node, waypoints, end_node):
+        return None
+    
+    if len(waypoints) == 0:
+        return (result for result in [_direct_route(graph, start_node, end_node)] if result is not None)
+    
+    matrix, build_result = _tsp_problem(graph, start_node, waypoints, end_node, cache)
+    print(f"🔍 TSP (anytime): {len(waypoints)} ara durak, süre sınırı {time_limit} sn")
+    
+    def generate():
+        for item in anytime_tsp(matrix, time_limit):
+            yield None if item is None else build_result(*item)
+    
+    return generate()
 
 
 # Test kodu
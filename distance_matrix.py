@@ -0,0 +1,188 @@
+"""
+Distance Matrix - Çoktan çoğa (many-to-many) mesafe tablosu
+CENG 3511 - Artificial Intelligence Final Project
+
+Her kaynak için tek bir Dijkstra araması yapılır ve tüm hedefler
+kesinleştiğinde arama durur. Kaynaklar CPU çekirdeklerine dağıtılır.
+Toplu rota istekleri (/api/batch-routes) de aynı kaynak gruplamasını kullanır.
+
+İşlem havuzu process başına bir tanedir ve istekler arasında paylaşılır;
+graph değişince (yeniden yükleme, kenar güncellemesi, başka bölge)
+yenisiyle değiştirilir. serve.py worker'ları zaten çekirdek başına
+process olduğundan orada PARALLEL_WORKERS = 1 yapılır ve arama seri
+çalışır (thread'li worker içinden fork edilmez).
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dijkstra import Graph, build_path_result, one_to_many
+
+# Bu sayıdan az kaynak için işlem havuzu kullanılmaz (dağıtma maliyeti kazançtan büyük)
+MIN_PARALLEL_SOURCES = 4
+
+# workers verilmezse kullanılan işlem sayısı (serve.py worker'larında 1)
+PARALLEL_WORKERS = os.cpu_count() or 1
+
+# Worker process'lerin paylaştığı graph (fork ile kopyalanmadan devralınır)
+_worker_graph = None
+
+# Process başına paylaşılan havuz: (graph sürümü, işlem sayısı, havuz)
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def _init_worker(graph: Graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def get_worker_graph() -> Graph:
+    """make_graph_executor ile açılan bir worker içinde paylaşılan graph"""
+    return _worker_graph
+
+
+def _row_for_source(graph: Graph, source: int, targets: List[int], include_paths: bool) -> Dict:
+    """Tek bir kaynak için mesafe satırını (ve istenirse yolları) hesaplar"""
+    distances, target_paths = one_to_many(graph, source, targets, paths=include_paths)
+    inf = float('inf')
+
+    row = []
+    paths = [] if include_paths else None
+    for k, distance in enumerate(distances):
+        if distance == inf:
+            row.append(None)
+            if include_paths:
+                paths.append(None)
+            continue
+
+        row.append(round(distance, 3))
+        if include_paths:
+            paths.append(build_path_result(graph, target_paths[k], distance))
+
+    return {'distances': row, 'paths': paths}
+
+
+def _worker_row(source: int, targets: List[int], include_paths: bool) -> Dict:
+    return _row_for_source(_worker_graph, source, targets, include_paths)
+
+
+def make_graph_executor(graph: Graph, workers: int) -> ProcessPoolExecutor:
+    """Graph'ı paylaşan bir işlem havuzu oluşturur (mümkünse fork ile)"""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(graph,)
+    )
+
+
+def shared_graph_executor(graph: Graph, workers: int) -> ProcessPoolExecutor:
+    """
+    Bu process'in graph için paylaşılan işlem havuzu (ilk kullanımda açılır)
+
+    Havuz başka bir graph sürümü veya işlem sayısı için açıldıysa kapatılır;
+    eski havuzda bekleyen işler yine de tamamlanır.
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is not None:
+            version, size, executor = _shared_executor
+            if version == graph.version and size == workers:
+                return executor
+            executor.shutdown(wait=False)
+        executor = make_graph_executor(graph, workers)
+        _shared_executor = (graph.version, workers, executor)
+        return executor
+
+
+def _reset_shared_executor():
+    global _shared_executor, _shared_executor_lock
+    # Havuzun işlemleri ebeveyne aittir; çocuk process kendi havuzunu açar
+    _shared_executor = None
+    _shared_executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_shared_executor)
+
+
+def iter_source_rows(graph: Graph, groups: Dict[int, List[int]], include_paths: bool = False,
+                     workers: Optional[int] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Her kaynak için satırı hesaplanır hesaplanmaz verir
+
+    Args:
+        graph: Graph objesi
+        groups: {kaynak indeksi: [hedef indeksleri]}
+        include_paths: True ise satırda yollar da bulunur
+        workers: İşlem sayısı (None = PARALLEL_WORKERS, 1 = seri)
+
+    Yields:
+        (kaynak indeksi, {'distances': [...], 'paths': [...] veya None})
+        Paralel çalışmada sıra tamamlanma sırasıdır.
+    """
+    if workers is None:
+        workers = PARALLEL_WORKERS
+
+    if workers <= 1 or len(groups) < MIN_PARALLEL_SOURCES:
+        for source, targets in groups.items():
+            yield source, _row_for_source(graph, source, targets, include_paths)
+        return
+
+    executor = shared_graph_executor(graph, workers)
+    futures = {
+        executor.submit(_worker_row, source, targets, include_paths): source
+        for source, targets in groups.items()
+    }
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Tüketici erken bırakırsa (ör. istemci bağlantıyı kesti) bu isteğin
+        # bekleyen işleri iptal edilir; havuz diğer istekler için açık kalır
+        for future in futures:
+            future.cancel()
+
+
+def compute_distance_matrix(graph: Graph, sources: List[str], targets: List[str],
+                            include_paths: bool = False,
+                            workers: Optional[int] = None) -> Dict:
+    """
+    Kaynak ve hedef düğümler arasındaki mesafe matrisini hesaplar
+
+    Args:
+        graph: Graph objesi
+        sources: Kaynak düğüm ID'leri
+        targets: Hedef düğüm ID'leri
+        include_paths: True ise her hücre için path/coordinates da döner
+        workers: İşlem sayısı (None = PARALLEL_WORKERS, 1 = seri)
+
+    Returns:
+        {
+            'distances': [[km veya None, ...], ...],   # sources x targets
+            'paths': [[dijkstra sonucu veya None, ...], ...]  # include_paths ise
+        }
+    """
+    for node_id in list(sources) + list(targets):
+        if not graph.node_exists(node_id):
+            raise ValueError(f"Düğüm bulunamadı: {node_id}")
+
+    source_indices = [graph.node_index[node_id] for node_id in sources]
+    target_indices = [graph.node_index[node_id] for node_id in targets]
+
+    # Aynı kaynak birden fazla kez istenirse yalnızca bir arama yapılır
+    groups = {source: target_indices for source in source_indices}
+    rows = dict(iter_source_rows(graph, groups, include_paths, workers))
+
+    result = {'distances': [rows[source]['distances'] for source in source_indices]}
+    if include_paths:
+        result['paths'] = [rows[source]['paths'] for source in source_indices]
+    return result
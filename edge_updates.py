@@ -0,0 +1,219 @@
+"""
+Edge Updates - Kenar ağırlıklarının canlı güncellenmesi (kapanma, yoğunluk)
+CENG 3511 - Artificial Intelligence Final Project
+
+Bir güncelleme grubu ağırlık dizisinin kopyasına uygulanır ve yeni
+sürümlü bir Graph döner; eski graph'ı kullanan sorgular tutarlı bir
+görüntüyle biter, önbellek anahtarları kendiliğinden eskir. Türetilmiş
+yapılar baştan kurulmaz:
+    - Ters CSR ağırlıkları ve A* ölçeği sadece değişen kenarlarda güncellenir
+    - ALT tabloları azalan kenarlardan etkilenen düğümlerde onarılır
+    - CH kısayolları tanık aramalarıyla seçildiği için ağırlıklar temel
+      değerlerden saparken devre dışı kalır, sapma kalkınca geri gelir
+
+Etkin güncellemeler mugla_full.json'un yanında mugla_full.updates.json
+dosyasında tutulur; serve.py worker'ları aynı durumu bu dosyadan okur ve
+graph yeniden yüklendiğinde kapanmalar korunur.
+
+Güncelleme biçimi:
+    {"from": "node_1", "to": "node_2", "weight": 1.8}     # yoğunluk
+    {"from": "node_1", "to": "node_2", "closed": true}    # kapanma
+    {"from": "node_1", "to": "node_2", "reset": true}     # temel ağırlığa dön
+    "bidirectional": true ile her iki yöne uygulanır
+"""
+
+import contextlib
+import json
+import math
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from dijkstra import Graph
+
+try:
+    import fcntl  # Opsiyonel: worker'lar arası dosya kilidi (Unix)
+except ImportError:
+    fcntl = None
+
+# (kaynak indeksi, hedef indeksi) -> yeni ağırlık (None = temel ağırlığa dön)
+EdgeChanges = Dict[Tuple[int, int], Optional[float]]
+
+
+def updates_path_for(graph_path: str) -> str:
+    """mugla_full.json -> mugla_full.updates.json"""
+    return os.path.splitext(graph_path)[0] + '.updates.json'
+
+
+def edge_slots(graph: Graph, source: int, target: int) -> List[int]:
+    """source -> target kenarlarının CSR konumları (paralel kenarlar dahil)"""
+    targets = graph.targets
+    return [k for k in range(graph.offsets[source], graph.offsets[source + 1])
+            if targets[k] == target]
+
+
+def parse_updates(graph: Graph, items: List[Dict]) -> EdgeChanges:
+    """
+    API'den gelen güncelleme listesini doğrular
+
+    Raises:
+        KeyError: Eksik alan
+        ValueError: Bilinmeyen düğüm/kenar veya geçersiz ağırlık
+    """
+    changes = {}
+    for item in items:
+        source = graph.get_node_index(item['from'])
+        target = graph.get_node_index(item['to'])
+        if source is None or target is None:
+            missing = item['from'] if source is None else item['to']
+            raise ValueError(f"Düğüm bulunamadı: {missing}")
+
+        if item.get('reset'):
+            weight = None
+        elif item.get('closed'):
+            weight = float('inf')
+        else:
+            weight = float(item['weight'])
+            if not math.isfinite(weight) or weight < 0:
+                raise ValueError(f"Ağırlık sonlu ve negatif olmayan bir sayı olmalı: {weight}")
+
+        pairs = [(source, target)]
+        if item.get('bidirectional'):
+            # Tek yönlü yollarda sadece var olan yön güncellenir
+            pairs.append((target, source))
+        pairs = [(u, v) for u, v in pairs if edge_slots(graph, u, v)]
+        if not pairs:
+            raise ValueError(f"Kenar bulunamadı: {item['from']} → {item['to']}")
+        for pair in pairs:
+            changes[pair] = weight
+
+    return changes
+
+
+def changes_to(graph: Graph, overrides: Dict[Tuple[int, int], float]) -> EdgeChanges:
+    """graph'ın güncellemelerini verilen tam duruma getiren değişiklikler"""
+    current = graph.weight_overrides
+    changes = {pair: None for pair in current if pair not in overrides}
+    changes.update((pair, weight) for pair, weight in overrides.items()
+                   if current.get(pair) != weight)
+    return changes
+
+
+def apply_edge_updates(graph: Graph, changes: EdgeChanges) -> Graph:
+    """
+    Değişiklikleri uygulanmış yeni bir Graph döndürür (hiçbir kenar
+    değişmiyorsa graph'ın kendisi döner)
+
+    Grup tek seferde uygulanır: yeni nesne tüm değişiklikleri içerir,
+    eski nesne hiçbirini içermez.
+    """
+    base = graph.base_weights
+    weights = graph.weights
+    overrides = dict(graph.weight_overrides)
+
+    # Değişen kenar konumu -> (kaynak, hedef, yeni ağırlık)
+    changed = {}
+    for (u, v), weight in changes.items():
+        slots = edge_slots(graph, u, v)
+        if weight is None or all(base[k] == weight for k in slots):
+            overrides.pop((u, v), None)
+            new_weights = [base[k] for k in slots]
+        else:
+            overrides[(u, v)] = weight
+            new_weights = [weight] * len(slots)
+
+        for k, new_weight in zip(slots, new_weights):
+            if weights[k] != new_weight:
+                changed[k] = (u, v, new_weight)
+
+    if not changed:
+        return graph
+
+    updated_weights = array('d')
+    updated_weights.frombytes(memoryview(weights).cast('B'))
+    for k, (_, _, weight) in changed.items():
+        updated_weights[k] = weight
+
+    updated = graph.with_weights(updated_weights, list(changed))
+    updated.weight_overrides = overrides
+
+    hierarchy = graph.hierarchy or graph.suspended_hierarchy
+    if overrides:
+        updated.suspended_hierarchy = hierarchy
+    else:
+        updated.hierarchy = hierarchy
+
+    if graph.landmarks is not None:
+        decreased = [(u, v, weight) for k, (u, v, weight) in changed.items()
+                     if weight < weights[k]]
+        updated.landmarks = graph.landmarks.repaired(updated, decreased)
+
+    return updated
+
+
+def overrides_to_json(graph: Graph) -> List[Dict]:
+    """Etkin güncellemeleri düğüm ID'leriyle listeler"""
+    node_ids = graph.node_ids
+    items = []
+    for (u, v), weight in sorted(graph.weight_overrides.items()):
+        item = {'from': node_ids[u], 'to': node_ids[v]}
+        if weight == float('inf'):
+            item['closed'] = True
+        else:
+            item['weight'] = weight
+        items.append(item)
+    return items
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """Dosyanın değişip değişmediğini anlamak için (inode, mtime, boyut)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def read_updates_file(path: str, graph: Graph) -> Dict[Tuple[int, int], float]:
+    """
+    Güncellemeler dosyasını okur (yoksa boş)
+
+    Bu graph'ta bulunmayan kenarlar (ör. graph dosyası değiştiyse) atlanır.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)['updates']
+    except FileNotFoundError:
+        return {}
+
+    overrides = {}
+    for item in items:
+        try:
+            changes = parse_updates(graph, [item])
+        except (KeyError, ValueError) as e:
+            print(f"⚠️  Kenar güncellemesi atlandı: {e}")
+            continue
+        overrides.update(changes)
+    return overrides
+
+
+def write_updates_file(path: str, graph: Graph):
+    """Etkin güncellemeleri dosyaya yazar (yarım yazılmış dosya okunmaz)"""
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump({'updates': overrides_to_json(graph)}, f, ensure_ascii=False, indent=1)
+    os.replace(temporary, path)
+
+
+@contextlib.contextmanager
+def locked_updates_file(path: str):
+    """Oku-değiştir-yaz sırasında diğer worker'ları bekletir (fcntl yoksa kilitsiz)"""
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
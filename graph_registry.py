@@ -0,0 +1,344 @@
+"""
+Graph Registry - Bölge başına tembel yüklenen graph'lar ve bellek bütçesi
+CENG 3511 - Artificial Intelligence Final Project
+
+Komşu illerin graph'ları aynı process'ten sunulur, ama hepsi aynı anda
+bellekte tutulmaz:
+    - Her bölge bir graph dosyası ve (varsa) sınır kutusuyla kaydedilir;
+      graph ilk istekte yüklenir
+    - İstek bölgesi açık bir ad ya da istekteki koordinat ile seçilir;
+      koordinat birden fazla kutuya düşerse en küçük kutu seçilir
+    - Yüklü graph'ların tahmini boyutu bütçeyi aşınca, o an kullanılmayan
+      bölgeler en uzun süredir boşta olandan başlayarak boşaltılır;
+      varsayılan bölge boşaltılmaz
+
+Bölge dosyası (JSON):
+    {
+        "default": "mugla",
+        "regions": {
+            "mugla": {"graph": "mugla_full.json", "bounds": [36.3, 27.2, 37.6, 29.5]},
+            "aydin": {"graph": "aydin_full.json", "bounds": [37.4, 27.1, 38.1, 28.7]}
+        }
+    }
+bounds = [min_lat, min_lon, max_lat, max_lon]; verilmezse bölge ilk
+yüklendiğinde graph'tan hesaplanır (o zamana kadar sadece adıyla seçilir).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metrics
+from dijkstra import Graph
+
+# Varsayılan bellek bütçesi (bayt); yüklü graph'ların tahmini toplamı
+DEFAULT_MEMORY_BUDGET = 2 * 1024 * 1024 * 1024
+
+# Python nesnesi başına yaklaşık ek yük (dict girdisi, int nesnesi)
+_OBJECT_OVERHEAD = 64
+
+
+class RegionError(Exception):
+    """Bilinmeyen bölge veya yüklenemeyen graph"""
+
+
+class UnknownRegionError(RegionError):
+    """İstenen bölge adı kayıtlı değil"""
+
+
+def _buffer_bytes(value, seen: set, depth: int = 2) -> int:
+    """
+    Dizi/tampon ve bunları tutan liste, tuple ve nesnelerin yaklaşık boyutu
+    (seen: sayılmış nesneler; paylaşılan diziler bir kez sayılır)
+    """
+    if value is None or isinstance(value, Graph) or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, array):
+        return len(value) * value.itemsize
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if depth <= 0:
+        return 0
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return sys.getsizeof(value)
+        first = value[0]
+        if isinstance(first, (str, int, float)):
+            return sys.getsizeof(value) + len(value) * sys.getsizeof(first)
+        return sys.getsizeof(value) + sum(_buffer_bytes(item, seen, depth - 1) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + len(value) * _OBJECT_OVERHEAD
+    if hasattr(value, '__dict__'):
+        return sum(_buffer_bytes(item, seen, depth - 1) for item in vars(value).values())
+    return 0
+
+
+def estimate_graph_bytes(graph: Graph) -> int:
+    """
+    Graph'ın ve ona bağlı ön işleme verilerinin (ters diziler, spatial
+    index, bileşenler, CH, ALT) yaklaşık bellek kullanımı
+
+    Bütçe kararları için tahmindir; mmap ile açılan ikili graph'larda
+    sayfalar dosyadan gelir ama yine de sayılır.
+    """
+    seen = set()
+    parts = (graph.lat, graph.lon, graph.offsets, graph.targets, graph.weights, graph.base_weights,
+             graph.node_ids, graph.node_index, graph.shapes, graph._reverse,
+             graph.spatial_index, graph.components, graph.hierarchy, graph.landmarks)
+    return sum(_buffer_bytes(part, seen) for part in parts)
+
+
+class Region:
+    """
+    Bir bölgenin graph dosyası ve yükleme durumu
+
+    Attributes:
+        graph: Yüklü graph (None = yüklenmedi veya boşaltıldı); kenar
+            güncellemeleri bu alanı yeni Graph ile değiştirir
+        bounds: (min_lat, min_lon, max_lat, max_lon) veya None
+        updates_stamp, updates_checked: Kenar güncellemeleri dosyasının
+            son uygulanan durumu ve son kontrol zamanı
+    """
+
+    def __init__(self, name: str, path: str, bounds: Optional[Tuple[float, float, float, float]] = None,
+                 pinned: bool = False):
+        self.name = name
+        self.path = path
+        self.bounds = bounds
+        self.pinned = pinned
+        self.graph = None
+        self.size = 0
+        self.active = 0
+        self.last_used = 0.0
+        self.loads = 0
+
+        self.updates_stamp = None
+        self.updates_checked = 0.0
+        # Graph değişimi (kenar güncellemeleri) bölge başına tek thread'de yapılır
+        self.update_lock = threading.Lock()
+        # Aynı bölge iki thread tarafından aynı anda yüklenmesin
+        self.load_lock = threading.Lock()
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if self.bounds is None:
+            return False
+        min_lat, min_lon, max_lat, max_lon = self.bounds
+        return min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+
+    def area(self) -> float:
+        min_lat, min_lon, max_lat, max_lon = self.bounds
+        return (max_lat - min_lat) * (max_lon - min_lon)
+
+    def summary(self) -> Dict:
+        return {
+            'graph': self.path,
+            'bounds': None if self.bounds is None else list(self.bounds),
+            'loaded': self.graph is not None,
+            'estimated_bytes': self.size if self.graph is not None else 0,
+            'active_requests': self.active,
+            'loads': self.loads,
+            'pinned': self.pinned
+        }
+
+
+def graph_bounds(graph: Graph) -> Optional[Tuple[float, float, float, float]]:
+    """Graph'ın koordinat sınırları"""
+    if not graph.node_count:
+        return None
+    return min(graph.lat), min(graph.lon), max(graph.lat), max(graph.lon)
+
+
+class GraphRegistry:
+    """
+    Bölge adı -> Region; graph'lar ilk kullanımda yüklenir, bütçe aşılınca
+    boştaki bölgeler LRU sırasıyla boşaltılır
+
+    loader(region) graph'ı okuyup hazırlar (spatial index, CH, ...);
+    RegionError dışındaki hatalar RegionError'a çevrilir.
+    """
+
+    def __init__(self, loader: Callable[[Region], Graph], memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.loader = loader
+        self.memory_budget = memory_budget
+        self.regions = {}
+        self.default = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, path: str, bounds: Optional[Tuple[float, float, float, float]] = None,
+            default: bool = False) -> Region:
+        """Bölgeyi kaydeder (yüklemeden); varsayılan bölge boşaltılmaz"""
+        region = Region(name, path, bounds, pinned=default)
+        with self._lock:
+            self.regions[name] = region
+            if default or self.default is None:
+                if self.default is not None:
+                    self.regions[self.default].pinned = False
+                self.default = name
+                region.pinned = True
+        return region
+
+    def clear(self):
+        """Tüm bölgeleri unutur (yeniden yapılandırma)"""
+        with self._lock:
+            self.regions = {}
+            self.default = None
+
+    def region(self, name: Optional[str] = None) -> Region:
+        """Ada göre bölge (None = varsayılan)"""
+        name = self.default if name is None else name
+        region = self.regions.get(name)
+        if region is None:
+            known = ', '.join(sorted(self.regions)) or '-'
+            raise UnknownRegionError(f"Bilinmeyen bölge: {name} (bölgeler: {known})")
+        return region
+
+    def region_for_point(self, lat: float, lon: float) -> Region:
+        """Noktayı içeren en küçük kutulu bölge; hiçbiri içermiyorsa varsayılan"""
+        candidates = [region for region in self.regions.values() if region.contains(lat, lon)]
+        if not candidates:
+            return self.region()
+        return min(candidates, key=Region.area)
+
+    def acquire(self, region: Region) -> Graph:
+        """
+        Bölgenin graph'ını döndürür (gerekirse yükler) ve bölgeyi kullanımda
+        işaretler; her acquire bir release ile kapatılmalıdır
+
+        Raises:
+            RegionError: Graph yüklenemezse
+        """
+        with self._lock:
+            region.active += 1
+            region.last_used = time.monotonic()
+        try:
+            if region.graph is None:
+                self._load(region)
+            return region.graph
+        except BaseException:
+            self.release(region)
+            raise
+
+    def release(self, region: Region):
+        with self._lock:
+            region.active -= 1
+            region.last_used = time.monotonic()
+            over_budget = self.loaded_bytes() > self.memory_budget
+        # Kullanımdayken boşaltılamayan bölgeler bırakılınca boşaltılabilir
+        if over_budget:
+            self.evict()
+
+    def attach(self, region: Region, graph: Graph):
+        """Yüklenmiş (veya hazır verilen) graph'ı bölgeye bağlar"""
+        region.size = estimate_graph_bytes(graph)
+        if region.bounds is None:
+            region.bounds = graph_bounds(graph)
+        region.updates_stamp = None
+        region.updates_checked = 0.0
+        region.graph = graph
+
+    def _load(self, region: Region):
+        with region.load_lock:
+            if region.graph is not None:
+                return
+            print(f"📂 Bölge yükleniyor: {region.name} ({region.path})")
+            started = time.perf_counter()
+            try:
+                loaded = self.loader(region)
+            except RegionError:
+                raise
+            except Exception as e:
+                raise RegionError(f"{region.name} bölgesi yüklenemedi: {e}") from e
+
+            self.attach(region, loaded)
+            region.loads += 1
+            metrics.inc('route_region_events_total', region=region.name, event='load')
+            print(f"✅ Bölge yüklendi: {region.name}, {loaded.node_count} düğüm, "
+                  f"~{region.size / 1024 / 1024:.0f} MB ({time.perf_counter() - started:.1f} sn)")
+        self.evict(keep=region)
+
+    def loaded_bytes(self) -> int:
+        return sum(region.size for region in self.regions.values() if region.graph is not None)
+
+    def evict(self, keep: Optional[Region] = None) -> List[str]:
+        """
+        Bütçe aşılmışsa boştaki bölgeleri en eski kullanımdan başlayarak
+        boşaltır; kullanımdaki ve varsayılan bölgeler boşaltılmaz
+
+        Returns:
+            Boşaltılan bölge adları
+        """
+        evicted = []
+        with self._lock:
+            total = self.loaded_bytes()
+            idle = sorted((region for region in self.regions.values()
+                           if region.graph is not None and not region.pinned
+                           and region.active == 0 and region is not keep),
+                          key=lambda region: region.last_used)
+            for region in idle:
+                if total <= self.memory_budget:
+                    break
+                total -= region.size
+                # Bölgeyi kullanan eski nesneler (ör. akan yanıtlar) graph'ı kendileri tutar
+                region.graph = None
+                evicted.append(region.name)
+                metrics.inc('route_region_events_total', region=region.name, event='evict')
+
+        for name in evicted:
+            print(f"♻️  Bölge boşaltıldı: {name} (bütçe {self.memory_budget / 1024 / 1024:.0f} MB)")
+        if total > self.memory_budget:
+            print(f"⚠️  Yüklü bölgeler bütçeyi aşıyor: ~{total / 1024 / 1024:.0f} MB "
+                  f"(boşaltılabilecek boşta bölge yok)")
+        return evicted
+
+    def summary(self) -> Dict:
+        """API için bölge özetleri"""
+        return {
+            'default': self.default,
+            'memory_budget': self.memory_budget,
+            'loaded_bytes': self.loaded_bytes(),
+            'regions': {name: region.summary() for name, region in self.regions.items()}
+        }
+
+
+def read_regions_file(path: str) -> Tuple[Optional[str], Dict[str, Dict]]:
+    """
+    Bölge dosyasını okur; graph yolları dosyanın klasörüne göredir
+
+    Returns:
+        (varsayılan bölge adı, {ad: {'graph': yol, 'bounds': tuple veya None}})
+
+    Raises:
+        ValueError: Dosya biçimi geçersizse
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    regions = data.get('regions') if isinstance(data, dict) else None
+    if not isinstance(regions, dict) or not regions:
+        raise ValueError(f"{path}: 'regions' nesnesi bekleniyor")
+
+    base = os.path.dirname(os.path.abspath(path))
+    parsed = {}
+    for name, entry in regions.items():
+        if not isinstance(entry, dict) or not isinstance(entry.get('graph'), str):
+            raise ValueError(f"{path}: {name} bölgesi için 'graph' yolu eksik")
+        bounds = entry.get('bounds')
+        if bounds is not None:
+            if len(bounds) != 4:
+                raise ValueError(f"{path}: {name} bounds [min_lat, min_lon, max_lat, max_lon] olmalı")
+            bounds = tuple(float(value) for value in bounds)
+            if bounds[0] > bounds[2] or bounds[1] > bounds[3]:
+                raise ValueError(f"{path}: {name} bounds ters sırada")
+        parsed[name] = {'graph': os.path.join(base, entry['graph']), 'bounds': bounds}
+
+    default = data.get('default')
+    if default is not None and default not in parsed:
+        raise ValueError(f"{path}: varsayılan bölge tanımlı değil: {default}")
+    return default, parsed
@@ -0,0 +1,319 @@
+"""
+Isochrone - Belirli mesafe içinde ulaşılabilen alanın poligonları
+CENG 3511 - Artificial Intelligence Final Project
+
+Sınırlı tek kaynaklı arama (bounded_search) sadece bütçe içindeki
+düğümleri gezer. Ulaşılan kenarlar hücre boyutu aralıklarla örneklenip
+kaynağın çevresindeki bir ızgaraya işlenir (hücre değeri = içindeki en
+küçük mesafe). Her bant için hücrelerin birleşiminin sınırı GeoJSON
+poligon halkalarına çevrilir. Çalışma süresi graph'ın tamamıyla değil,
+ulaşılan bölgeyle orantılıdır.
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+from dijkstra import Graph, bounded_search, haversine_distance
+
+# Izgara hücresi kenar uzunluğu (metre)
+DEFAULT_CELL_SIZE = 100.0
+
+# İzin verilen hücre boyutu aralığı (metre)
+MIN_CELL_SIZE = 10.0
+MAX_CELL_SIZE = 5000.0
+
+# Tek istekte en fazla bant sayısı
+MAX_BANDS = 10
+
+# İşaretlenebilecek en fazla hücre (bütçe / hücre boyutu oranı çok büyükse)
+MAX_GRID_CELLS = 1000000
+
+# Koordinatların ondalık basamak sayısı (~0.1 m)
+COORDINATE_PRECISION = 6
+
+# Bir derece enlemin metre karşılığı
+METERS_PER_DEGREE = 111320.0
+
+# Yön -> sola dönüldüğünde yeni yön (halkalar dolu hücreler solda kalacak şekilde izlenir)
+_LEFT_TURN = {(1, 0): (0, 1), (0, 1): (-1, 0), (-1, 0): (0, -1), (0, -1): (1, 0)}
+
+
+class _Grid:
+    """Kaynak noktasına hizalı enlem/boylam ızgarası"""
+
+    def __init__(self, lat: float, lon: float, cell_size: float):
+        self.cell_size = cell_size
+        self.origin_lat = lat
+        self.origin_lon = lon
+        self.lat_step = cell_size / METERS_PER_DEGREE
+        self.lon_step = cell_size / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        self.cell_area_km2 = (cell_size / 1000.0) ** 2
+
+    def cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        """(x, y) = (boylam sütunu, enlem satırı)"""
+        return (math.floor((lon - self.origin_lon) / self.lon_step),
+                math.floor((lat - self.origin_lat) / self.lat_step))
+
+    def vertex(self, x: int, y: int) -> List[float]:
+        """Hücre köşesini GeoJSON [lon, lat] olarak döndürür"""
+        return [round(self.origin_lon + x * self.lon_step, COORDINATE_PRECISION),
+                round(self.origin_lat + y * self.lat_step, COORDINATE_PRECISION)]
+
+
+def _mark(cells: Dict[Tuple[int, int], float], cell: Tuple[int, int], distance: float):
+    current = cells.get(cell)
+    if current is None:
+        if len(cells) >= MAX_GRID_CELLS:
+            raise ValueError(f"Izgara çok büyük (en fazla {MAX_GRID_CELLS} hücre); "
+                             f"daha büyük bir hücre boyutu seçin")
+        cells[cell] = distance
+    elif distance < current:
+        cells[cell] = distance
+
+
+def reachable_cells(graph: Graph, reached: Dict[int, float], max_distance: float,
+                    grid: _Grid, reverse: bool = False) -> Dict[Tuple[int, int], float]:
+    """
+    Ulaşılan düğümleri ve kenarların bütçe içindeki kısımlarını ızgaraya işler
+
+    Returns:
+        {(x, y): hücredeki en küçük mesafe}
+    """
+    if reverse:
+        offsets, neighbors, weights = graph.get_reverse_arrays()
+    else:
+        offsets = graph.offsets
+        neighbors = graph.targets
+        weights = graph.weights
+    lat = graph.lat
+    lon = graph.lon
+    cell_km = grid.cell_size / 1000.0
+
+    cells = {}
+    for node, distance in reached.items():
+        _mark(cells, grid.cell(lat[node], lon[node]), distance)
+        remaining = max_distance - distance
+
+        for k in range(offsets[node], offsets[node + 1]):
+            weight = weights[k]
+            if weight == float('inf'):
+                continue
+            # Kenarın bütçe içinde kalan oranı
+            fraction = 1.0 if weight <= remaining else remaining / weight
+            neighbor = neighbors[k]
+            length = haversine_distance(lat[node], lon[node], lat[neighbor], lon[neighbor])
+            steps = math.ceil(length * fraction / cell_km)
+            for step in range(1, steps + 1):
+                t = fraction * step / steps
+                _mark(cells,
+                      grid.cell(lat[node] + (lat[neighbor] - lat[node]) * t,
+                                lon[node] + (lon[neighbor] - lon[node]) * t),
+                      distance + weight * t)
+
+    return cells
+
+
+def _cell_components(cells) -> Dict[Tuple[int, int], int]:
+    """4-komşuluklu bağlı bileşen numaraları (köşeden değen hücreler ayrıdır)"""
+    component = {}
+    for start in cells:
+        if start in component:
+            continue
+        label = len(component)
+        component[start] = label
+        queue = deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for neighbor in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if neighbor in cells and neighbor not in component:
+                    component[neighbor] = label
+                    queue.append(neighbor)
+    return component
+
+
+def _trace_rings(cells) -> List[Tuple[List[Tuple[int, int]], Tuple[int, int]]]:
+    """
+    Hücre birleşiminin sınırını kapalı, basit halkalara çevirir
+
+    Dış sınırlar saat yönünün tersine, delikler saat yönünde döner
+    (GeoJSON sağ el kuralı). Köşeden değen hücrelerde sola dönülür;
+    bir köşeden iki kez geçen halka o köşede ikiye bölünür, böylece
+    halkalar kendine değmez.
+
+    Returns:
+        [(köşe listesi, halkanın solundaki bir hücre), ...]
+    """
+    # Köşe -> [(sonraki köşe, soldaki hücre), ...]
+    outgoing = {}
+    for x, y in cells:
+        for a, b, neighbor in (
+                ((x, y), (x + 1, y), (x, y - 1)),
+                ((x + 1, y), (x + 1, y + 1), (x + 1, y)),
+                ((x + 1, y + 1), (x, y + 1), (x, y + 1)),
+                ((x, y + 1), (x, y), (x - 1, y))):
+            if neighbor not in cells:
+                outgoing.setdefault(a, []).append((b, (x, y)))
+
+    rings = []
+    while outgoing:
+        start = next(iter(outgoing))
+        previous = None
+        current = start
+        # (köşe, bu köşeden çıkan kenarın solundaki hücre)
+        stack = []
+        position = {}
+        while True:
+            options = outgoing[current]
+            choice = 0
+            if len(options) > 1 and previous is not None:
+                direction = (current[0] - previous[0], current[1] - previous[1])
+                left = _LEFT_TURN[direction]
+                for i, (following, _) in enumerate(options):
+                    if (following[0] - current[0], following[1] - current[1]) == left:
+                        choice = i
+                        break
+            following, cell = options.pop(choice)
+            if not options:
+                del outgoing[current]
+
+            if current in position:
+                # Köşeye ikinci kez gelindi: aradaki kısım ayrı bir halkadır
+                index = position[current]
+                rings.append(_simplify(stack[index:]))
+                for vertex, _ in stack[index:]:
+                    del position[vertex]
+                del stack[index:]
+            position[current] = len(stack)
+            stack.append((current, cell))
+
+            previous, current = current, following
+            if current == start and start not in outgoing:
+                break
+
+        rings.append(_simplify(stack))
+
+    return rings
+
+
+def _simplify(ring: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> Tuple[List[Tuple[int, int]], Tuple[int, int]]:
+    """Düz kenarların ortasındaki köşeleri atar; (köşeler, soldaki hücre) döndürür"""
+    vertices = [vertex for vertex, _ in ring]
+    corners = [vertex for i, vertex in enumerate(vertices)
+               if not _same_direction(vertices[i - 1], vertex, vertices[(i + 1) % len(vertices)])]
+    return corners, ring[0][1]
+
+
+def _same_direction(a, b, c) -> bool:
+    """a -> b ve b -> c aynı yönde mi (b gereksiz köşe mi)"""
+    first = (b[0] - a[0], b[1] - a[1])
+    second = (c[0] - b[0], c[1] - b[1])
+    return first[0] * second[1] == first[1] * second[0] and \
+        first[0] * second[0] + first[1] * second[1] > 0
+
+
+def _ring_area(ring: List[Tuple[int, int]]) -> float:
+    """İşaretli alan (saat yönünün tersi pozitif)"""
+    area = 0
+    for i, (x0, y0) in enumerate(ring):
+        x1, y1 = ring[(i + 1) % len(ring)]
+        area += x0 * y1 - x1 * y0
+    return area / 2
+
+
+def cell_polygons(cells, grid: _Grid) -> List[List[List[List[float]]]]:
+    """
+    Hücre kümesini GeoJSON MultiPolygon koordinatlarına çevirir
+
+    Her bağlı bileşen bir poligondur: önce dış halka, sonra delikler.
+    """
+    component = _cell_components(cells)
+    polygons = {}
+    holes = []
+    for ring, cell in _trace_rings(cells):
+        coordinates = [grid.vertex(x, y) for x, y in ring]
+        coordinates.append(coordinates[0])
+        if _ring_area(ring) > 0:
+            polygons[component[cell]] = [coordinates]
+        else:
+            holes.append((component[cell], coordinates))
+
+    for label, coordinates in holes:
+        polygons[label].append(coordinates)
+    return [polygons[label] for label in sorted(polygons)]
+
+
+def isochrone(graph: Graph, source: int, bands: List[float],
+              cell_size: float = DEFAULT_CELL_SIZE, reverse: bool = False,
+              stats: Optional[Dict] = None) -> Dict:
+    """
+    Kaynaktan (reverse=True ise kaynağa) her bant mesafesi içinde
+    ulaşılabilen alanın poligonları
+
+    Args:
+        source: Kaynak düğüm indeksi
+        bands: Mesafe bantları (km, artan sırada olması gerekmez)
+        cell_size: Izgara hücresi boyutu (metre)
+        stats: Verilirse aramanın 'settled' ve 'pushed' sayıları yazılır
+
+    Returns:
+        {
+            'type': 'FeatureCollection',
+            'features': [{'type': 'Feature',
+                          'properties': {'distance', 'cell_count', 'area_km2'},
+                          'geometry': {'type': 'MultiPolygon', ...}}, ...],
+            'reached': {düğüm indeksi: mesafe}
+        }
+        Bantlar iç içedir (her bant küçük bantları da kapsar); büyükten
+        küçüğe sıralanır, böylece üst üste çizildiğinde hepsi görünür.
+
+    Raises:
+        ValueError: Geçersiz bant/hücre boyutu veya ızgara çok büyükse
+    """
+    if not bands or len(bands) > MAX_BANDS:
+        raise ValueError(f"1 ile {MAX_BANDS} arasında bant verilmeli")
+    if any(not math.isfinite(band) or band <= 0 for band in bands):
+        raise ValueError("Bant mesafeleri pozitif olmalı")
+    if not MIN_CELL_SIZE <= cell_size <= MAX_CELL_SIZE:
+        raise ValueError(f"Hücre boyutu {MIN_CELL_SIZE:g}-{MAX_CELL_SIZE:g} metre olmalı")
+
+    bands = sorted(set(bands), reverse=True)
+    max_distance = bands[0]
+
+    if stats is None:
+        stats = {}
+    with metrics.phase('search'):
+        reached = bounded_search(graph, source, max_distance, stats, reverse)
+    metrics.observe('route_search_settled_nodes', stats['settled'], algorithm='bounded')
+    metrics.observe('route_search_pushed_nodes', stats['pushed'], algorithm='bounded')
+
+    with metrics.phase('reconstruct'):
+        features = _band_features(graph, source, reached, bands, cell_size, reverse)
+
+    return {'type': 'FeatureCollection', 'features': features, 'reached': reached}
+
+
+def _band_features(graph: Graph, source: int, reached: Dict[int, float], bands: List[float],
+                   cell_size: float, reverse: bool) -> List[Dict]:
+    max_distance = bands[0]
+    grid = _Grid(graph.lat[source], graph.lon[source], cell_size)
+    cells = reachable_cells(graph, reached, max_distance, grid, reverse)
+
+    features = []
+    for band in bands:
+        band_cells = cells if band == max_distance else \
+            {cell for cell, distance in cells.items() if distance <= band}
+        features.append({
+            'type': 'Feature',
+            'properties': {
+                'distance': band,
+                'cell_count': len(band_cells),
+                'area_km2': round(len(band_cells) * grid.cell_area_km2, 3)
+            },
+            'geometry': {
+                'type': 'MultiPolygon',
+                'coordinates': cell_polygons(band_cells, grid)
+            }
+        })
+    return features
@@ -0,0 +1,406 @@
+"""
+ALT (A*, Landmarks, Triangle inequality) - Landmark tabanlı alt sınırlar
+CENG 3511 - Artificial Intelligence Final Project
+
+Seçilen k landmark için her düğüme olan (ve her düğümden gelen) mesafeler
+saklanır. Üçgen eşitsizliği ile elde edilen alt sınırlar A* aramasını
+hedefe yönlendirir. CH'ye göre çok daha hızlı yeniden hesaplanır, bu
+yüzden kenar ağırlıkları sık değiştiğinde de kullanılabilir.
+
+Kullanım:
+    python landmarks.py mugla_full.json [landmark_sayısı] [farthest|avoid]
+"""
+
+import heapq
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from typing import Callable, List, Optional, Tuple
+
+from dijkstra import Graph, graph_fingerprint, shortest_path_tree
+from distance_matrix import get_worker_graph, make_graph_executor
+
+# Dosya başlığı: sihirli değer + sürüm
+LANDMARK_MAGIC = b'MUGLALT\0'
+LANDMARK_VERSION = 1
+
+# Varsayılan landmark sayısı
+DEFAULT_LANDMARK_COUNT = 8
+
+# Her sorguda kullanılan landmark sayısı (kaynak-hedef çiftine göre en iyileri)
+ACTIVE_LANDMARKS = 4
+
+# Tablolar float32 saklanır; yuvarlama hatası sınırı aşmasın diye düşülen pay (km)
+BOUND_TOLERANCE = 1e-4
+
+# Landmark seçim yöntemleri
+SELECTION_METHODS = ('farthest', 'avoid')
+
+# 'avoid' yöntemindeki kök seçimleri için sabit tohum
+RANDOM_SEED = 42
+
+# 'avoid' yönteminde yeni landmark bulunamayan kök denemesi sınırı
+AVOID_MAX_FAILURES = 10
+
+
+def landmark_path_for(graph_path: str) -> str:
+    """mugla_full.json -> mugla_full.alt"""
+    return os.path.splitext(graph_path)[0] + '.alt'
+
+
+def _distance_row(graph: Graph, landmark: int, reverse: bool) -> array:
+    """Landmark'tan (reverse=True ise landmark'a) tüm düğümlerin mesafesi"""
+    distances, _ = shortest_path_tree(graph, landmark, None, reverse=reverse)
+    return array('f', distances)
+
+
+def _worker_distance_row(landmark: int, reverse: bool) -> array:
+    return _distance_row(get_worker_graph(), landmark, reverse)
+
+
+class LandmarkTable:
+    """
+    Landmark mesafe tabloları
+
+    dist_from[i][v]: i. landmark'tan v düğümüne mesafe
+    dist_to[i][v]:   v düğümünden i. landmark'a mesafe
+    """
+
+    def __init__(self, graph: Graph, landmarks: List[int],
+                 dist_from: List[array], dist_to: List[array]):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.dist_from = dist_from
+        self.dist_to = dist_to
+
+    def save(self, path: str):
+        """Tabloları ikili dosyaya yazar"""
+        with open(path, 'wb') as f:
+            f.write(LANDMARK_MAGIC)
+            f.write(struct.pack('<IIIQ', LANDMARK_VERSION, self.graph.node_count,
+                                len(self.landmarks), graph_fingerprint(self.graph)))
+            array('i', self.landmarks).tofile(f)
+            for row in self.dist_from + self.dist_to:
+                row.tofile(f)
+
+    @classmethod
+    def load(cls, path: str, graph: Graph) -> 'LandmarkTable':
+        """
+        Tabloları dosyadan yükler
+
+        Raises:
+            ValueError: Dosya biçimi veya graph uyuşmuyorsa
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(LANDMARK_MAGIC)) != LANDMARK_MAGIC:
+                raise ValueError(f"{path} geçerli bir landmark dosyası değil")
+
+            version, node_count, count, fingerprint = struct.unpack('<IIIQ', f.read(20))
+            if version != LANDMARK_VERSION:
+                raise ValueError(f"Desteklenmeyen landmark sürümü: {version}")
+            if node_count != graph.node_count or fingerprint != graph_fingerprint(graph):
+                raise ValueError(f"{path} bu graph için üretilmemiş, yeniden oluşturun")
+
+            landmarks = array('i')
+            landmarks.fromfile(f, count)
+
+            rows = []
+            for _ in range(2 * count):
+                row = array('f')
+                row.fromfile(f, node_count)
+                rows.append(row)
+
+        return cls(graph, list(landmarks), rows[:count], rows[count:])
+
+    def repaired(self, graph: Graph, decreased: List[Tuple[int, int, float]]) -> 'LandmarkTable':
+        """
+        Ağırlıkları değişmiş graph için tabloyu baştan hesaplamadan günceller
+
+        Alt sınırların geçerli (ve tutarlı) kalması için her satırın tüm
+        kenarlarda d[v] <= d[u] + w(u, v) koşulunu sağlaması yeterlidir;
+        artan ağırlıklar ve kapanmalar bunu bozmaz. Sadece azalan
+        kenarlardan (u, v, yeni ağırlık) başlayarak koşulu bozan düğümler
+        düzeltilir. Değişen satırlar kopyalanır; eski graph'taki sorgular
+        eski tabloyu kullanmaya devam eder.
+        """
+        dist_from = list(self.dist_from)
+        dist_to = list(self.dist_to)
+        if decreased:
+            rev_offsets, rev_sources, rev_weights = graph.get_reverse_arrays()
+            for i in range(len(self.landmarks)):
+                row = dist_from[i]
+                if any(row[u] + weight < row[v] for u, v, weight in decreased):
+                    row = dist_from[i] = array('f', row)
+                    _repair_row(row, graph.offsets, graph.targets, graph.weights,
+                                [u for u, _, _ in decreased])
+
+                row = dist_to[i]
+                if any(row[v] + weight < row[u] for u, v, weight in decreased):
+                    row = dist_to[i] = array('f', row)
+                    _repair_row(row, rev_offsets, rev_sources, rev_weights,
+                                [v for _, v, _ in decreased])
+
+        return LandmarkTable(graph, self.landmarks, dist_from, dist_to)
+
+    def lower_bound(self, node: int, target: int) -> float:
+        """Tüm landmark'larla node -> target için alt sınır"""
+        return self.heuristic_for(node, target, len(self.landmarks))(node)
+
+    def heuristic_for(self, source: int, target: int,
+                      active: int = ACTIVE_LANDMARKS) -> Callable[[int], float]:
+        """
+        Belirli bir hedef için A* sezgiseli oluşturur
+
+        Kaynakta en yüksek alt sınırı veren `active` landmark seçilir;
+        sorgu boyunca sadece bunlar kullanılır.
+        """
+        inf = float('inf')
+        terms = []
+        for dist_from, dist_to in zip(self.dist_from, self.dist_to):
+            terms.append((dist_from, dist_from[target], dist_to, dist_to[target]))
+
+        def bound(node: int, selected) -> float:
+            best = 0.0
+            for dist_from, from_target, dist_to, to_target in selected:
+                # d(v, t) >= d(L, t) - d(L, v)
+                if from_target != inf:
+                    from_node = dist_from[node]
+                    if from_node != inf and from_target - from_node > best:
+                        best = from_target - from_node
+                # d(v, t) >= d(v, L) - d(t, L)
+                if to_target != inf:
+                    to_node = dist_to[node]
+                    if to_node != inf and to_node - to_target > best:
+                        best = to_node - to_target
+            return best
+
+        if active < len(terms):
+            terms.sort(key=lambda term: bound(source, (term,)), reverse=True)
+            terms = terms[:active]
+
+        def heuristic(node: int) -> float:
+            estimate = bound(node, terms) - BOUND_TOLERANCE
+            return estimate if estimate > 0 else 0.0
+
+        return heuristic
+
+
+def _repair_row(row: array, offsets, neighbors, weights, seeds: List[int]):
+    """
+    row[v] <= row[u] + w(u, v) koşulunu seeds düğümlerinden başlayarak yeniden sağlar
+
+    Sadece değeri düşen düğümler kuyruğa girer; etkilenmeyen bölgeye dokunulmaz.
+    """
+    inf = float('inf')
+    pq = [(row[node], node) for node in seeds if row[node] != inf]
+    heapq.heapify(pq)
+
+    while pq:
+        distance, node = heapq.heappop(pq)
+        if distance > row[node]:
+            continue
+        for k in range(offsets[node], offsets[node + 1]):
+            other = neighbors[k]
+            candidate = distance + weights[k]
+            if candidate < row[other]:
+                before = row[other]
+                row[other] = candidate
+                # float32'ye yuvarlanınca değişmeyen düğüm tekrar işlenmez
+                if row[other] < before:
+                    heapq.heappush(pq, (row[other], other))
+
+
+def _farthest_candidate(distances_min: List[float]) -> int:
+    """Seçili landmark'lara minimum mesafesi en büyük olan (ulaşılabilir) düğüm"""
+    inf = float('inf')
+    best = -1
+    best_distance = -1.0
+    for node, distance in enumerate(distances_min):
+        if distance != inf and distance > best_distance:
+            best_distance = distance
+            best = node
+    return best
+
+
+def _select_farthest(graph: Graph, count: int) -> List[int]:
+    """Farthest-point: her yeni landmark mevcutlardan en uzak düğümdür"""
+    inf = float('inf')
+    n = graph.node_count
+
+    # İlk landmark: 0 numaralı düğümden en uzak düğüm
+    distances, _ = shortest_path_tree(graph, 0)
+    landmarks = []
+    closest = list(distances)
+
+    while len(landmarks) < count:
+        candidate = _farthest_candidate(closest)
+        if candidate < 0 or candidate in landmarks:
+            break
+        landmarks.append(candidate)
+
+        distances, _ = shortest_path_tree(graph, candidate)
+        if len(landmarks) == 1:
+            closest = list(distances)
+        else:
+            closest = [min(closest[v], distances[v]) for v in range(n)]
+        for landmark in landmarks:
+            closest[landmark] = inf
+
+    return landmarks
+
+
+def _select_avoid(graph: Graph, count: int) -> List[int]:
+    """
+    Avoid sezgiseli (Goldberg & Werneck)
+
+    Rastgele bir kökten en kısa yol ağacı kurulur. Her düğümün ağırlığı,
+    mevcut landmark'ların alt sınırının ne kadar zayıf kaldığıdır. Alt
+    ağacında landmark olmayan en ağır dal izlenerek bir yaprak seçilir.
+    """
+    inf = float('inf')
+    n = graph.node_count
+    rng = random.Random(RANDOM_SEED)
+
+    landmarks = _select_farthest(graph, 1)
+    if not landmarks:
+        return landmarks
+
+    dist_from = [_distance_row(graph, landmarks[0], False)]
+    dist_to = [_distance_row(graph, landmarks[0], True)]
+
+    failures = 0
+    while len(landmarks) < count and failures < AVOID_MAX_FAILURES:
+        root = rng.randrange(n)
+        distances, previous = shortest_path_tree(graph, root)
+
+        order = sorted((v for v in range(n) if distances[v] != inf),
+                       key=distances.__getitem__, reverse=True)
+        # Ağırlık: gerçek mesafe - landmark alt sınırı
+        # d(r, v) >= d(L, v) - d(L, r) ve d(r, v) >= d(r, L) - d(v, L)
+        size = [0.0] * n
+        has_landmark = bytearray(n)
+        for landmark in landmarks:
+            has_landmark[landmark] = 1
+
+        for v in order:
+            lower = 0.0
+            for row_from, row_to in zip(dist_from, dist_to):
+                if row_from[v] != inf and row_from[root] != inf:
+                    lower = max(lower, row_from[v] - row_from[root])
+                if row_to[root] != inf and row_to[v] != inf:
+                    lower = max(lower, row_to[root] - row_to[v])
+            if not has_landmark[v]:
+                size[v] += distances[v] - lower
+            else:
+                size[v] = 0.0
+
+            parent = previous[v]
+            if parent >= 0:
+                if has_landmark[v]:
+                    has_landmark[parent] = 1
+                    size[parent] = 0.0
+                elif not has_landmark[parent]:
+                    size[parent] += size[v]
+
+        # Kökten başlayarak en büyük boyutlu çocuğu izle
+        children = {}
+        for v in order:
+            parent = previous[v]
+            if parent >= 0:
+                children.setdefault(parent, []).append(v)
+
+        current = root
+        while current in children:
+            best_child = max(children[current], key=size.__getitem__)
+            if size[best_child] <= 0:
+                break
+            current = best_child
+
+        # Kök zayıf bir bölgede değilse başka bir kök dene
+        if current in landmarks or size[current] <= 0:
+            failures += 1
+            continue
+
+        landmarks.append(current)
+        dist_from.append(_distance_row(graph, current, False))
+        dist_to.append(_distance_row(graph, current, True))
+
+    return landmarks
+
+
+def select_landmarks(graph: Graph, count: int = DEFAULT_LANDMARK_COUNT,
+                     method: str = 'farthest') -> List[int]:
+    """
+    Landmark düğümlerini seçer
+
+    Args:
+        graph: Graph objesi
+        count: Landmark sayısı
+        method: 'farthest' veya 'avoid'
+
+    Returns:
+        Landmark düğüm indeksleri
+    """
+    if method not in SELECTION_METHODS:
+        raise ValueError(f"Bilinmeyen landmark yöntemi: {method} (seçenekler: {', '.join(SELECTION_METHODS)})")
+    if graph.node_count == 0:
+        return []
+    if method == 'avoid':
+        return _select_avoid(graph, count)
+    return _select_farthest(graph, count)
+
+
+def compute_landmark_table(graph: Graph, count: int = DEFAULT_LANDMARK_COUNT,
+                           method: str = 'farthest',
+                           workers: Optional[int] = None) -> LandmarkTable:
+    """
+    Landmark'ları seçer ve mesafe tablolarını hesaplar
+
+    Her landmark için iki tam arama (ileri ve ters) gerekir; bu 2k arama
+    CPU çekirdeklerine dağıtılır.
+
+    Args:
+        graph: Graph objesi
+        count: Landmark sayısı
+        method: 'farthest' veya 'avoid'
+        workers: İşlem sayısı (None = CPU çekirdek sayısı, 1 = seri)
+    """
+    landmarks = select_landmarks(graph, count, method)
+    jobs = [(landmark, reverse) for reverse in (False, True) for landmark in landmarks]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+
+    if workers <= 1:
+        rows = [_distance_row(graph, landmark, reverse) for landmark, reverse in jobs]
+    else:
+        with make_graph_executor(graph, workers) as executor:
+            rows = list(executor.map(_worker_distance_row, *zip(*jobs)))
+
+    k = len(landmarks)
+    return LandmarkTable(graph, landmarks, rows[:k], rows[k:])
+
+
+if __name__ == "__main__":
+    import json
+
+    graph_path = sys.argv[1] if len(sys.argv) > 1 else 'mugla_full.json'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LANDMARK_COUNT
+    method = sys.argv[3] if len(sys.argv) > 3 else 'farthest'
+    output_path = landmark_path_for(graph_path)
+
+    print(f"🔧 ALT ön işleme: {graph_path} ({count} landmark, {method})")
+    with open(graph_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    graph = Graph(data['nodes'], data['edges'])
+    started = time.perf_counter()
+    table = compute_landmark_table(graph, count, method)
+    print(f"✅ {len(table.landmarks)} landmark hesaplandı ({time.perf_counter() - started:.1f} sn)")
+
+    table.save(output_path)
+    print(f"💾 Landmark tabloları kaydedildi: {output_path}")
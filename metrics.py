@@ -0,0 +1,262 @@
+"""
+Metrics - İstek ve arama süreleri için Prometheus metrikleri
+CENG 3511 - Artificial Intelligence Final Project
+
+Varsayılan olarak kapalıdır; kapalıyken phase() paylaşılan boş bir
+context döndürür ve observe()/inc() hemen döner. Açmak için:
+    ROUTE_METRICS=1 python app.py
+    python serve.py --metrics
+
+Çok process'li modda (serve.py) her worker kendi kayıtlarını tutar ve
+belirli aralıklarla ROUTE_METRICS_DIR klasörüne yazar; /metrics tüm
+worker'ların toplamını döndürür.
+"""
+
+import contextlib
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterator, Sequence
+
+# Açma/kapama anahtarı
+ENABLED = os.environ.get('ROUTE_METRICS', '') not in ('', '0')
+
+# Worker'ların anlık görüntülerini paylaştığı klasör (None = tek process)
+METRICS_DIR = os.environ.get('ROUTE_METRICS_DIR') or None
+
+# Anlık görüntü yazma aralığı (saniye)
+SNAPSHOT_INTERVAL = 5.0
+
+# Histogram sınırları
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+NODE_COUNT_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+WAYPOINT_BUCKETS = (0, 1, 2, 5, 10, 15, 25, 50, 100)
+
+_lock = threading.Lock()
+_last_snapshot = 0.0
+
+
+def _reset_lock():
+    global _lock
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    # Fork anında başka bir thread'in tuttuğu kilit çocuk process'te kalmasın
+    os.register_at_fork(after_in_child=_reset_lock)
+
+# Kapalıyken phase() bunu döndürür (yeniden kullanılabilir, maliyetsiz)
+_NULL_PHASE = contextlib.nullcontext()
+
+
+class Counter:
+    """Artan sayaç: etiketler -> toplam"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+
+    def add(self, labels: tuple, amount: float):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self, series: Dict) -> Iterator[str]:
+        for labels, value in sorted(series.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Kovalı dağılım: etiketler -> [kova sayıları..., toplam, adet]"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float],
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+
+    def add(self, labels: tuple, value: float):
+        values = self.series.get(labels)
+        if values is None:
+            values = self.series[labels] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            values[index] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def render(self, series: Dict) -> Iterator[str]:
+        bucket_names = self.labelnames + ('le',)
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield (f"{self.name}_bucket{_format_labels(bucket_names, labels + (_format_value(bound),))} "
+                       f"{cumulative}")
+            yield f"{self.name}_bucket{_format_labels(bucket_names, labels + ('+Inf',))} {values[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(values[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {values[-1]}"
+
+
+_METRICS = {
+    metric.name: metric for metric in (
+        Counter('route_requests_total', 'HTTP istek sayısı',
+                ('endpoint', 'method', 'status')),
+        Histogram('route_request_seconds', 'HTTP istek süresi (saniye)',
+                  LATENCY_BUCKETS, ('endpoint', 'method')),
+        Histogram('route_phase_seconds', 'İstek aşaması süresi (saniye)',
+                  LATENCY_BUCKETS, ('phase',)),
+        Histogram('route_search_settled_nodes', 'Arama başına kesinleşen düğüm sayısı',
+                  NODE_COUNT_BUCKETS, ('algorithm',)),
+        Histogram('route_search_pushed_nodes', 'Arama başına kuyruğa eklenen düğüm sayısı',
+                  NODE_COUNT_BUCKETS, ('algorithm',)),
+        Histogram('route_waypoints', 'İstek başına ara durak sayısı',
+                  WAYPOINT_BUCKETS, ('endpoint',)),
+        Counter('route_region_events_total', 'Bölge graph yükleme/boşaltma sayısı',
+                ('region', 'event')),
+    )
+}
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def enable(enabled: bool = True):
+    """Metrikleri açar/kapatır (ör. serve.py --metrics)"""
+    global ENABLED
+    ENABLED = enabled
+
+
+def observe(name: str, value: float, **labels):
+    """Histogram'a bir değer ekler"""
+    if not ENABLED:
+        return
+    metric = _METRICS[name]
+    key = tuple(str(labels.get(label, '')) for label in metric.labelnames)
+    with _lock:
+        metric.add(key, value)
+
+
+def inc(name: str, amount: float = 1, **labels):
+    """Sayacı artırır"""
+    if not ENABLED:
+        return
+    metric = _METRICS[name]
+    key = tuple(str(labels.get(label, '')) for label in metric.labelnames)
+    with _lock:
+        metric.add(key, amount)
+
+
+class _PhaseTimer:
+    __slots__ = ('phase', 'started')
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe('route_phase_seconds', time.perf_counter() - self.started, phase=self.phase)
+        return False
+
+
+def phase(name: str):
+    """
+    Bir istek aşamasının süresini ölçen context
+    Aşamalar: snap, search, tsp_order, reconstruct, serialize
+
+    Kullanım:
+        with metrics.phase('search'):
+            ...
+    """
+    if not ENABLED:
+        return _NULL_PHASE
+    return _PhaseTimer(name)
+
+
+def _snapshot() -> Dict:
+    with _lock:
+        return {
+            name: [[list(labels), list(values) if isinstance(values, list) else values]
+                   for labels, values in metric.series.items()]
+            for name, metric in _METRICS.items()
+        }
+
+
+def maybe_write_snapshot(force: bool = False):
+    """METRICS_DIR ayarlıysa bu process'in kayıtlarını (aralıklı) dosyaya yazar"""
+    global _last_snapshot
+    if not ENABLED or METRICS_DIR is None:
+        return
+    now = time.monotonic()
+    if not force and now - _last_snapshot < SNAPSHOT_INTERVAL:
+        return
+    _last_snapshot = now
+
+    path = os.path.join(METRICS_DIR, f'metrics-{os.getpid()}.json')
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(_snapshot(), f)
+    os.replace(temporary, path)
+
+
+def render() -> str:
+    """Tüm metrikleri Prometheus metin biçiminde döndürür"""
+    merged = {name: {} for name in _METRICS}
+    snapshots = [_snapshot()]
+
+    # Diğer worker'ların (ve kapanmış eski worker'ların) son kayıtları
+    if METRICS_DIR is not None:
+        own = os.path.join(METRICS_DIR, f'metrics-{os.getpid()}.json')
+        for path in glob.glob(os.path.join(METRICS_DIR, 'metrics-*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+
+    for snapshot in snapshots:
+        for name, series in snapshot.items():
+            metric = _METRICS.get(name)
+            if metric is None:
+                continue
+            for labels, values in series:
+                key = tuple(labels)
+                target = merged[name]
+                if key not in target:
+                    target[key] = list(values) if isinstance(values, list) else values
+                elif isinstance(values, list):
+                    target[key] = [a + b for a, b in zip(target[key], values)]
+                else:
+                    target[key] += values
+
+    lines = []
+    for name, metric in _METRICS.items():
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        lines.extend(metric.render(merged[name]))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,625 @@
+"""
+OSM Import - OSM XML/PBF kesitinden yönlendirme graph'ı oluşturma
+CENG 3511 - Artificial Intelligence Final Project
+
+Yerel bir OSM kesiti (.osm, .osm.bz2, .osm.gz veya .osm.pbf) tek geçişte
+akış halinde okunur; sürülebilir yollar (highway etiketi, erişim
+kısıtları, tek yön kuralları) süzülür ve mugla_full.json biçiminde ya
+da binary_graph.py'nin ikili biçiminde yazılır.
+
+Bellek:
+    - Düğümler Python nesnesi olarak tutulmaz: ID int64, koordinatlar
+      1e-7 derece sabit noktalı int32 dizilerinde (düğüm başına 16 bayt);
+      --bbox verilirse kutu dışındaki düğümler hiç saklanmaz
+    - Yollar okunurken sadece (düğüm, düğüm, yön) parçaları saklanır
+      (parça başına 9 bayt); etiketler ve ref listeleri hemen bırakılır
+    - Kenar ağırlıkları (haversine, km) sonda parçalar halinde vektörel
+      hesaplanır (numpy varsa numpy, yoksa dizi üzerinde tek döngü)
+
+Dosya standart sırada olmalıdır (önce düğümler, sonra yollar); Geofabrik
+gibi kaynakların kesitleri böyledir, değilse `osmium sort` ile sıralanır.
+PBF çözümleyici sadece stdlib kullanır (zlib/lzma sıkıştırmalı bloklar).
+
+Kullanım:
+    python osm_import.py mugla.osm.pbf                          # mugla_full.json
+    python osm_import.py mugla.osm.pbf --format binary          # mugla_full.graph
+    python osm_import.py turkey.osm.pbf --bbox 36.3,27.2,37.6,29.5 --format both
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import lzma
+import math
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from binary_graph import binary_path_for, write_binary_graph
+from dijkstra import Graph
+
+try:
+    import numpy  # Opsiyonel: vektörel haversine
+except ImportError:
+    numpy = None
+
+# Araçla sürülebilen yol sınıfları (highway=*)
+DRIVABLE_HIGHWAYS = frozenset({
+    'motorway', 'trunk', 'primary', 'secondary', 'tertiary', 'unclassified',
+    'residential', 'motorway_link', 'trunk_link', 'primary_link',
+    'secondary_link', 'tertiary_link', 'living_street', 'service', 'road'
+})
+
+# Erişimi kapatan değerler; en özel etiket geçerlidir (motorcar > ... > access)
+ACCESS_TAGS = ('motorcar', 'motor_vehicle', 'vehicle', 'access')
+NO_ACCESS = frozenset({'no', 'private'})
+
+# Parça yönleri (bit maskesi)
+FORWARD = 1
+BACKWARD = 2
+
+# Koordinatlar 1e-7 derece birimiyle tamsayı olarak saklanır
+COORDINATE_SCALE = 10_000_000
+
+# Ağırlıklar bu kadar parçalık gruplar halinde hesaplanır
+SEGMENT_BATCH = 1 << 16
+
+# Ağırlıkların ondalık basamağı (km; 5 basamak = 1 cm)
+WEIGHT_DECIMALS = 5
+
+EARTH_RADIUS = 6371  # km (dijkstra.haversine_distance ile aynı)
+
+
+def way_direction(tags: Dict[str, str]) -> int:
+    """
+    Yolun sürülebilir yönleri: FORWARD | BACKWARD bit maskesi (0 = kullanılmaz)
+
+    oneway=yes/1/true ileri, -1/reverse geri; etiket yoksa dönel kavşak
+    ve otoyollar tek yönlü sayılır.
+    """
+    if tags.get('highway') not in DRIVABLE_HIGHWAYS or tags.get('area') == 'yes':
+        return 0
+    for key in ACCESS_TAGS:
+        value = tags.get(key)
+        if value is not None:
+            if value in NO_ACCESS:
+                return 0
+            break
+
+    oneway = tags.get('oneway')
+    if oneway in ('yes', '1', 'true'):
+        return FORWARD
+    if oneway in ('-1', 'reverse'):
+        return BACKWARD
+    if oneway is None and (tags.get('junction') in ('roundabout', 'circular')
+                           or tags.get('highway') == 'motorway'):
+        return FORWARD
+    return FORWARD | BACKWARD
+
+
+def segment_lengths(lat: array, lon: array, sources: array, targets: array) -> array:
+    """
+    Parça uzunlukları (haversine, km), SEGMENT_BATCH'lik gruplar halinde
+
+    Args:
+        lat, lon: Sabit noktalı (1e-7 derece) int32 koordinat dizileri
+        sources, targets: Parça uç noktalarının koordinat indeksleri
+    """
+    lengths = array('d')
+    count = len(sources)
+
+    if numpy is not None:
+        lat_view = numpy.frombuffer(lat, dtype=numpy.int32) if len(lat) else numpy.zeros(0, numpy.int32)
+        lon_view = numpy.frombuffer(lon, dtype=numpy.int32) if len(lon) else numpy.zeros(0, numpy.int32)
+        scale = math.pi / 180 / COORDINATE_SCALE
+        for start in range(0, count, SEGMENT_BATCH):
+            a = numpy.frombuffer(sources, dtype=numpy.int32, count=min(SEGMENT_BATCH, count - start),
+                                 offset=start * sources.itemsize)
+            b = numpy.frombuffer(targets, dtype=numpy.int32, count=len(a),
+                                 offset=start * targets.itemsize)
+            lat1 = lat_view[a] * scale
+            lat2 = lat_view[b] * scale
+            delta_lat = lat2 - lat1
+            delta_lon = (lon_view[b] - lon_view[a]) * scale
+            h = (numpy.sin(delta_lat / 2) ** 2 +
+                 numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin(delta_lon / 2) ** 2)
+            batch = 2 * EARTH_RADIUS * numpy.arctan2(numpy.sqrt(h), numpy.sqrt(1 - h))
+            lengths.frombytes(batch.astype(numpy.float64).tobytes())
+        del lat_view, lon_view
+        return lengths
+
+    sin = math.sin
+    cos = math.cos
+    atan2 = math.atan2
+    sqrt = math.sqrt
+    scale = math.pi / 180 / COORDINATE_SCALE
+    for start in range(0, count, SEGMENT_BATCH):
+        end = min(start + SEGMENT_BATCH, count)
+        batch = []
+        for a, b in zip(sources[start:end], targets[start:end]):
+            lat1 = lat[a] * scale
+            lat2 = lat[b] * scale
+            h = (sin((lat2 - lat1) / 2) ** 2 +
+                 cos(lat1) * cos(lat2) * sin((lon[b] - lon[a]) * scale / 2) ** 2)
+            batch.append(2 * EARTH_RADIUS * atan2(sqrt(h), sqrt(1 - h)))
+        lengths.extend(batch)
+    return lengths
+
+
+class GraphBuilder:
+    """
+    Okuyuculardan gelen düğüm ve yolları sıkı dizilerde biriktirir
+
+    Düğümler ID'ye göre sıralı gelirse (standart kesitler) ID -> indeks
+    araması ikili aramadır; sırasız gelirlerse ilk yolda bir kez sıralanır.
+    """
+
+    def __init__(self, bbox: Optional[Tuple[float, float, float, float]] = None):
+        self.node_ids = array('q')
+        self.lat = array('i')
+        self.lon = array('i')
+        self._sorted = True
+        self._ways_started = False
+
+        self.segment_sources = array('i')
+        self.segment_targets = array('i')
+        self.segment_directions = array('b')
+
+        self.bbox = None
+        if bbox is not None:
+            self.bbox = tuple(int(round(value * COORDINATE_SCALE)) for value in bbox)
+
+        self.nodes_seen = 0
+        self.ways_seen = 0
+        self.ways_used = 0
+
+    def add_nodes(self, ids: List[int], lats: List[int], lons: List[int]):
+        """Düğümleri ekler (koordinatlar sabit noktalı, 1e-7 derece)"""
+        if self._ways_started:
+            raise ValueError("Yollardan sonra düğüm geldi; dosyayı 'osmium sort' ile sıralayın")
+        self.nodes_seen += len(ids)
+        if self.bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = self.bbox
+            kept = [i for i in range(len(ids))
+                    if min_lat <= lats[i] <= max_lat and min_lon <= lons[i] <= max_lon]
+            if len(kept) != len(ids):
+                ids = [ids[i] for i in kept]
+                lats = [lats[i] for i in kept]
+                lons = [lons[i] for i in kept]
+
+        if not ids:
+            return
+        if self._sorted and ((self.node_ids and ids[0] <= self.node_ids[-1])
+                             or any(a >= b for a, b in zip(ids, ids[1:]))):
+            self._sorted = False
+        self.node_ids.extend(ids)
+        self.lat.extend(lats)
+        self.lon.extend(lons)
+
+    def _start_ways(self):
+        self._ways_started = True
+        if self._sorted:
+            return
+        # Sırasız (veya tekrarlı) düğümler: ID'ye göre bir kez sıralanır
+        order = sorted(range(len(self.node_ids)), key=self.node_ids.__getitem__)
+        self.node_ids = array('q', (self.node_ids[i] for i in order))
+        self.lat = array('i', (self.lat[i] for i in order))
+        self.lon = array('i', (self.lon[i] for i in order))
+
+    def add_way(self, refs: List[int], direction: int):
+        """Sürülebilir yolun ardışık düğüm çiftlerini parça olarak ekler"""
+        if not self._ways_started:
+            self._start_ways()
+        self.ways_used += 1
+
+        node_ids = self.node_ids
+        count = len(node_ids)
+        previous = -1
+        for ref in refs:
+            i = bisect_left(node_ids, ref)
+            # Kesit (veya bbox) dışında kalan düğümde yol bölünür
+            current = i if i < count and node_ids[i] == ref else -1
+            if previous >= 0 and current >= 0 and previous != current:
+                self.segment_sources.append(previous)
+                self.segment_targets.append(current)
+                self.segment_directions.append(direction)
+            previous = current
+
+    def build(self) -> Graph:
+        """Kullanılan düğümlerden CSR Graph'ı kurar"""
+        sources = self.segment_sources
+        targets = self.segment_targets
+        directions = self.segment_directions
+
+        used = bytearray(len(self.node_ids))
+        for i in sources:
+            used[i] = 1
+        for i in targets:
+            used[i] = 1
+
+        # Graph düğümleri string ID sırasıyla tutar
+        string_ids = {i: str(self.node_ids[i]) for i in range(len(used)) if used[i]}
+        order = sorted(string_ids, key=string_ids.__getitem__)
+        new_index = array('i', [-1]) * len(used)
+        for position, i in enumerate(order):
+            new_index[i] = position
+        n = len(order)
+
+        lengths = segment_lengths(self.lat, self.lon, sources, targets)
+
+        counts = [0] * (n + 1)
+        for a, b, direction in zip(sources, targets, directions):
+            if direction & FORWARD:
+                counts[new_index[a] + 1] += 1
+            if direction & BACKWARD:
+                counts[new_index[b] + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+
+        offsets = array('q', counts)
+        edge_targets = array('i', bytes(4 * counts[n]))
+        weights = array('d', bytes(8 * counts[n]))
+        position = counts[:]
+        for a, b, direction, length in zip(sources, targets, directions, lengths):
+            u = new_index[a]
+            v = new_index[b]
+            weight = round(length, WEIGHT_DECIMALS)
+            if direction & FORWARD:
+                edge_targets[position[u]] = v
+                weights[position[u]] = weight
+                position[u] += 1
+            if direction & BACKWARD:
+                edge_targets[position[v]] = u
+                weights[position[v]] = weight
+                position[v] += 1
+
+        lat = array('d', (self.lat[i] / COORDINATE_SCALE for i in order))
+        lon = array('d', (self.lon[i] / COORDINATE_SCALE for i in order))
+        return Graph.from_arrays([string_ids[i] for i in order], lat, lon, offsets, edge_targets, weights)
+
+
+def _open_text(path: str):
+    """Sıkıştırılmış veya düz XML dosyasını ikili akış olarak açar"""
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def read_osm_xml(path: str, builder: GraphBuilder):
+    """OSM XML'i iterparse ile akış halinde okur (işlenen öğeler hemen silinir)"""
+    batch_ids = []
+    batch_lat = []
+    batch_lon = []
+
+    def flush():
+        builder.add_nodes(batch_ids, batch_lat, batch_lon)
+        batch_ids.clear()
+        batch_lat.clear()
+        batch_lon.clear()
+
+    with _open_text(path) as source:
+        context = ElementTree.iterparse(source, events=('start', 'end'))
+        _, root = next(context)
+        for event, element in context:
+            if event != 'end':
+                continue
+            tag = element.tag
+            if tag == 'node':
+                batch_ids.append(int(element.get('id')))
+                batch_lat.append(int(round(float(element.get('lat')) * COORDINATE_SCALE)))
+                batch_lon.append(int(round(float(element.get('lon')) * COORDINATE_SCALE)))
+                if len(batch_ids) >= SEGMENT_BATCH:
+                    flush()
+            elif tag == 'way':
+                if batch_ids:
+                    flush()
+                builder.ways_seen += 1
+                tags = {child.get('k'): child.get('v') for child in element.iter('tag')}
+                direction = way_direction(tags)
+                if direction:
+                    builder.add_way([int(child.get('ref')) for child in element.iter('nd')], direction)
+            elif tag != 'relation':
+                continue
+            root.clear()
+    if batch_ids:
+        flush()
+
+
+# ---------------------------------------------------------------------------
+# PBF (protobuf) çözümleme - sadece yönlendirme için gereken alanlar
+# ---------------------------------------------------------------------------
+
+# Desteklenen PBF özellikleri (OSMHeader.required_features)
+PBF_FEATURES = frozenset({'OsmSchema-V0.6', 'DenseNodes'})
+
+# Blob boyut sınırı (spesifikasyona göre en fazla 32 MiB)
+PBF_MAX_BLOB = 32 * 1024 * 1024
+
+
+def _varint(data: bytes, position: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _fields(data: bytes):
+    """Mesaj alanları: (alan numarası, değer); uzunluklu alanlar bytes döner"""
+    position = 0
+    end = len(data)
+    while position < end:
+        key, position = _varint(data, position)
+        wire = key & 7
+        if wire == 0:
+            value, position = _varint(data, position)
+        elif wire == 2:
+            length, position = _varint(data, position)
+            value = data[position:position + length]
+            position += length
+        elif wire == 1:
+            value = data[position:position + 8]
+            position += 8
+        elif wire == 5:
+            value = data[position:position + 4]
+            position += 4
+        else:
+            raise ValueError(f"Desteklenmeyen protobuf tel tipi: {wire}")
+        yield key >> 3, value
+
+
+def _packed(data: bytes) -> List[int]:
+    """Paketlenmiş varint dizisi"""
+    values = []
+    append = values.append
+    position = 0
+    end = len(data)
+    while position < end:
+        byte = data[position]
+        position += 1
+        if byte < 0x80:
+            append(byte)
+            continue
+        value = byte & 0x7f
+        shift = 7
+        while True:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        append(value)
+    return values
+
+
+def _packed_delta(data: bytes) -> List[int]:
+    """Paketlenmiş, zigzag kodlu ve fark (delta) kodlanmış sint64 dizisi"""
+    total = 0
+    values = []
+    append = values.append
+    for value in _packed(data):
+        total += (value >> 1) ^ -(value & 1)
+        append(total)
+    return values
+
+
+def _signed(value: int) -> int:
+    """int64 alanının ikiye tümleyen çözümü"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _zigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _blob_data(blob: bytes) -> bytes:
+    for number, value in _fields(blob):
+        if number == 1:
+            return value
+        if number == 3:
+            return zlib.decompress(value)
+        if number == 4:
+            return lzma.decompress(value)
+    raise ValueError("Desteklenmeyen PBF sıkıştırması (raw/zlib/lzma bekleniyor)")
+
+
+def _read_primitive_block(data: bytes, builder: GraphBuilder):
+    strings = []
+    groups = []
+    granularity = 100
+    lat_offset = 0
+    lon_offset = 0
+    for number, value in _fields(data):
+        if number == 1:
+            strings = [item.decode('utf-8') for field, item in _fields(value) if field == 1]
+        elif number == 2:
+            groups.append(value)
+        elif number == 17:
+            granularity = value
+        elif number == 19:
+            lat_offset = _signed(value)
+        elif number == 20:
+            lon_offset = _signed(value)
+
+    # nanoderece -> 1e-7 derece
+    def scaled(values, offset):
+        if granularity == 100 and offset == 0:
+            return values
+        return [(offset + granularity * value) // 100 for value in values]
+
+    for group in groups:
+        for number, value in _fields(group):
+            if number == 2:
+                ids = lats = lons = ()
+                for field, item in _fields(value):
+                    if field == 1:
+                        ids = _packed_delta(item)
+                    elif field == 8:
+                        lats = _packed_delta(item)
+                    elif field == 9:
+                        lons = _packed_delta(item)
+                builder.add_nodes(ids, scaled(lats, lat_offset), scaled(lons, lon_offset))
+            elif number == 1:
+                node_id = lat = lon = 0
+                for field, item in _fields(value):
+                    if field == 1:
+                        node_id = _zigzag(item)
+                    elif field == 8:
+                        lat = _zigzag(item)
+                    elif field == 9:
+                        lon = _zigzag(item)
+                builder.add_nodes([node_id], scaled([lat], lat_offset), scaled([lon], lon_offset))
+            elif number == 3:
+                builder.ways_seen += 1
+                keys = values = refs = b''
+                for field, item in _fields(value):
+                    if field == 2:
+                        keys = item
+                    elif field == 3:
+                        values = item
+                    elif field == 8:
+                        refs = item
+                tags = {strings[k]: strings[v] for k, v in zip(_packed(keys), _packed(values))}
+                direction = way_direction(tags)
+                # Sürülemeyen yolların (binalar vb.) ref listesi hiç çözülmez
+                if direction:
+                    builder.add_way(_packed_delta(refs), direction)
+
+
+def read_osm_pbf(path: str, builder: GraphBuilder):
+    """OSM PBF'i blok blok okur; her blok çözüldükten sonra bırakılır"""
+    with open(path, 'rb') as f:
+        while True:
+            prefix = f.read(4)
+            if not prefix:
+                break
+            if len(prefix) < 4:
+                raise ValueError(f"{path} eksik veya bozuk")
+            header_size, = struct.unpack('>I', prefix)
+            blob_type = None
+            data_size = 0
+            for number, value in _fields(f.read(header_size)):
+                if number == 1:
+                    blob_type = value.decode('utf-8')
+                elif number == 3:
+                    data_size = value
+            if data_size > PBF_MAX_BLOB:
+                raise ValueError(f"{path} eksik veya bozuk (blob çok büyük)")
+
+            blob = f.read(data_size)
+            if len(blob) < data_size:
+                raise ValueError(f"{path} eksik veya bozuk")
+            if blob_type == 'OSMHeader':
+                features = {value.decode('utf-8') for number, value in _fields(_blob_data(blob))
+                            if number == 4}
+                unsupported = features - PBF_FEATURES
+                if unsupported:
+                    raise ValueError(f"Desteklenmeyen PBF özellikleri: {', '.join(sorted(unsupported))}")
+            elif blob_type == 'OSMData':
+                _read_primitive_block(_blob_data(blob), builder)
+
+
+def import_osm(path: str, bbox: Optional[Tuple[float, float, float, float]] = None) -> Graph:
+    """
+    OSM kesitinden yönlendirme graph'ı oluşturur
+
+    Args:
+        path: .osm, .osm.bz2, .osm.gz veya .osm.pbf dosyası
+        bbox: (min_lat, min_lon, max_lat, max_lon); dışındaki düğümler atlanır
+
+    Raises:
+        ValueError: Dosya bozuk, sırasız veya desteklenmeyen biçimdeyse
+    """
+    builder = GraphBuilder(bbox)
+    if path.endswith('.pbf'):
+        read_osm_pbf(path, builder)
+    else:
+        read_osm_xml(path, builder)
+    print(f"   - Okunan: {builder.nodes_seen} düğüm, {builder.ways_seen} yol "
+          f"({builder.ways_used} sürülebilir, {len(builder.segment_sources)} parça)")
+    return builder.build()
+
+
+def write_graph_json(graph: Graph, path: str):
+    """Graph'ı mugla_full.json biçiminde akış halinde yazar (dev dict kurmadan)"""
+    node_ids = graph.node_ids
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    dumps = json.dumps
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"nodes": {')
+        for i, node_id in enumerate(node_ids):
+            if i:
+                f.write(', ')
+            f.write(f'{dumps(node_id)}: {{"lat": {graph.lat[i]!r}, "lon": {graph.lon[i]!r}}}')
+        f.write('}, "edges": {')
+        for i, node_id in enumerate(node_ids):
+            if i:
+                f.write(', ')
+            neighbors = ', '.join(f'{{"node": {dumps(node_ids[targets[k]])}, "weight": {weights[k]!r}}}'
+                                  for k in range(offsets[i], offsets[i + 1]))
+            f.write(f'{dumps(node_id)}: [{neighbors}]')
+        f.write('}}')
+
+
+def parse_bbox(text: str) -> Tuple[float, float, float, float]:
+    """'min_lat,min_lon,max_lat,max_lon' -> tuple"""
+    parts = [float(part) for part in text.split(',')]
+    if len(parts) != 4 or parts[0] > parts[2] or parts[1] > parts[3]:
+        raise ValueError(f"Geçersiz bbox: {text} (min_lat,min_lon,max_lat,max_lon bekleniyor)")
+    return tuple(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OSM kesitinden yönlendirme graph\'ı oluşturur')
+    parser.add_argument('source', help='.osm, .osm.bz2, .osm.gz veya .osm.pbf dosyası')
+    parser.add_argument('--output', default='mugla_full.json', help='Çıktı JSON yolu (ikili: aynı ad, .graph)')
+    parser.add_argument('--format', choices=('json', 'binary', 'both'), default='json',
+                        help='Çıktı biçimi (binary = binary_graph.py biçimi)')
+    parser.add_argument('--bbox', help='min_lat,min_lon,max_lat,max_lon (dışı atlanır)')
+    args = parser.parse_args()
+
+    try:
+        bbox = parse_bbox(args.bbox) if args.bbox else None
+    except ValueError as e:
+        print(f"❌ HATA: {e}")
+        sys.exit(1)
+
+    print(f"🔧 OSM içe aktarma: {args.source}"
+          + ("" if numpy is not None else " (numpy yok, ağırlıklar saf Python ile)"))
+    started = time.perf_counter()
+    try:
+        graph = import_osm(args.source, bbox)
+    except (OSError, ValueError, ElementTree.ParseError) as e:
+        print(f"❌ HATA: {e}")
+        sys.exit(1)
+    print(f"✅ {graph.node_count} düğüm, {graph.edge_count} kenar "
+          f"({time.perf_counter() - started:.1f} sn)")
+
+    if args.format in ('json', 'both'):
+        write_graph_json(graph, args.output)
+        print(f"💾 JSON graph kaydedildi: {args.output}")
+    if args.format in ('binary', 'both'):
+        binary_path = binary_path_for(args.output)
+        write_binary_graph(graph, binary_path)
+        print(f"💾 İkili graph kaydedildi: {binary_path}")
+    print(f"   Toplam süre: {time.perf_counter() - started:.1f} sn")
+
+
+if __name__ == "__main__":
+    main()
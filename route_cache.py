@@ -0,0 +1,110 @@
+"""
+Route Cache - Sık istenen rotalar ve koordinat eşlemeleri için LRU önbellek
+CENG 3511 - Artificial Intelligence Final Project
+
+Anahtarlar graph sürümünü (Graph.version) içerir; graph yeniden
+yüklendiğinde eski girdiler bir daha eşleşmez ve LRU ile temizlenir.
+Boyut sınırı girdi sayısı değil, tahmini bayt cinsindendir.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+# Varsayılan önbellek boyutu (bayt)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Rota önbelleğindeki girdi türleri
+NAMESPACES = ('snap', 'distance', 'route')
+
+# get() ıskalamada bunu döndürür (None geçerli bir değerdir: "yol yok")
+MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Bir değerin bellekteki yaklaşık boyutu (bayt)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+class RouteCache:
+    """
+    Bayt sınırlı, thread-safe LRU önbellek
+
+    Varsayılan girdi türleri:
+        snap:     (lat, lon) -> düğüm ID'si
+        distance: (başlangıç, bitiş) -> mesafe veya None
+        route:    (başlangıç, bitiş) -> yol sonucu veya None
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, namespaces=NAMESPACES):
+        self.max_bytes = max_bytes
+        self.namespaces = tuple(namespaces)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = dict.fromkeys(self.namespaces, 0)
+        self._misses = dict.fromkeys(self.namespaces, 0)
+        self._evictions = 0
+
+    def get(self, namespace: str, graph_version: int, key: Hashable) -> Any:
+        """Değeri döndürür; yoksa MISSING"""
+        full_key = (namespace, graph_version, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self._misses[namespace] += 1
+                return MISSING
+            self._entries.move_to_end(full_key)
+            self._hits[namespace] += 1
+            return entry[0]
+
+    def put(self, namespace: str, graph_version: int, key: Hashable, value: Any):
+        """Değeri ekler; sınır aşılırsa en eski girdiler atılır"""
+        full_key = (namespace, graph_version, key)
+        size = estimate_size(full_key) + estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(full_key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[full_key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self):
+        """Tüm girdileri siler (istatistikler korunur)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss istatistikleri"""
+        with self._lock:
+            lookups = {name: self._hits[name] + self._misses[name] for name in self.namespaces}
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions,
+                'hits': dict(self._hits),
+                'misses': dict(self._misses),
+                'hit_rate': {
+                    name: round(self._hits[name] / lookups[name], 4) if lookups[name] else 0.0
+                    for name in self.namespaces
+                }
+            }
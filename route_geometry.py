@@ -0,0 +1,126 @@
+"""
+Route Geometry - Rota geometrisinin kompakt gösterimi
+CENG 3511 - Artificial Intelligence Final Project
+
+Koordinatlar Google "encoded polyline" algoritmasıyla metne çevrilir
+(Leaflet eklentileri ve OSRM ile uyumlu). TSP yanıtında segmentler
+ortak geometriye indeks aralığı olarak bakar; segment sınırındaki
+tekrar eden noktalar bir kez gönderilir.
+"""
+
+from typing import Dict, List, Sequence
+
+# Ondalık basamak sayısı: 6 -> ~0.1 m çözünürlük (polyline6)
+POLYLINE_PRECISION = 6
+
+
+def _encode_value(value: int, chunks: List[str]):
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+
+
+def encode_polyline(coordinates: Sequence[Sequence[float]],
+                    precision: int = POLYLINE_PRECISION) -> str:
+    """
+    [[lat, lon], ...] listesini encoded polyline metnine çevirir
+
+    Args:
+        coordinates: [[lat, lon], ...]
+        precision: Ondalık basamak sayısı
+
+    Returns:
+        Encoded polyline metni
+    """
+    factor = 10 ** precision
+    chunks = []
+    previous_lat = 0
+    previous_lon = 0
+    for lat, lon in coordinates:
+        lat_value = round(lat * factor)
+        lon_value = round(lon * factor)
+        _encode_value(lat_value - previous_lat, chunks)
+        _encode_value(lon_value - previous_lon, chunks)
+        previous_lat = lat_value
+        previous_lon = lon_value
+    return ''.join(chunks)
+
+
+def decode_polyline(encoded: str, precision: int = POLYLINE_PRECISION) -> List[List[float]]:
+    """Encoded polyline metnini [[lat, lon], ...] listesine çevirir"""
+    factor = 10 ** precision
+    coordinates = []
+    values = [0, 0]
+    index = 0
+    while index < len(encoded):
+        for axis in range(2):
+            shift = 0
+            result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            values[axis] += ~(result >> 1) if result & 1 else result >> 1
+        coordinates.append([values[0] / factor, values[1] / factor])
+    return coordinates
+
+
+def compact_route(result: Dict, precision: int = POLYLINE_PRECISION) -> Dict:
+    """dijkstra() sonucundaki coordinates listesini polyline ile değiştirir"""
+    compact = {key: value for key, value in result.items() if key != 'coordinates'}
+    compact['geometry'] = encode_polyline(result['coordinates'], precision)
+    compact['precision'] = precision
+    return compact
+
+
+def compact_tsp_result(result: Dict, precision: int = POLYLINE_PRECISION) -> Dict:
+    """
+    find_optimal_route_tsp() sonucunu kompakt biçime çevirir
+
+    Returns:
+        {
+            'optimal_order': [...],
+            'total_distance': float,
+            'path': [node_id, ...],      # Tüm rota, sınır düğümleri bir kez
+            'geometry': str,             # path ile aynı uzunlukta polyline
+            'precision': int,
+            'segments': [{'from', 'to', 'distance', 'node_count',
+                          'start', 'end'}, ...]  # path/geometry indeksleri (dahil)
+        }
+    """
+    path = []
+    coordinates = []
+    segments = []
+
+    for segment in result['segments']:
+        segment_path = segment['path']
+        segment_coordinates = segment['coordinates']
+        # Önceki segmentin son noktası bu segmentin ilk noktasıdır
+        skip = 1 if path and segment_path and path[-1] == segment_path[0] else 0
+        start = len(path) - skip
+
+        path.extend(segment_path[skip:])
+        coordinates.extend(segment_coordinates[skip:])
+
+        segments.append({
+            'from': segment_path[0],
+            'to': segment_path[-1],
+            'distance': segment['distance'],
+            'node_count': segment['node_count'],
+            'start': start,
+            'end': len(path) - 1
+        })
+
+    return {
+        'optimal_order': result['optimal_order'],
+        'total_distance': result['total_distance'],
+        'path': path,
+        'geometry': encode_polyline(coordinates, precision),
+        'precision': precision,
+        'segments': segments
+    }
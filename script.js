@@ -6,26 +6,31 @@
 
 // Global değişkenler
 let map;
-let graphData = null;
+let graphStats = null; // Sadece sayılar ve sınırlar (tüm graph indirilmez)
 let markers = []; // Tüm marker'lar
 let pathPolylines = []; // Tüm yol parçaları
 let waypoints = []; // Seçilen noktalar {lat, lon, marker}
+let optimizeController = null; // Süren anytime TSP akışı (sıfırlanınca iptal edilir)
 
 // Python Backend API URL
 const API_URL = 'http://localhost:8000/api';
 
-// Maksimum nokta sayısı
-const MAX_WAYPOINTS = 7;
+// Maksimum nokta sayısı (başlangıç + 50 ara durak + bitiş; backend 15 ara durağa
+// kadar Held-Karp ile kesin çözer, daha fazlasında rota akış boyunca iyileşir)
+const MAX_WAYPOINTS = 52;
+
+// Anytime TSP için süre bütçesi (saniye); ilk rota hemen çizilir
+const OPTIMIZE_TIME_LIMIT = 10;
 
 // Marker renkleri
+const START_COLOR = 'blue';
+const END_COLOR = 'red';
 const MARKER_COLORS = [
-    'blue',    // Başlangıç
-    'gold',    // Ara 1
-    'orange',  // Ara 2
-    'violet',  // Ara 3
-    'green',   // Ara 4
-    'grey',    // Ara 5
-    'red'      // Bitiş
+    'gold',    // Ara durak
+    'orange',
+    'violet',
+    'green',
+    'grey'
 ];
 
 /**
@@ -57,26 +62,26 @@ function initMap() {
 }
 
 /**
- * Graph verisini Python API'den yükler
+ * Graph istatistiklerini Python API'den yükler
  */
 async function loadGraphData() {
     try {
         updateStatus('Graph verisi yükleniyor...', 'loading');
         
-        const response = await fetch(`${API_URL}/graph`);
+        const response = await fetch(`${API_URL}/graph/stats`);
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const data = await response.json();
-        graphData = data;
+        const stats = await response.json();
+        graphStats = stats;
         
-        document.getElementById('totalNodes').textContent = data.stats.node_count;
-        document.getElementById('totalEdges').textContent = data.stats.edge_count;
+        document.getElementById('totalNodes').textContent = stats.node_count;
+        document.getElementById('totalEdges').textContent = stats.edge_count;
         
         updateStatus('🔵 Başlangıç noktası seçin', 'ready');
-        console.log('✅ Graph verisi yüklendi:', data.stats);
+        console.log('✅ Graph istatistikleri yüklendi:', stats);
         
     } catch (error) {
         console.error('❌ Graph yüklenemedi:', error);
@@ -97,7 +102,7 @@ function setupEventListeners() {
  * Harita tıklandığında çalışır
  */
 function onMapClick(e) {
-    if (!graphData) {
+    if (!graphStats) {
         alert('Graph verisi henüz yüklenmedi. Lütfen bekleyin.');
         return;
     }
@@ -119,14 +124,17 @@ function onMapClick(e) {
 function addWaypoint(lat, lon) {
     const pointIndex = waypoints.length;
     
-    let color = MARKER_COLORS[pointIndex];
+    let color;
     let label;
     
     if (pointIndex === 0) {
+        color = START_COLOR;
         label = '🔵 Başlangıç';
     } else if (pointIndex < MAX_WAYPOINTS - 1) {
+        color = MARKER_COLORS[(pointIndex - 1) % MARKER_COLORS.length];
         label = `🟡 Ara Durak ${pointIndex}`;
     } else {
+        color = END_COLOR;
         label = '🔴 Bitiş';
     }
     
@@ -181,6 +189,37 @@ function updateWaypointsList() {
         : `${waypoints.length}/${MAX_WAYPOINTS} nokta`;
 }
 
+/**
+ * Encoded polyline metnini [[lat, lon], ...] listesine çevirir
+ * (backend route_geometry.encode_polyline ile aynı algoritma)
+ */
+function decodePolyline(encoded, precision) {
+    const factor = Math.pow(10, precision);
+    const coordinates = [];
+    let index = 0;
+    let lat = 0;
+    let lon = 0;
+    
+    while (index < encoded.length) {
+        const values = [0, 0];
+        for (let axis = 0; axis < 2; axis++) {
+            let shift = 0;
+            let result = 0;
+            let byte;
+            do {
+                byte = encoded.charCodeAt(index++) - 63;
+                result += (byte & 0x1f) * Math.pow(2, shift);
+                shift += 5;
+            } while (byte >= 0x20);
+            values[axis] = (result % 2) ? -(result + 1) / 2 : result / 2;
+        }
+        lat += values[0];
+        lon += values[1];
+        coordinates.push([lat / factor, lon / factor]);
+    }
+    return coordinates;
+}
+
 /**
  * İki nokta arası mesafeyi hesaplar (API'den)
  */
@@ -195,7 +234,8 @@ async function getDistance(point1, point2) {
                 start_lat: point1.lat,
                 start_lon: point1.lon,
                 end_lat: point2.lat,
-                end_lon: point2.lon
+                end_lon: point2.lon,
+                compact: true
             })
         });
         
@@ -204,6 +244,7 @@ async function getDistance(point1, point2) {
         }
         
         const result = await response.json();
+        result.coordinates = decodePolyline(result.geometry, result.precision);
         return result;
     } catch (error) {
         console.error('Mesafe hesaplama hatası:', error);
@@ -228,8 +269,39 @@ function permute(arr) {
     return result;
 }
 
+/**
+ * Server-Sent Events akışını okur (fetch ile; EventSource POST desteklemez)
+ * Her olay için onEvent(event, data) çağrılır, ':' ile başlayan satırlar yok sayılır
+ */
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let data = '';
+            for (const line of message.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
 /**
  * TSP: En kısa rotayı bulur (Python Backend'de hesaplanır)
+ * Backend o ana kadarki en iyi rotayı akış olarak gönderir; her iyileşme çizilir
  */
 async function findOptimalRoute() {
     if (waypoints.length < 2) {
@@ -247,9 +319,14 @@ async function findOptimalRoute() {
     console.log(`📊 Bitiş: ${end.label}`);
     console.log(`📊 Ara duraklar: ${middlePoints.length}`);
     
+    // Önceki akış sürüyorsa durdurulur (backend de aramayı bırakır)
+    if (optimizeController) optimizeController.abort();
+    const controller = new AbortController();
+    optimizeController = controller;
+    
     try {
-        // Python Backend'e TSP isteği gönder
-        const response = await fetch(`${API_URL}/find-optimal-route`, {
+        // Python Backend'e anytime TSP isteği gönder
+        const response = await fetch(`${API_URL}/find-optimal-route/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -259,8 +336,11 @@ async function findOptimalRoute() {
                 start_lon: start.lon,
                 waypoints: middlePoints.map(wp => ({ lat: wp.lat, lon: wp.lon })),
                 end_lat: end.lat,
-                end_lon: end.lon
-            })
+                end_lon: end.lon,
+                time_limit: OPTIMIZE_TIME_LIMIT,
+                compact: true
+            }),
+            signal: controller.signal
         });
         
         if (!response.ok) {
@@ -268,35 +348,59 @@ async function findOptimalRoute() {
             throw new Error(error.message || 'En iyi rota bulunamadı');
         }
         
-        const result = await response.json();
+        let best = null;
+        let summary = null;
+        await readEventStream(response, (event, data) => {
+            if (event === 'route') {
+                best = data;
+                drawOptimalRouteFromBackend(data, false);
+                updateStatus(`⏳ Rota iyileştiriliyor: ${data.total_distance} km (${data.improvement}. çözüm, ${Math.round(data.elapsed_ms)} ms)`, 'calculating');
+            } else if (event === 'done') {
+                summary = data;
+            }
+        });
         
-        console.log('✅ Python Backend\'den en iyi rota alındı:', result);
+        if (!best) {
+            throw new Error('En iyi rota bulunamadı');
+        }
+        
+        console.log('✅ Python Backend\'den en iyi rota alındı:', best, summary);
         
         // Sonuçları göster
-        await drawOptimalRouteFromBackend(result);
+        await drawOptimalRouteFromBackend(best, true);
         
     } catch (error) {
+        if (error.name === 'AbortError') {
+            console.log('⏹️ TSP akışı iptal edildi');
+            return;
+        }
         console.error('❌ TSP hatası:', error);
         updateStatus('❌ Hata: ' + error.message, 'error');
         alert('En iyi rota bulunamadı!\n' + error.message);
+    } finally {
+        if (optimizeController === controller) optimizeController = null;
     }
 }
 
 /**
  * Backend'den gelen optimal rotayı çizer
+ * final false ise (akıştaki ara sonuç) sadece çizgiler ve mesafe güncellenir
  */
-async function drawOptimalRouteFromBackend(result) {
+async function drawOptimalRouteFromBackend(result, final = true) {
     pathPolylines.forEach(poly => map.removeLayer(poly));
     pathPolylines = [];
     
     const segmentColors = ['#3b82f6', '#22c55e', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899', '#06b6d4'];
     let totalNodes = 0;
     
+    // Ortak geometri bir kez çözülür; segmentler indeks aralığıyla bakar
+    const coordinates = decodePolyline(result.geometry, result.precision);
+    
     // Her segmenti çiz
     result.segments.forEach((segment, i) => {
         const color = segmentColors[i % segmentColors.length];
         
-        const polyline = L.polyline(segment.coordinates, {
+        const polyline = L.polyline(coordinates.slice(segment.start, segment.end + 1), {
             color: color,
             weight: 5,
             opacity: 0.8,
@@ -307,6 +411,17 @@ async function drawOptimalRouteFromBackend(result) {
         totalNodes += segment.node_count;
     });
     
+    document.getElementById('distance').textContent = `${result.total_distance} km`;
+    document.getElementById('pathNodes').textContent = `${waypoints.length} nokta, ${totalNodes} düğüm`;
+    
+    // Ara sonuç: harita sadece ilk rotada ortalanır, popup son rotada açılır
+    if (!final) {
+        if (result.improvement === 1) {
+            map.fitBounds(L.latLngBounds(coordinates), { padding: [50, 50] });
+        }
+        return;
+    }
+    
     // Rota sırasını göster
     let rotaMetni = result.optimal_order.map((nodeId, i) => {
         if (i === 0) return '🔵 Başlangıç';
@@ -318,15 +433,13 @@ async function drawOptimalRouteFromBackend(result) {
     console.log(`📏 Toplam mesafe: ${result.total_distance} km`);
     
     updateStatus('✅ En kısa rota bulundu! (Python Dijkstra + TSP)', 'success');
-    document.getElementById('distance').textContent = `${result.total_distance} km`;
-    document.getElementById('pathNodes').textContent = `${waypoints.length} nokta, ${totalNodes} düğüm`;
     
-    const bounds = L.latLngBounds(result.coordinates);
+    const bounds = L.latLngBounds(coordinates);
     map.fitBounds(bounds, { padding: [50, 50] });
     
     document.getElementById('resetBtn').style.display = 'block';
     
-    const midPoint = result.coordinates[Math.floor(result.coordinates.length / 2)];
+    const midPoint = coordinates[Math.floor(coordinates.length / 2)];
     L.popup()
         .setLatLng(midPoint)
         .setContent(`
@@ -457,6 +570,8 @@ async function drawOptimalRoute(route, segments, totalDistance) {
  * Haritayı sıfırlar
  */
 function resetMap() {
+    if (optimizeController) optimizeController.abort();
+    
     markers.forEach(marker => map.removeLayer(marker));
     markers = [];
     
@@ -0,0 +1,288 @@
+"""
+Production Server - Graph'ı paylaşan çok process'li sunucu
+CENG 3511 - Artificial Intelligence Final Project
+
+Ana process graph'ı bir kez yükler, dinleme soketini açar ve N worker
+fork eder. Worker'lar graph'ı copy-on-write olarak devralır (ikili
+mugla_full.graph kullanılıyorsa sayfalar zaten mmap ile paylaşılır);
+hepsi aynı soketten bağlantı kabul eder.
+
+Çok bölgeli sunumda (--regions) ana process sadece varsayılan bölgeyi
+yükler; diğer bölgeler her worker'da ilk istekte yüklenir ve bellek
+bütçesi (--region-memory) worker başına uygulanır.
+
+Sinyaller:
+    SIGHUP          Graph dosyasını yeniden yükler; yeni worker'lar başlatılır,
+                    eskiler elindeki istekleri bitirip kapanır (istek düşmez)
+    SIGTERM/SIGINT  Worker'ları nazikçe kapatır
+
+Kullanım:
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+    python serve.py --graph mugla_full.json
+    python serve.py --regions regions.json --region-memory 1024
+    python serve.py --metrics        # /metrics (tüm worker'ların toplamı)
+    kill -HUP <ana process pid>     # graph'ı yeniden yükle
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import app as app_module
+import distance_matrix
+import metrics
+
+# Varsayılan ayarlar (ortam değişkenleriyle de verilebilir)
+DEFAULT_BIND = os.environ.get('ROUTE_BIND', '127.0.0.1:8000')
+DEFAULT_WORKERS = int(os.environ.get('ROUTE_WORKERS', os.cpu_count() or 1))
+
+# Kapanan worker'ın elindeki istekleri bitirmesi için süre (saniye)
+GRACEFUL_TIMEOUT = 30
+
+# Boşta bekleyen keep-alive bağlantılarının kapanma süresi (saniye)
+KEEPALIVE_TIMEOUT = 5
+
+# Ana process'in worker durumunu kontrol etme aralığı (saniye)
+POLL_INTERVAL = 0.2
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # Boşta kalan bağlantılar worker kapanışını geciktirmesin
+    timeout = KEEPALIVE_TIMEOUT
+
+
+def parse_bind(bind: str):
+    """'host:port' -> (host, port)"""
+    host, _, port = bind.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Geçersiz bind adresi: {bind} (host:port bekleniyor)")
+    return host.strip('[]'), int(port)
+
+
+def open_listener(host: str, port: int) -> socket.socket:
+    """Tüm worker'ların paylaşacağı dinleme soketi"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(socket.SOMAXCONN)
+    listener.set_inheritable(True)
+    return listener
+
+
+def run_worker(listener: socket.socket, host: str, port: int):
+    """Worker process: paylaşılan soketten istek kabul eder (geri dönmez)"""
+    # Çekirdekler zaten worker'lara dağıtılmış; thread'li worker içinden
+    # işlem havuzu fork edilmez, aramalar seri çalışır
+    distance_matrix.PARALLEL_WORKERS = 1
+    server = make_server(host, port, app_module.app, threaded=True,
+                         request_handler=_RequestHandler, fd=listener.fileno())
+    # server_close() sürmekte olan istek thread'lerini beklesin
+    server.daemon_threads = False
+
+    def stop(signum, frame):
+        # shutdown() serve_forever döngüsünü bekler; ayrı thread'den çağrılmalı
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl+C tüm process grubuna gider; kapanışı ana process yönetir
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    exit_code = 0
+    try:
+        server.serve_forever()
+        server.server_close()
+        # Kapanan worker'ın son sayaçları toplamda kalsın
+        metrics.maybe_write_snapshot(force=True)
+    except BaseException as e:
+        print(f"❌ Worker {os.getpid()} hata ile kapandı: {e}", file=sys.stderr)
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+
+class Master:
+    """Worker'ları başlatan, izleyen ve yeniden yükleyen ana process"""
+
+    def __init__(self, listener: socket.socket, host: str, port: int, worker_count: int):
+        self.listener = listener
+        self.host = host
+        self.port = port
+        self.worker_count = worker_count
+        self.workers = set()       # Güncel nesil worker pid'leri
+        self.retiring = {}         # Kapanmakta olan pid -> son tarih
+        self.pending = []          # İşlenecek sinyaller
+
+    def spawn_worker(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.listener, self.host, self.port)
+        self.workers.add(pid)
+        return pid
+
+    def spawn_generation(self):
+        # Graph nesneleri fork sonrası GC tarafından taranmasın (copy-on-write korunur)
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.worker_count):
+            self.spawn_worker()
+        print(f"✅ {self.worker_count} worker başlatıldı: {sorted(self.workers)}")
+
+    def retire(self, pids):
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        for pid in pids:
+            self.workers.discard(pid)
+            self.retiring[pid] = deadline
+            self._kill(pid, signal.SIGTERM)
+
+    def reload(self):
+        print("🔄 Graph yeniden yükleniyor...")
+        # Dondurulmuş nesneler hiç toplanmaz; graph <-> CH/landmark döngüleri
+        # eski graph'ı sonsuza kadar tutmasın diye çözülür (spawn_generation
+        # yeni nesilden önce tekrar dondurur)
+        gc.unfreeze()
+        previous = app_module.registry
+        loaded = app_module.load_graph_data() and app_module.registry is not previous
+        del previous
+        if not loaded:
+            print("⚠️  Yeniden yükleme başarısız, eski worker'lar çalışmaya devam ediyor")
+            gc.collect()
+            gc.freeze()
+            return
+
+        old_workers = set(self.workers)
+        self.workers = set()
+        # Önce yeni nesil soketi dinlemeye başlar, sonra eskiler kapanır
+        self.spawn_generation()
+        self.retire(old_workers)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            if pid in self.retiring:
+                del self.retiring[pid]
+            elif pid in self.workers:
+                self.workers.discard(pid)
+                print(f"⚠️  Worker {pid} beklenmedik şekilde kapandı (durum {status}), yenisi başlatılıyor")
+                self.spawn_worker()
+
+    def enforce_deadlines(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now > deadline:
+                print(f"⚠️  Worker {pid} zamanında kapanmadı, sonlandırılıyor")
+                self._kill(pid, signal.SIGKILL)
+                self.retiring[pid] = float('inf')
+
+    def _kill(self, pid: int, sig: int):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def run(self):
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda signum, frame: self.pending.append(signum))
+
+        self.spawn_generation()
+
+        while True:
+            while self.pending:
+                signum = self.pending.pop(0)
+                if signum == signal.SIGHUP:
+                    self.reload()
+                else:
+                    self.shutdown()
+                    return
+            self.reap()
+            self.enforce_deadlines()
+            time.sleep(POLL_INTERVAL)
+
+    def shutdown(self):
+        print("🛑 Server kapatılıyor, worker'lar istekleri bitiriyor...")
+        self.retire(set(self.workers))
+        while self.retiring:
+            self.reap()
+            self.enforce_deadlines()
+            time.sleep(POLL_INTERVAL)
+        self.listener.close()
+        print("✅ Server kapatıldı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Smart Route Navigator production server')
+    parser.add_argument('--bind', default=DEFAULT_BIND,
+                        help='Dinlenecek adres host:port (varsayılan: %(default)s, ROUTE_BIND)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Worker process sayısı (varsayılan: %(default)s, ROUTE_WORKERS)')
+    parser.add_argument('--graph', default=app_module.GRAPH_FILE,
+                        help='Graph dosyası (varsayılan: %(default)s)')
+    parser.add_argument('--regions', default=app_module.REGIONS_FILE,
+                        help='Bölge dosyası (graph_registry.py; ROUTE_REGIONS); verilirse --graph kullanılmaz')
+    parser.add_argument('--region-memory', type=float,
+                        help='Worker başına yüklü bölgelerin bellek bütçesi (MB, ROUTE_REGION_MEMORY_MB)')
+    parser.add_argument('--metrics', action='store_true',
+                        help='/metrics endpoint\'ini ve ölçümleri aç (ROUTE_METRICS=1)')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        print("❌ Çok process'li mod fork gerektirir; bu platformda python app.py kullanın")
+        sys.exit(1)
+
+    if args.workers < 1:
+        parser.error('--workers en az 1 olmalı')
+
+    try:
+        host, port = parse_bind(args.bind)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("=" * 60)
+    print("🚀 Smart Route Navigator - Production Server")
+    print("=" * 60)
+
+    app_module.GRAPH_FILE = args.graph
+    app_module.REGIONS_FILE = args.regions
+    if args.region_memory is not None:
+        app_module.REGION_MEMORY_BUDGET = int(args.region_memory * 1024 * 1024)
+    if not app_module.load_graph_data():
+        print("\n❌ Graph verisi yüklenemedi, server başlatılamıyor!")
+        sys.exit(1)
+
+    metrics_dir = None
+    if args.metrics:
+        metrics.enable()
+    if metrics.ENABLED and metrics.METRICS_DIR is None:
+        # Worker'lar anlık görüntülerini buraya yazar; /metrics hepsini toplar
+        metrics_dir = metrics.METRICS_DIR = tempfile.mkdtemp(prefix='route-metrics-')
+
+    listener = open_listener(host, port)
+    print(f"\n📍 URL: http://{args.bind}")
+    print(f"🔧 Worker sayısı: {args.workers} (ana process pid {os.getpid()})")
+    print("💡 Graph'ı yeniden yüklemek için: kill -HUP", os.getpid())
+
+    try:
+        Master(listener, host, port, args.workers).run()
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
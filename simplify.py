@@ -0,0 +1,290 @@
+"""
+Simplify - Derece-2 zincirlerini tek kenara indirerek graph sadeleştirme
+CENG 3511 - Artificial Intelligence Final Project
+
+OSM çıktısındaki düğümlerin çoğu yolun şeklini çizen ara noktalardır:
+tam iki komşuları vardır ve kavşak değildirler. Arama bu noktaların
+her birini ayrı ayrı yerleştirir (settle), en yakın düğüm taraması da
+hepsini gezer. Sadeleştirme bu zincirleri tek kenara indirir:
+
+    - Korunan düğümler: kavşaklar, çıkmaz sokaklar ve giriş/çıkışı düz
+      bir geçiş olmayan (ör. tek yönlü yolun başladığı) düğümler
+    - Ara nokta: tek komşuya (a) giren ve diğerine (b) çıkan tek yönlü
+      geçiş ya da a <-> v <-> b çift yönlü geçiş; öz döngü veya paralel
+      kenarı olan düğümler korunur
+    - Her yön ayrı yürünür; tek yönlü zincirler tek yönde kalır
+    - Zincirin ağırlığı kenar ağırlıklarının toplamıdır, ara noktalar
+      kenarın 'shape' alanına [id, lat, lon] olarak sırayla yazılır
+
+Graph 'shape' alanını okur ve build_path_result ara noktaları yola geri
+ekler; path ve coordinates özgün graph'takiyle aynı ayrıntıda döner.
+API'deki düğüm ID'leri (kenar güncellemeleri, waypoint'ler) artık
+sadece korunan düğümlerdir.
+
+Kullanım:
+    python simplify.py mugla_full.json                     # mugla_full_simple.json
+    python simplify.py mugla_full.json --output simple.json --max-length 2
+    python serve.py --graph mugla_full_simple.json
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+from dijkstra import ALGORITHMS, Graph, dijkstra, find_nearest_node
+
+# Rapor için varsayılan ayarlar
+DEFAULT_QUERIES = 50
+DEFAULT_SEED = 42
+REPORT_ALGORITHMS = ('dijkstra', 'astar', 'bidirectional')
+
+# Rapordaki mesafe karşılaştırması için tolerans (km); sonuçlar 3 basamağa
+# yuvarlanır ve zincir toplamı kayan nokta farkıyla öbür yana yuvarlanabilir
+DISTANCE_TOLERANCE = 0.0011
+
+
+def simplified_path_for(graph_path: str) -> str:
+    """mugla_full.json -> mugla_full_simple.json"""
+    base, extension = os.path.splitext(graph_path)
+    return f"{base}_simple{extension or '.json'}"
+
+
+def _pass_through(offsets, targets, rev_offsets, rev_sources, v: int) -> bool:
+    """v zincirin içindeki bir ara nokta mı (kaldırılabilir mi)"""
+    out = [targets[k] for k in range(offsets[v], offsets[v + 1])]
+    incoming = [rev_sources[k] for k in range(rev_offsets[v], rev_offsets[v + 1])]
+    if v in out:
+        return False
+    if len(out) == 1 and len(incoming) == 1:
+        return out[0] != incoming[0]
+    if len(out) == 2 and len(incoming) == 2:
+        return out[0] != out[1] and set(out) == set(incoming)
+    return False
+
+
+def _next_slot(offsets, targets, previous: int, current: int) -> int:
+    """previous'tan gelinen ara noktadan çıkan (geri dönmeyen) kenar"""
+    for k in range(offsets[current], offsets[current + 1]):
+        if targets[k] != previous:
+            return k
+    raise ValueError("Ara noktadan devam eden kenar yok")
+
+
+def _kept_nodes(graph: Graph, max_length: float) -> bytearray:
+    """
+    Sadeleştirilmiş graph'ta kalacak düğümler
+
+    Zincirler max_length'i (kenar ağırlığı toplamı) aşmayacak biçimde
+    bölünür. Hiç korunan düğümü olmayan kapalı zincirlerde (ör. bir
+    göbeğin tamamı ara nokta ise) bir düğüm korunur.
+    """
+    n = graph.node_count
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    rev_offsets, rev_sources, _ = graph.get_reverse_arrays()
+
+    kept = bytearray(n)
+    for v in range(n):
+        if not _pass_through(offsets, targets, rev_offsets, rev_sources, v):
+            kept[v] = 1
+    visited = bytearray(n)
+
+    def walk(starts: List[int]):
+        while starts:
+            start = starts.pop()
+            for slot in range(offsets[start], offsets[start + 1]):
+                previous = start
+                current = targets[slot]
+                length = weights[slot]
+                while not kept[current]:
+                    visited[current] = 1
+                    k = _next_slot(offsets, targets, previous, current)
+                    if length + weights[k] > max_length:
+                        kept[current] = 1
+                        starts.append(current)
+                        break
+                    length += weights[k]
+                    previous, current = current, targets[k]
+
+    walk([v for v in range(n) if kept[v]])
+    for v in range(n):
+        if not kept[v] and not visited[v]:
+            kept[v] = 1
+            walk([v])
+    return kept
+
+
+def simplify_graph(graph: Graph, max_length: float = float('inf')) -> Dict:
+    """
+    Derece-2 zincirlerini tek kenara indirir
+
+    Args:
+        graph: Özgün graph (zaten sadeleştirilmiş olabilir; şekiller birleştirilir)
+        max_length: Birleştirilmiş kenarın en fazla ağırlığı; uzun zincirler
+            bölünür, böylece en yakın düğüm hatası ve kenar güncellemelerinin
+            ayrıntısı sınırlı kalır
+
+    Returns:
+        {'nodes': {id: {lat, lon}}, 'edges': {id: [{node, weight, shape?}]}}
+        - mugla_full.json biçiminde, shape = [[id, lat, lon], ...]
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    node_ids = graph.node_ids
+    lat = graph.lat
+    lon = graph.lon
+    shapes = graph.shapes
+
+    kept = _kept_nodes(graph, max_length)
+
+    nodes = {}
+    edges = {}
+    for u in range(graph.node_count):
+        if not kept[u]:
+            continue
+        node_id = node_ids[u]
+        nodes[node_id] = {'lat': lat[u], 'lon': lon[u]}
+        neighbors = []
+        for slot in range(offsets[u], offsets[u + 1]):
+            previous = u
+            k = slot
+            weight = 0.0
+            shape = []
+            while True:
+                weight += weights[k]
+                if shapes is not None:
+                    shape_offsets, shape_ids, shape_lat, shape_lon = shapes
+                    for j in range(shape_offsets[k], shape_offsets[k + 1]):
+                        shape.append([shape_ids[j], shape_lat[j], shape_lon[j]])
+                current = targets[k]
+                if kept[current]:
+                    break
+                shape.append([node_ids[current], lat[current], lon[current]])
+                previous, k = current, _next_slot(offsets, targets, previous, current)
+
+            # Birleştirmeyle oluşan döngüler hiçbir en kısa yolda kullanılmaz
+            if current == u and k != slot:
+                continue
+            neighbor = {'node': node_ids[current], 'weight': weight}
+            if shape:
+                neighbor['shape'] = shape
+            neighbors.append(neighbor)
+        edges[node_id] = neighbors
+
+    return {'nodes': nodes, 'edges': edges}
+
+
+def simplification_report(original: Graph, simplified: Graph, queries: int = DEFAULT_QUERIES,
+                          seed: int = DEFAULT_SEED,
+                          algorithms: Optional[List[str]] = None) -> Dict:
+    """
+    Düğüm/kenar azalması ve sorgu hızlanması
+
+    Aynı (korunan) düğüm çiftleri iki graph'ta da sorgulanır; mesafelerin
+    eşit olduğu da doğrulanır (eşit olmayan sorgu sayısı 'mismatches').
+    """
+    from benchmark import measure, random_points
+
+    rng = random.Random(seed)
+    algorithms = list(algorithms or REPORT_ALGORITHMS)
+    kept_ids = simplified.node_ids
+    pairs = [(kept_ids[rng.randrange(simplified.node_count)],
+              kept_ids[rng.randrange(simplified.node_count)]) for _ in range(queries)]
+    points = random_points(original, rng, queries)
+
+    report = {
+        'nodes': {'original': original.node_count, 'simplified': simplified.node_count},
+        'edges': {'original': original.edge_count, 'simplified': simplified.edge_count},
+        'queries': queries,
+        'search': {},
+        'mismatches': 0
+    }
+    for key in ('nodes', 'edges'):
+        counts = report[key]
+        counts['reduction'] = round(1 - counts['simplified'] / counts['original'], 4) if counts['original'] else 0.0
+
+    for graph in (original, simplified):
+        graph.build_spatial_index()
+        # A* ölçeği ve ters diziler ilk sorguda kurulur; ölçüme girmesin
+        graph.get_heuristic_scale()
+        graph.get_reverse_arrays()
+
+    for algorithm in algorithms:
+        timings = {}
+        for name, graph in (('original', original), ('simplified', simplified)):
+            timings[name] = measure(dijkstra, [(graph, start, end, algorithm) for start, end in pairs])
+        timings['speedup'] = round(timings['original']['median_ms'] /
+                                   max(timings['simplified']['median_ms'], 1e-9), 2)
+        report['search'][algorithm] = timings
+
+    for start, end in pairs:
+        before = dijkstra(original, start, end)
+        after = dijkstra(simplified, start, end)
+        if (before is None) != (after is None) or (
+                before is not None and abs(before['distance'] - after['distance']) > DISTANCE_TOLERANCE):
+            report['mismatches'] += 1
+
+    nearest = {}
+    for name, graph in (('original', original), ('simplified', simplified)):
+        nearest[name] = measure(find_nearest_node, [(point_lat, point_lon, graph)
+                                                    for point_lat, point_lon in points])
+    nearest['speedup'] = round(nearest['original']['median_ms'] /
+                               max(nearest['simplified']['median_ms'], 1e-9), 2)
+    report['nearest'] = nearest
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Derece-2 zincirlerini birleştirerek graph sadeleştirme')
+    parser.add_argument('graph', nargs='?', default='mugla_full.json', help='Özgün graph JSON dosyası')
+    parser.add_argument('--output', help='Çıktı dosyası (varsayılan: <ad>_simple.json)')
+    parser.add_argument('--max-length', type=float, default=float('inf'),
+                        help='Birleştirilmiş kenarın en fazla ağırlığı (km)')
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES, help='Rapordaki sorgu sayısı')
+    parser.add_argument('--algorithms', default=','.join(REPORT_ALGORITHMS),
+                        help=f"Rapordaki algoritmalar (virgülle): {','.join(ALGORITHMS)}")
+    parser.add_argument('--skip-report', action='store_true', help='Hız raporunu atla')
+    args = parser.parse_args()
+
+    output_path = args.output or simplified_path_for(args.graph)
+
+    print(f"🔧 Graph sadeleştirme: {args.graph}")
+    started = time.perf_counter()
+    with open(args.graph, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    original = Graph(data['nodes'], data['edges'])
+    del data
+
+    simplified_data = simplify_graph(original, args.max_length)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(simplified_data, f)
+    simplified = Graph(simplified_data['nodes'], simplified_data['edges'])
+    del simplified_data
+    print(f"✅ {original.node_count} -> {simplified.node_count} düğüm, "
+          f"{original.edge_count} -> {simplified.edge_count} kenar "
+          f"({time.perf_counter() - started:.1f} sn)")
+    print(f"💾 Sadeleştirilmiş graph kaydedildi: {output_path}")
+
+    if args.skip_report:
+        return
+
+    print("📏 Sorgu hızlanması ölçülüyor...")
+    algorithms = [name for name in args.algorithms.split(',') if name]
+    report = simplification_report(original, simplified, args.queries, algorithms=algorithms)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    for key in ('nodes', 'edges'):
+        print(f"   - {key}: %{report[key]['reduction'] * 100:.1f} azalma")
+    for algorithm, timings in report['search'].items():
+        print(f"   - {algorithm}: {timings['original']['median_ms']:.2f} -> "
+              f"{timings['simplified']['median_ms']:.2f} ms (x{timings['speedup']})")
+    if report['mismatches']:
+        print(f"⚠️  {report['mismatches']} sorguda mesafe farklı!")
+
+
+if __name__ == "__main__":
+    main()
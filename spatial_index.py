@@ -0,0 +1,423 @@
+"""
+Spatial Index - En yakın düğüm sorguları için KD-tree
+CENG 3511 - Artificial Intelligence Final Project
+"""
+
+import math
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from dijkstra import haversine_distance
+
+# Yaprak başına en fazla nokta sayısı
+LEAF_SIZE = 16
+
+# Dünya yarıçapı (km) - haversine_distance ile aynı
+EARTH_RADIUS = 6371
+
+# Kayan nokta hatalarına karşı budama toleransı (birim küre üzerinde)
+PRUNE_EPSILON = 1e-9
+
+
+def _to_unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    """(lat, lon) derecesini birim küre üzerindeki (x, y, z) noktasına çevirir"""
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    cos_lat = math.cos(lat_rad)
+    return (cos_lat * math.cos(lon_rad), cos_lat * math.sin(lon_rad), math.sin(lat_rad))
+
+
+class SpatialIndex:
+    """
+    Düğüm koordinatları üzerinde 3B KD-tree
+
+    Koordinatlar birim küre üzerindeki kartezyen noktalara projekte edilir.
+    Kiriş (chord) uzunluğu büyük daire mesafesiyle monoton arttığı için
+    budama kiriş üzerinden yapılır; adaylar ise haversine_distance ile
+    karşılaştırılır. Eşit mesafede en küçük indeks seçilir, böylece sonuç
+    doğrusal taramayla birebir aynıdır.
+    """
+
+    def __init__(self, lat: Sequence[float], lon: Sequence[float]):
+        """
+        Args:
+            lat: Düğüm indeksine göre latitude dizisi
+            lon: Düğüm indeksine göre longitude dizisi
+        """
+        self.lat = lat
+        self.lon = lon
+
+        count = len(lat)
+        xs = array('d', bytes(8 * count))
+        ys = array('d', bytes(8 * count))
+        zs = array('d', bytes(8 * count))
+        for i in range(count):
+            xs[i], ys[i], zs[i] = _to_unit_vector(lat[i], lon[i])
+        self.coords = (xs, ys, zs)
+
+        # Ağaç düğümleri: split_dim == -1 ise yaprak (start:end aralığı)
+        self.split_dim = array('b')
+        self.split_value = array('d')
+        self.left = array('i')
+        self.right = array('i')
+        self.start = array('i')
+        self.end = array('i')
+
+        # Yapraklar, noktaları bu permütasyon dizisinin dilimleri olarak tutar
+        self.order = array('i')
+
+        if count:
+            self._build(list(range(count)))
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _new_node(self) -> int:
+        self.split_dim.append(-1)
+        self.split_value.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.start.append(0)
+        self.end.append(0)
+        return len(self.split_dim) - 1
+
+    def _build(self, indices: List[int]):
+        """Ağacı özyinelemesiz (stack ile) oluşturur"""
+        coords = self.coords
+        stack = [(self._new_node(), indices)]
+
+        while stack:
+            node, items = stack.pop()
+
+            if len(items) <= LEAF_SIZE:
+                self.start[node] = len(self.order)
+                self.order.extend(items)
+                self.end[node] = len(self.order)
+                continue
+
+            # En geniş yayılıma sahip ekseni seç
+            best_dim = 0
+            best_spread = -1.0
+            for dim in range(3):
+                values = coords[dim]
+                low = min(values[i] for i in items)
+                high = max(values[i] for i in items)
+                if high - low > best_spread:
+                    best_spread = high - low
+                    best_dim = dim
+
+            values = coords[best_dim]
+            items.sort(key=values.__getitem__)
+            mid = len(items) // 2
+
+            left_node = self._new_node()
+            right_node = self._new_node()
+            self.split_dim[node] = best_dim
+            self.split_value[node] = values[items[mid]]
+            self.left[node] = left_node
+            self.right[node] = right_node
+
+            stack.append((left_node, items[:mid]))
+            stack.append((right_node, items[mid:]))
+
+    def nearest(self, lat: float, lon: float, mask: Optional[Sequence[int]] = None) -> int:
+        """
+        Koordinata en yakın düğümün indeksini bulur
+
+        Args:
+            lat: Sorgu latitude
+            lon: Sorgu longitude
+            mask: Verilirse sadece mask[i] doğru olan düğümler aday olur
+
+        Returns:
+            En yakın düğümün indeksi (indeks boşsa veya aday yoksa -1)
+        """
+        if not self.split_dim:
+            return -1
+
+        query = _to_unit_vector(lat, lon)
+        xs, ys, zs = self.coords
+        qx, qy, qz = query
+        node_lat = self.lat
+        node_lon = self.lon
+        order = self.order
+        split_dim = self.split_dim
+        split_value = self.split_value
+
+        best = -1
+        best_distance = float('inf')
+        bound = float('inf')
+
+        # (kare alt sınır, ağaç düğümü, eksen başına kutu uzaklıkları)
+        stack = [(0.0, 0, (0.0, 0.0, 0.0))]
+
+        while stack:
+            lower_bound, node, offsets = stack.pop()
+            if lower_bound > bound * bound:
+                continue
+
+            dim = split_dim[node]
+            if dim < 0:
+                for k in range(self.start[node], self.end[node]):
+                    i = order[k]
+                    if mask is not None and not mask[i]:
+                        continue
+                    dx = xs[i] - qx
+                    dy = ys[i] - qy
+                    dz = zs[i] - qz
+                    if math.sqrt(dx * dx + dy * dy + dz * dz) > bound:
+                        continue
+
+                    distance = haversine_distance(lat, lon, node_lat[i], node_lon[i])
+                    if distance < best_distance or (distance == best_distance and i < best):
+                        best_distance = distance
+                        best = i
+                        half_angle = min(distance / (2 * EARTH_RADIUS), math.pi / 2)
+                        bound = 2 * math.sin(half_angle) + PRUNE_EPSILON
+                continue
+
+            diff = query[dim] - split_value[node]
+            if diff < 0:
+                near, far = self.left[node], self.right[node]
+            else:
+                near, far = self.right[node], self.left[node]
+
+            # Uzak tarafın alt sınırı, bu eksendeki kutu uzaklığı güncellenerek
+            # artımlı hesaplanır
+            old_offset = offsets[dim]
+            far_bound = lower_bound - old_offset * old_offset + diff * diff
+            far_offsets = list(offsets)
+            far_offsets[dim] = abs(diff)
+
+            # Uzak taraf önce eklenir, yakın taraf önce işlenir
+            stack.append((far_bound, far, tuple(far_offsets)))
+            stack.append((lower_bound, near, offsets))
+
+        return best
+
+    def nearest_many(self, points: Sequence[Tuple[float, float]],
+                     mask: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Birden fazla koordinatı tek çağrıda en yakın düğümlere eşler
+
+        Ağaç tüm sorgular için birlikte dolaşılır: önce sorgular bölünme
+        düzlemlerine göre ayrılarak kendi yapraklarına iner (aynı yapraktakiler
+        tek taramayla ilk adaylarını bulur), ardından her ağaç düğümü bir kez,
+        kutusu henüz budanmamış sorgu grubuyla ziyaret edilir. Sonuç her nokta
+        için nearest() ile aynıdır.
+
+        Args:
+            points: [(lat, lon), ...]
+            mask: Verilirse sadece mask[i] doğru olan düğümler aday olur
+
+        Returns:
+            Her nokta için en yakın düğüm indeksi
+        """
+        if not self.split_dim:
+            return [-1] * len(points)
+
+        # Aynı koordinat bir kez aranır
+        unique = list(dict.fromkeys((lat, lon) for lat, lon in points))
+        count = len(unique)
+        queries = [_to_unit_vector(lat, lon) for lat, lon in unique]
+
+        xs, ys, zs = self.coords
+        node_lat = self.lat
+        node_lon = self.lon
+        order = self.order
+        split_dim = self.split_dim
+        split_value = self.split_value
+
+        best = [-1] * count
+        best_distance = [float('inf')] * count
+        bound = [float('inf')] * count
+        home_leaf = [0] * count
+
+        def scan(node: int, group: List[int]):
+            """Yaprağın noktalarını gruptaki her sorguyla karşılaştırır"""
+            candidates = order[self.start[node]:self.end[node]]
+            if mask is not None:
+                candidates = [i for i in candidates if mask[i]]
+            for q in group:
+                qx, qy, qz = queries[q]
+                lat, lon = unique[q]
+                limit = bound[q] * bound[q]
+                for i in candidates:
+                    dx = xs[i] - qx
+                    dy = ys[i] - qy
+                    dz = zs[i] - qz
+                    if dx * dx + dy * dy + dz * dz > limit:
+                        continue
+
+                    distance = haversine_distance(lat, lon, node_lat[i], node_lon[i])
+                    if distance < best_distance[q] or (distance == best_distance[q] and i < best[q]):
+                        best_distance[q] = distance
+                        best[q] = i
+                        half_angle = min(distance / (2 * EARTH_RADIUS), math.pi / 2)
+                        bound[q] = 2 * math.sin(half_angle) + PRUNE_EPSILON
+                        limit = bound[q] * bound[q]
+
+        # 1) Sorgular kendi yapraklarına iner; ilk adaylar budama sınırını daraltır.
+        # margin, yol boyunca en yakın bölünme düzlemine (yaprak kutusunun
+        # yüzüne) uzaklıktır; sınır küresi kutudan taşmayan sorgunun sonucu kesindir.
+        margin = [float('inf')] * count
+        pending = []
+        stack = [(0, list(range(count)))]
+        while stack:
+            node, group = stack.pop()
+            dim = split_dim[node]
+            if dim < 0:
+                scan(node, group)
+                for q in group:
+                    home_leaf[q] = node
+                    if margin[q] <= bound[q]:
+                        pending.append(q)
+                continue
+            value = split_value[node]
+            left_group = []
+            right_group = []
+            for q in group:
+                diff = queries[q][dim] - value
+                if diff < 0:
+                    left_group.append(q)
+                    diff = -diff
+                else:
+                    right_group.append(q)
+                if diff < margin[q]:
+                    margin[q] = diff
+            if left_group:
+                stack.append((self.left[node], left_group))
+            if right_group:
+                stack.append((self.right[node], right_group))
+
+        # 2) Ortak dolaşma: bir düğüme, kutusuna olan kare alt sınırı kendi
+        # budama sınırını aşmayan sorgular taşınır. Alt sınır nearest()'teki gibi
+        # artımlı hesaplanır; kutunun eksen sınırları bölünmelerden gelir.
+        inf = float('inf')
+        stack = [(0, pending, [0.0] * len(pending), (-inf, -inf, -inf), (inf, inf, inf))]
+        while stack:
+            node, group, lower_bounds, low, high = stack.pop()
+            active = []
+            active_bounds = []
+            for q, lower_bound in zip(group, lower_bounds):
+                if lower_bound <= bound[q] * bound[q]:
+                    active.append(q)
+                    active_bounds.append(lower_bound)
+            if not active:
+                continue
+
+            dim = split_dim[node]
+            if dim < 0:
+                scan(node, [q for q in active if home_leaf[q] != node])
+                continue
+
+            value = split_value[node]
+            left_group, left_bounds, right_group, right_bounds = [], [], [], []
+            for q, lower_bound in zip(active, active_bounds):
+                coordinate = queries[q][dim]
+                diff = coordinate - value
+                # Bu eksende kutuya olan eski uzaklık, uzak tarafta diff ile değişir
+                if coordinate < low[dim]:
+                    old_offset = low[dim] - coordinate
+                elif coordinate > high[dim]:
+                    old_offset = coordinate - high[dim]
+                else:
+                    old_offset = 0.0
+                far_bound = lower_bound - old_offset * old_offset + diff * diff
+                if diff < 0:
+                    left_group.append(q)
+                    left_bounds.append(lower_bound)
+                    if far_bound <= bound[q] * bound[q]:
+                        right_group.append(q)
+                        right_bounds.append(far_bound)
+                else:
+                    right_group.append(q)
+                    right_bounds.append(lower_bound)
+                    if far_bound <= bound[q] * bound[q]:
+                        left_group.append(q)
+                        left_bounds.append(far_bound)
+
+            left_high = list(high)
+            left_high[dim] = value
+            right_low = list(low)
+            right_low[dim] = value
+            left = (self.left[node], left_group, left_bounds, low, tuple(left_high))
+            right = (self.right[node], right_group, right_bounds, tuple(right_low), high)
+
+            # Daha çok sorgunun yakın tarafı olan çocuk önce işlenir
+            if len(left_group) >= len(right_group):
+                stack.append(right)
+                stack.append(left)
+            else:
+                stack.append(left)
+                stack.append(right)
+
+        results = dict(zip(unique, best))
+        return [results[(lat, lon)] for lat, lon in points]
+
+    def within_bbox(self, min_lat: float, min_lon: float,
+                    max_lat: float, max_lon: float) -> List[int]:
+        """
+        Enlem/boylam kutusu içindeki düğümlerin indekslerini döndürür
+
+        Kutu birim küre üzerinde kapsayan bir 3B kutuya çevrilip ağaç
+        budanır; adaylar gerçek lat/lon sınırlarıyla elenir.
+
+        Returns:
+            Kutu içindeki düğüm indeksleri (artan sırada)
+        """
+        if not self.split_dim or min_lat > max_lat or min_lon > max_lon:
+            return []
+
+        cos_lat = _trig_range(math.cos, min_lat, max_lat)
+        box_low, box_high = [], []
+        for low, high in (
+            _interval_product(cos_lat, _trig_range(math.cos, min_lon, max_lon)),
+            _interval_product(cos_lat, _trig_range(math.sin, min_lon, max_lon)),
+            _trig_range(math.sin, min_lat, max_lat),
+        ):
+            box_low.append(low - PRUNE_EPSILON)
+            box_high.append(high + PRUNE_EPSILON)
+
+        node_lat = self.lat
+        node_lon = self.lon
+        order = self.order
+        split_dim = self.split_dim
+        split_value = self.split_value
+
+        found = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            dim = split_dim[node]
+            if dim < 0:
+                for k in range(self.start[node], self.end[node]):
+                    i = order[k]
+                    if min_lat <= node_lat[i] <= max_lat and min_lon <= node_lon[i] <= max_lon:
+                        found.append(i)
+                continue
+
+            # Sol alt ağaç <= split, sağ alt ağaç >= split değerlerini tutar
+            if box_low[dim] <= split_value[node]:
+                stack.append(self.left[node])
+            if box_high[dim] >= split_value[node]:
+                stack.append(self.right[node])
+
+        found.sort()
+        return found
+
+
+def _trig_range(func, low: float, high: float) -> Tuple[float, float]:
+    """sin/cos fonksiyonunun [low, high] derece aralığındaki en küçük/büyük değeri"""
+    values = [func(math.radians(low)), func(math.radians(high))]
+    # Uç değerler 90'ın katlarında olabilir
+    k = math.ceil(low / 90)
+    while k * 90 <= high:
+        values.append(func(math.radians(k * 90)))
+        k += 1
+    return min(values), max(values)
+
+
+def _interval_product(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
+    products = (a[0] * b[0], a[0] * b[1], a[1] * b[0], a[1] * b[1])
+    return min(products), max(products)
@@ -0,0 +1,32 @@
+"""
+Testler depo kökündeki modülleri doğrudan içe aktarır
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import generate_road_graph  # noqa: E402
+from dijkstra import Graph  # noqa: E402
+from simplify import simplify_graph  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def road_data():
+    """Ara noktalı sentetik yol graph'ı (ham nodes/edges)"""
+    return generate_road_graph(400, seed=7, shape_points=3)
+
+
+@pytest.fixture(scope='session')
+def road_graph(road_data):
+    return Graph(road_data['nodes'], road_data['edges'])
+
+
+@pytest.fixture(scope='session')
+def simplified_graph(road_graph):
+    """road_graph'ın ara noktaları kenar şekline taşınmış hali"""
+    data = simplify_graph(road_graph)
+    return Graph(data['nodes'], data['edges'])
@@ -0,0 +1,42 @@
+"""
+API uç noktaları (Flask test istemcisi ile)
+"""
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client(simplified_graph):
+    previous = app_module.use_graph(simplified_graph)
+    app_module.route_cache.clear()
+    yield app_module.app.test_client()
+    app_module.registry = previous
+    app_module.route_cache.clear()
+
+
+# Sadeleştirmeden sonra da kalan ve aralarında alternatif rota olan iki kavşak
+START, END = 'node_1', 'node_289'
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_dijkstra_alternatives_on_simplified_graph(client, simplified_graph, cached):
+    start, end = START, END
+    if cached:
+        # Önbellekten gelen sonuçla da indeks yolu kullanılabilmeli
+        client.post('/api/dijkstra', json={'start_node': start, 'end_node': end})
+
+    response = client.post('/api/dijkstra', json={'start_node': start, 'end_node': end,
+                                                  'alternatives': 2})
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['cached'] is cached
+    assert 'path_indices' not in body
+    # Yol ara noktaları da içerir, yani sadeleştirilmiş graph'ın düğümlerinden fazladır
+    assert any(node_id not in simplified_graph.node_index for node_id in body['path'])
+    assert body['alternatives_complete'] and body['alternatives']
+    for alternative in body['alternatives']:
+        assert alternative['path'][0] == start and alternative['path'][-1] == end
+        assert alternative['distance'] >= body['distance']
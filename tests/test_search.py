@@ -0,0 +1,78 @@
+"""
+Arama algoritmaları: hepsi Dijkstra ile aynı en kısa mesafeyi bulmalı;
+sadeleştirilmiş graph özgün graph'la aynı yolu döndürmeli
+"""
+
+import random
+
+import pytest
+
+from benchmark import generate_road_graph
+from contraction import build_hierarchy
+from dijkstra import ALGORITHMS, Graph, dijkstra, edge_slot
+from landmarks import compute_landmark_table
+from simplify import DISTANCE_TOLERANCE
+
+QUERIES = 60
+
+
+@pytest.fixture(scope='module')
+def search_graph():
+    """Hiyerarşisi ve landmark tabloları kurulmuş, tek yönlü yollu graph"""
+    data = generate_road_graph(900, seed=11)
+    graph = Graph(data['nodes'], data['edges'])
+    graph.hierarchy = build_hierarchy(graph, verbose=False)
+    graph.landmarks = compute_landmark_table(graph, workers=1)
+    return graph
+
+
+def random_pairs(graph, count, seed=1):
+    rng = random.Random(seed)
+    node_ids = graph.node_ids
+    return [(rng.choice(node_ids), rng.choice(node_ids)) for _ in range(count)]
+
+
+def path_length(graph, path):
+    return sum(graph.weights[edge_slot(graph, graph.node_index[a], graph.node_index[b])]
+               for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize('algorithm', [name for name in ALGORITHMS if name != 'dijkstra'])
+def test_algorithms_match_dijkstra(search_graph, algorithm):
+    unreachable = 0
+    for start, end in random_pairs(search_graph, QUERIES) + [(search_graph.node_ids[0],) * 2]:
+        expected = dijkstra(search_graph, start, end, 'dijkstra')
+        result = dijkstra(search_graph, start, end, algorithm)
+        if expected is None:
+            unreachable += 1
+            assert result is None
+            continue
+
+        assert result['algorithm'] == algorithm
+        # Toplama sırası farklı; 3 basamağa yuvarlanan sonuç bir basamak kayabilir
+        assert abs(result['distance'] - expected['distance']) <= DISTANCE_TOLERANCE
+        # Eşit uzunlukta farklı bir yol da kabul edilir; yol gerçek kenarlardan oluşmalı
+        assert result['path'][0] == start and result['path'][-1] == end
+        assert path_length(search_graph, result['path']) == pytest.approx(result['distance'], abs=1e-3)
+    assert unreachable < QUERIES
+
+
+def test_simplified_graph_expands_to_original_path(road_graph, simplified_graph):
+    assert simplified_graph.node_count < road_graph.node_count
+    compared = 0
+    for start, end in random_pairs(simplified_graph, QUERIES, seed=2):
+        before = dijkstra(road_graph, start, end, 'dijkstra')
+        for algorithm in ('dijkstra', 'bidirectional'):
+            after = dijkstra(simplified_graph, start, end, algorithm)
+            if before is None:
+                assert after is None
+                continue
+            compared += 1
+            assert abs(after['distance'] - before['distance']) <= DISTANCE_TOLERANCE
+            # Ara noktalar geri eklenir: yol ve koordinatlar özgün graph'takiyle aynı
+            assert after['path'] == before['path']
+            assert after['coordinates'] == before['coordinates']
+            assert after['node_count'] == before['node_count']
+            assert after['path_indices'] == [simplified_graph.node_index[node_id] for node_id in after['path']
+                                             if node_id in simplified_graph.node_index]
+    assert compared
@@ -0,0 +1,50 @@
+"""
+spatial_index: KD-tree sorguları doğrusal taramayla aynı sonucu vermeli
+"""
+
+import random
+
+import pytest
+
+from dijkstra import haversine_distance
+from spatial_index import SpatialIndex
+
+
+def linear_nearest(lat, lon, node_lat, node_lon, mask=None):
+    best, best_distance = -1, float('inf')
+    for i in range(len(node_lat)):
+        if mask is not None and not mask[i]:
+            continue
+        distance = haversine_distance(lat, lon, node_lat[i], node_lon[i])
+        if distance < best_distance:
+            best, best_distance = i, distance
+    return best
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = random.Random(3)
+    # Izgara noktaları eşit uzaklıkları (en küçük indeks kuralını) da sınar
+    node_lat = [37 + rng.random() for _ in range(1500)] + [37.5 + row * 0.01 for row in range(10) for _ in range(10)]
+    node_lon = [28 + rng.random() for _ in range(1500)] + [28.5 + col * 0.01 for _ in range(10) for col in range(10)]
+    return node_lat, node_lon
+
+
+@pytest.mark.parametrize('masked', [False, True])
+def test_nearest_many_matches_linear_scan(points, masked):
+    node_lat, node_lon = points
+    index = SpatialIndex(node_lat, node_lon)
+    rng = random.Random(5)
+    mask = [rng.random() < 0.6 for _ in node_lat] if masked else None
+
+    queries = [(36.9 + rng.random() * 1.2, 27.9 + rng.random() * 1.2) for _ in range(300)]
+    queries += [(37.505, 28.505), (node_lat[10], node_lon[10]), (node_lat[10], node_lon[10]), (40.0, 31.0)]
+
+    expected = [linear_nearest(lat, lon, node_lat, node_lon, mask) for lat, lon in queries]
+    assert index.nearest_many(queries, mask) == expected
+    assert [index.nearest(lat, lon, mask) for lat, lon in queries] == expected
+
+
+def test_nearest_many_without_candidates():
+    assert SpatialIndex([], []).nearest_many([(37.0, 28.0)]) == [-1]
+    assert SpatialIndex([37.0], [28.0]).nearest_many([(37.1, 28.1)], mask=[0]) == [-1]
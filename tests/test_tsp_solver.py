@@ -0,0 +1,37 @@
+"""
+tsp_solver: kesin ve sezgisel çözücüler
+"""
+
+import random
+import time
+
+from tsp_solver import HELD_KARP_LIMIT, held_karp, solve_path_tsp
+
+
+def random_matrix(stops, seed=1):
+    rng = random.Random(seed)
+    n = stops + 2
+    return [[0 if i == j else rng.uniform(1, 10) for j in range(n)] for i in range(n)]
+
+
+def test_solve_path_tsp_is_exact_for_few_stops():
+    matrix = random_matrix(8)
+    assert solve_path_tsp(matrix)[1] == held_karp(matrix)[1]
+
+
+def test_solve_path_tsp_honours_time_limit():
+    matrix = random_matrix(HELD_KARP_LIMIT)
+    started = time.perf_counter()
+    route, cost = solve_path_tsp(matrix, time_limit=0.1)
+    elapsed = time.perf_counter() - started
+
+    # Held-Karp yarıda kalsa da sezgisel çözümle geçerli bir rota döner
+    assert elapsed < 0.3
+    assert route[0] == 0 and route[-1] == len(matrix) - 1
+    assert sorted(route) == list(range(len(matrix)))
+
+
+def test_solve_path_tsp_without_route():
+    inf = float('inf')
+    matrix = [[0, 1, inf], [inf, 0, inf], [inf, inf, 0]]
+    assert solve_path_tsp(matrix, time_limit=0.1) == (None, inf)
@@ -0,0 +1,427 @@
+"""
+TSP Solver - Sabit başlangıç ve bitişli yol TSP'si için çözücüler
+CENG 3511 - Artificial Intelligence Final Project
+
+Tüm fonksiyonlar bir maliyet matrisi üzerinde çalışır:
+0 numaralı durak başlangıç, son durak bitiştir. Aradaki duraklar
+herhangi bir sırayla ziyaret edilebilir. Matris asimetrik olabilir
+(tek yönlü yollar) ve ulaşılamayan çiftler için float('inf') içerebilir.
+"""
+
+import random
+import time
+from typing import Iterator, List, Optional, Tuple
+
+# Bu sayıya kadar ara durak için kesin (Held-Karp) çözüm kullanılır
+HELD_KARP_LIMIT = 15
+
+# Sezgisel iyileştirme için varsayılan süre bütçesi (saniye)
+DEFAULT_TIME_LIMIT = 1.0
+
+# solve_path_tsp: süre bütçesinin Held-Karp'a ayrılan payı; yetmezse
+# kalan süre sezgisel çözücüye kalır
+HELD_KARP_TIME_SHARE = 0.5
+
+# Sezgisel aramada ulaşılamayan çiftlerin maliyeti (inf - inf = nan olmasın diye)
+UNREACHABLE_COST = 1e12
+
+# Or-opt ile taşınacak en uzun segment
+OR_OPT_MAX_SEGMENT = 3
+
+# Bozma adımları için sabit tohum (tekrarlanabilir sonuçlar)
+RANDOM_SEED = 42
+
+# Anytime çözücü: ara sonuçların en sık bildirilme aralığı (saniye)
+PROGRESS_INTERVAL = 0.1
+
+# Anytime çözücü: art arda bu kadar bozma turu iyileştirmezse yakınsamış sayılır
+CONVERGENCE_ROUNDS = 50
+
+
+def route_cost(matrix: List[List[float]], route: List[int]) -> float:
+    """Bir rotanın toplam maliyetini hesaplar"""
+    return sum(matrix[route[i]][route[i + 1]] for i in range(len(route) - 1))
+
+
+def held_karp(matrix: List[List[float]], deadline: Optional[float] = None) -> Tuple[Optional[List[int]], float]:
+    """
+    Held-Karp dinamik programlama ile kesin çözüm
+
+    Args:
+        matrix: n x n maliyet matrisi (0 = başlangıç, n-1 = bitiş)
+        deadline: time.perf_counter() sınırı (opsiyonel); aşılırsa çözüm yarıda bırakılır
+
+    Returns:
+        (rota, maliyet) - geçerli rota yoksa veya süre dolduysa (None, inf)
+    """
+    n = len(matrix)
+    inf = float('inf')
+
+    if n <= 2:
+        route = list(range(n))
+        cost = route_cost(matrix, route)
+        return (route, cost) if cost < inf else (None, inf)
+
+    end = n - 1
+    middle = n - 2
+    full = (1 << middle) - 1
+
+    # dp[mask * middle + j]: başlangıçtan çıkıp mask kümesini gezip j'de biten en kısa yol
+    # (j, 1..n-2 arası durağın 0 tabanlı karşılığıdır)
+    size = (1 << middle) * middle
+    dp = [inf] * size
+    parent = [-1] * size
+
+    for j in range(middle):
+        dp[(1 << j) * middle + j] = matrix[0][j + 1]
+
+    for mask in range(1, full + 1):
+        if deadline is not None and not mask & 1023 and time.perf_counter() > deadline:
+            return None, inf
+        base = mask * middle
+        for j in range(middle):
+            cost = dp[base + j]
+            if cost == inf or not (mask >> j) & 1:
+                continue
+            row = matrix[j + 1]
+            for k in range(middle):
+                if (mask >> k) & 1:
+                    continue
+                new_mask = mask | (1 << k)
+                new_cost = cost + row[k + 1]
+                slot = new_mask * middle + k
+                if new_cost < dp[slot]:
+                    dp[slot] = new_cost
+                    parent[slot] = j
+
+    # Son ara duraktan bitişe bağla
+    best_cost = inf
+    best_last = -1
+    base = full * middle
+    for j in range(middle):
+        cost = dp[base + j] + matrix[j + 1][end]
+        if cost < best_cost:
+            best_cost = cost
+            best_last = j
+
+    if best_last < 0:
+        return None, inf
+
+    # Rotayı geri oluştur
+    order = []
+    mask = full
+    current = best_last
+    while current >= 0:
+        order.append(current + 1)
+        previous = parent[mask * middle + current]
+        mask &= ~(1 << current)
+        current = previous
+
+    order.reverse()
+    return [0] + order + [end], best_cost
+
+
+def nearest_neighbor(matrix: List[List[float]]) -> List[int]:
+    """
+    En yakın komşu yapıcı sezgiseli
+
+    Returns:
+        Başlangıçtan bitişe bir rota
+    """
+    n = len(matrix)
+    end = n - 1
+    remaining = set(range(1, end))
+    route = [0]
+
+    current = 0
+    while remaining:
+        row = matrix[current]
+        current = min(remaining, key=lambda k: (row[k], k))
+        remaining.remove(current)
+        route.append(current)
+
+    if end > 0:
+        route.append(end)
+    return route
+
+
+def _finite_matrix(matrix: List[List[float]]) -> List[List[float]]:
+    """Sonsuz maliyetleri büyük sonlu bir değerle değiştirir"""
+    inf = float('inf')
+    return [[UNREACHABLE_COST if cost == inf else cost for cost in row] for row in matrix]
+
+
+def two_opt(matrix: List[List[float]], route: List[int], deadline: float) -> bool:
+    """
+    2-opt iyileştirmesi (asimetrik maliyetlere uygun)
+
+    Ters çevrilen bölümün iç maliyeti ileri/geri önek toplamlarıyla
+    O(1)'de hesaplanır. Rota yerinde güncellenir.
+
+    Returns:
+        Rota iyileştirildiyse True
+    """
+    improved = False
+    n = len(route)
+
+    while time.perf_counter() < deadline:
+        forward = [0.0] * n
+        backward = [0.0] * n
+        for t in range(1, n):
+            forward[t] = forward[t - 1] + matrix[route[t - 1]][route[t]]
+            backward[t] = backward[t - 1] + matrix[route[t]][route[t - 1]]
+
+        best_delta = -1e-9
+        best_move = None
+
+        # Başlangıç (0) ve bitiş (n-1) sabit kalır
+        for i in range(1, n - 2):
+            a = route[i - 1]
+            b = route[i]
+            for j in range(i + 1, n - 1):
+                c = route[j]
+                d = route[j + 1]
+                delta = (matrix[a][c] + matrix[b][d]
+                         + (backward[j] - backward[i])
+                         - matrix[a][b] - matrix[c][d]
+                         - (forward[j] - forward[i]))
+                if delta < best_delta:
+                    best_delta = delta
+                    best_move = (i, j)
+
+        if best_move is None:
+            break
+
+        i, j = best_move
+        route[i:j + 1] = reversed(route[i:j + 1])
+        improved = True
+
+    return improved
+
+
+def or_opt(matrix: List[List[float]], route: List[int], deadline: float) -> bool:
+    """
+    Or-opt iyileştirmesi: 1-3 uzunluğundaki segmentleri başka bir konuma taşır
+
+    Returns:
+        Rota iyileştirildiyse True
+    """
+    improved = False
+
+    while time.perf_counter() < deadline:
+        n = len(route)
+        moved = False
+
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            for i in range(1, n - length):
+                j = i + length - 1
+                if j >= n - 1:
+                    break
+
+                prev_node = route[i - 1]
+                first = route[i]
+                last = route[j]
+                next_node = route[j + 1]
+
+                removal_gain = (matrix[prev_node][first] + matrix[last][next_node]
+                                - matrix[prev_node][next_node])
+
+                # Segmenti (u, v) kenarının arasına yerleştir
+                for p in range(0, n - 1):
+                    if i - 1 <= p <= j:
+                        continue
+                    u = route[p]
+                    v = route[p + 1]
+                    insert_cost = matrix[u][first] + matrix[last][v] - matrix[u][v]
+                    if insert_cost - removal_gain < -1e-9:
+                        segment = route[i:j + 1]
+                        del route[i:j + 1]
+                        insert_at = p + 1 if p < i else p + 1 - length
+                        route[insert_at:insert_at] = segment
+                        moved = True
+                        break
+                if moved:
+                    break
+            if moved:
+                break
+
+        if not moved:
+            break
+        improved = True
+
+    return improved
+
+
+def heuristic_tsp(matrix: List[List[float]], time_limit: float = DEFAULT_TIME_LIMIT) -> Tuple[Optional[List[int]], float]:
+    """
+    Büyük durak sayıları için sezgisel çözüm:
+    en yakın komşu + 2-opt / Or-opt yerel arama (süre bütçesi ile)
+
+    Args:
+        matrix: n x n maliyet matrisi (0 = başlangıç, n-1 = bitiş)
+        time_limit: Yerel arama için süre bütçesi (saniye)
+
+    Returns:
+        (rota, maliyet) - geçerli rota yoksa (None, inf)
+    """
+    deadline = time.perf_counter() + time_limit
+    finite = _finite_matrix(matrix)
+
+    route = nearest_neighbor(finite)
+    _local_search(finite, route, deadline)
+    best_route = list(route)
+    best_cost = route_cost(finite, best_route)
+
+    # Kalan sürede: rastgele bozma + yerel arama (iterated local search)
+    rng = random.Random(RANDOM_SEED)
+    while len(route) > 5 and time.perf_counter() < deadline:
+        route = list(best_route)
+        _perturb(route, rng)
+        _local_search(finite, route, deadline)
+        cost = route_cost(finite, route)
+        if cost < best_cost - 1e-9:
+            best_route = route
+            best_cost = cost
+
+    cost = route_cost(matrix, best_route)
+    if cost == float('inf'):
+        return None, cost
+    return best_route, cost
+
+
+def _local_search(matrix: List[List[float]], route: List[int], deadline: float) -> bool:
+    """
+    2-opt ve Or-opt'u iyileşme kalmayana veya süre bitene kadar uygular
+
+    Returns:
+        Yerel optimuma ulaşıldıysa True (süre bittiyse False)
+    """
+    while time.perf_counter() < deadline:
+        improved = two_opt(matrix, route, deadline)
+        improved = or_opt(matrix, route, deadline) or improved
+        if not improved:
+            # Hamleler süre dolduğu için bitmiş olabilir
+            return time.perf_counter() < deadline
+    return False
+
+
+def _perturb(route: List[int], rng: random.Random):
+    """Double-bridge hamlesi: ara durakları dört parçaya bölüp yeniden dizer"""
+    middle = route[1:-1]
+    a, b, c = sorted(rng.sample(range(1, len(middle)), 3))
+    route[1:-1] = middle[:a] + middle[c:] + middle[b:c] + middle[a:b]
+
+
+def anytime_tsp(matrix: List[List[float]], time_limit: float = DEFAULT_TIME_LIMIT,
+                interval: float = PROGRESS_INTERVAL) -> Iterator[Optional[Tuple[List[int], float]]]:
+    """
+    O ana kadarki en iyi rotayı arama sürerken üreten çözücü
+
+    En yakın komşu rotası hemen üretilir; ardından yerel arama ve
+    (HELD_KARP_LIMIT'e kadar ara durakta) Held-Karp, daha fazlasında
+    bozma + yerel arama turları rotayı iyileştirir. Yerel arama interval
+    uzunluğunda dilimlerle çalışır; en iyi rota iyileştikçe en fazla
+    interval'de bir üretilir, iyileşme yoksa None (canlı tutma) üretilir.
+    Çağıran üreteci istediği an kapatarak aramayı durdurabilir.
+
+    Arama Held-Karp bitince, CONVERGENCE_ROUNDS tur boyunca iyileşme
+    olmayınca veya süre dolunca biter (son en iyi rota henüz
+    üretilmediyse önce o üretilir).
+
+    Args:
+        matrix: n x n maliyet matrisi (0 = başlangıç, n-1 = bitiş)
+        time_limit: Toplam süre bütçesi (saniye)
+        interval: İki ara sonuç arasındaki en kısa süre (saniye)
+
+    Yields:
+        (rota, maliyet) veya None; geçerli rota bulunamazsa hiç rota üretilmez
+    """
+    inf = float('inf')
+    deadline = time.perf_counter() + time_limit
+    finite = _finite_matrix(matrix)
+
+    route = nearest_neighbor(finite)
+    best_route = list(route)
+    best_cost = route_cost(finite, route)
+    reported_cost = inf
+    next_report = time.perf_counter()
+
+    def report(force: bool = False):
+        nonlocal reported_cost, next_report
+        now = time.perf_counter()
+        if not force and now < next_report:
+            return
+        next_report = now + interval
+        cost = route_cost(matrix, best_route)
+        if best_cost < reported_cost - 1e-9 and cost < inf:
+            reported_cost = best_cost
+            yield list(best_route), cost
+        elif not force:
+            yield None
+
+    def improve(candidate: List[int]):
+        nonlocal best_route, best_cost
+        cost = route_cost(finite, candidate)
+        if cost < best_cost - 1e-9:
+            best_route = list(candidate)
+            best_cost = cost
+
+    def search(candidate: List[int]):
+        """Yerel aramayı dilimler halinde çalıştırır; dilim aralarında bildirir"""
+        while True:
+            converged = _local_search(finite, candidate, min(deadline, time.perf_counter() + interval))
+            improve(candidate)
+            yield from report()
+            if converged or time.perf_counter() >= deadline:
+                return
+
+    yield from report(force=True)
+    yield from search(route)
+
+    if len(matrix) - 2 <= HELD_KARP_LIMIT:
+        # Held-Karp ara sonuç vermez; yerel aramanın sonucu önce gönderilir
+        yield from report(force=True)
+        if time.perf_counter() < deadline:
+            exact_route, exact_cost = held_karp(matrix, deadline)
+            if exact_route is not None and exact_cost < route_cost(matrix, best_route):
+                best_route = exact_route
+                best_cost = route_cost(finite, exact_route)
+        yield from report(force=True)
+        return
+
+    # Kalan sürede: rastgele bozma + yerel arama (heuristic_tsp ile aynı)
+    rng = random.Random(RANDOM_SEED)
+    stalled = 0
+    while len(route) > 5 and stalled < CONVERGENCE_ROUNDS and time.perf_counter() < deadline:
+        previous_cost = best_cost
+        route = list(best_route)
+        _perturb(route, rng)
+        yield from search(route)
+        stalled = 0 if best_cost < previous_cost else stalled + 1
+
+    yield from report(force=True)
+
+
+def solve_path_tsp(matrix: List[List[float]], time_limit: float = DEFAULT_TIME_LIMIT) -> Tuple[Optional[List[int]], float]:
+    """
+    Durak sayısına göre kesin veya sezgisel çözücüyü seçer
+
+    Held-Karp bütçenin HELD_KARP_TIME_SHARE payında bitmezse yarıda
+    bırakılır ve kalan sürede sezgisel çözücü kullanılır.
+
+    Args:
+        matrix: n x n maliyet matrisi (0 = başlangıç, n-1 = bitiş)
+        time_limit: Toplam süre bütçesi (saniye)
+
+    Returns:
+        (rota, maliyet) - geçerli rota yoksa (None, inf)
+    """
+    if len(matrix) - 2 <= HELD_KARP_LIMIT:
+        deadline = time.perf_counter() + time_limit
+        exact_deadline = deadline - time_limit * (1 - HELD_KARP_TIME_SHARE)
+        route, cost = held_karp(matrix, exact_deadline)
+        if route is not None or time.perf_counter() <= exact_deadline:
+            return route, cost
+        # Süre doldu: kalan bütçeyle sezgisel çözüm
+        time_limit = max(0.0, deadline - time.perf_counter())
+    return heuristic_tsp(matrix, time_limit)
@@ -0,0 +1,654 @@
+"""
+Vehicle Routing - Çok araçlı, kapasiteli rota optimizasyonu (CVRP)
+CENG 3511 - Artificial Intelligence Final Project
+
+Tek araçlı TSP (tsp_solver) birkaç düzine durakla sınırlıdır; burada
+50-500 durak ve birden fazla araç için sezgisel bir çözücü vardır.
+Tüm duraklar arası mesafeler bir kez hesaplanır (CH yüklüyse bucket
+tablosu, değilse paralel one-to-many aramalar), çözücü sonra yalnızca
+bu matris üzerinde çalışır:
+    - Kuruluş: Clarke-Wright tasarruf (savings) birleştirmeleri; rotalar
+      araçlara büyükten küçüğe yerleştirilir, sığmayan duraklar en ucuz
+      konuma eklenir
+    - Yerel arama: rota içi 2-opt / Or-opt, rotalar arası relocate
+      (durak taşıma) ve exchange (durak takası); kapasite her hamlede korunur
+    - Kalan sürede: birbirine yakın durakları sök, en ucuz konumlara
+      yeniden ekle, yerel arama uygula (ruin & recreate); sadece daha iyi
+      çözüm kabul edilir
+
+Birkaç çekirdekte (en fazla MAX_PARALLEL_RESTARTS) farklı tohumla
+bağımsız bir çözüm aranır, en iyisi seçilir. Matriste 0 numaralı durak depodur; amaç önce atanamayan durak
+sayısını, sonra toplam mesafeyi en aza indirmektir.
+"""
+
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+import metrics
+from dijkstra import Graph, build_path_result
+import distance_matrix
+from distance_matrix import iter_source_rows, shared_graph_executor
+from route_cache import MISSING
+from tsp_solver import RANDOM_SEED, UNREACHABLE_COST, or_opt, two_opt
+
+# Çözücü için varsayılan ve en fazla süre bütçesi (saniye)
+DEFAULT_TIME_LIMIT = 2.0
+MAX_TIME_LIMIT = 30.0
+
+# Tek istekte en fazla durak ve araç sayısı
+MAX_STOPS = 1000
+MAX_VEHICLES = 100
+
+# Bu sayıdan az durak için paralel yeniden başlatma yapılmaz
+MIN_PARALLEL_STOPS = 20
+
+# İstek başına en fazla paralel yeniden başlatma; her biri süre bütçesi
+# boyunca bir çekirdeği tutar
+MAX_PARALLEL_RESTARTS = 4
+
+# Yeniden başlatmalarda tasarruf değerlerine eklenen rastgele oran
+SAVINGS_NOISE = 0.2
+
+# Her bozma adımında sökülen durak sayısı: durakların bu oranı, sınırlar içinde
+RUIN_FRACTION = 0.1
+RUIN_MIN = 2
+RUIN_MAX = 30
+
+# Paralel worker'ların paylaştığı problem (fork ile kopyalanmadan devralınır)
+_worker_problem = None
+
+
+def tour_cost(matrix: List[List[float]], route: List[int]) -> float:
+    """Depodan çıkıp duraklardan geçerek depoya dönen turun maliyeti"""
+    if not route:
+        return 0.0
+    cost = matrix[0][route[0]] + matrix[route[-1]][0]
+    for i in range(len(route) - 1):
+        cost += matrix[route[i]][route[i + 1]]
+    return cost
+
+
+class _Solution:
+    """Araç başına durak listeleri (depo hariç), yükler ve atanamayan duraklar"""
+
+    def __init__(self, matrix: List[List[float]], demands: List[float], capacities: List[float]):
+        self.matrix = matrix
+        self.demands = demands
+        self.capacities = capacities
+        self.routes = [[] for _ in capacities]
+        self.loads = [0] * len(capacities)
+        self.route_of = [-1] * len(matrix)
+        self.unassigned = []
+
+    def copy(self) -> '_Solution':
+        other = _Solution.__new__(_Solution)
+        other.matrix = self.matrix
+        other.demands = self.demands
+        other.capacities = self.capacities
+        other.routes = [list(route) for route in self.routes]
+        other.loads = list(self.loads)
+        other.route_of = list(self.route_of)
+        other.unassigned = list(self.unassigned)
+        return other
+
+    def cost(self) -> float:
+        return sum(tour_cost(self.matrix, route) for route in self.routes)
+
+    def better_than(self, other: '_Solution') -> bool:
+        if len(self.unassigned) != len(other.unassigned):
+            return len(self.unassigned) < len(other.unassigned)
+        return self.cost() < other.cost() - 1e-9
+
+    def insert(self, stop: int, r: int, position: int):
+        self.routes[r].insert(position, stop)
+        self.loads[r] += self.demands[stop]
+        self.route_of[stop] = r
+
+    def remove(self, stop: int) -> int:
+        r = self.route_of[stop]
+        self.routes[r].remove(stop)
+        self.loads[r] -= self.demands[stop]
+        self.route_of[stop] = -1
+        return r
+
+
+def savings_construction(matrix: List[List[float]], demands: List[float], capacities: List[float],
+                         rng: Optional[random.Random] = None) -> _Solution:
+    """
+    Clarke-Wright tasarruf algoritması (asimetrik maliyetlere uygun)
+
+    i ile biten rota j ile başlayan rotaya, tasarruf
+    c(i,0) + c(0,j) - c(i,j) büyükten küçüğe olacak şekilde eklenir;
+    birleşik yük en büyük araç kapasitesini aşamaz. rng verilirse
+    tasarruflar rastgele ölçeklenir (farklı yeniden başlatmalar için).
+    """
+    solution = _Solution(matrix, demands, capacities)
+    limit = max(capacities)
+
+    routes = {}
+    loads = {}
+    owner = {}
+    for stop in range(1, len(matrix)):
+        if demands[stop] <= limit:
+            routes[stop] = [stop]
+            loads[stop] = demands[stop]
+            owner[stop] = stop
+        else:
+            solution.unassigned.append(stop)
+
+    savings = []
+    for i in routes:
+        back = matrix[i][0]
+        row = matrix[i]
+        for j in routes:
+            if i != j:
+                saving = back + matrix[0][j] - row[j]
+                if saving > 0:
+                    if rng is not None:
+                        saving *= 1 + SAVINGS_NOISE * rng.random()
+                    savings.append((saving, i, j))
+    savings.sort(reverse=True)
+
+    for _, i, j in savings:
+        a = owner[i]
+        b = owner[j]
+        if a == b or routes[a][-1] != i or routes[b][0] != j:
+            continue
+        if loads[a] + loads[b] > limit:
+            continue
+        # Kısa rota uzun olana katılır (sahiplik güncellemesi kısa rotada yapılır)
+        if len(routes[a]) >= len(routes[b]):
+            routes[a].extend(routes[b])
+            keep, drop = a, b
+        else:
+            routes[b][0:0] = routes[a]
+            keep, drop = b, a
+        for stop in routes[drop]:
+            owner[stop] = keep
+        loads[keep] += loads[drop]
+        del routes[drop]
+        del loads[drop]
+
+    # Büyük yüklü rotalar önce, sığdıkları en küçük boş araca
+    free = sorted(range(len(capacities)), key=lambda r: capacities[r])
+    leftover = []
+    for key in sorted(routes, key=lambda key: -loads[key]):
+        vehicle = next((r for r in free if capacities[r] >= loads[key]), None)
+        if vehicle is None:
+            leftover.extend(routes[key])
+            continue
+        free.remove(vehicle)
+        for position, stop in enumerate(routes[key]):
+            solution.insert(stop, vehicle, position)
+
+    _recreate(solution, leftover, rng)
+    return solution
+
+
+def _best_insertion(solution: _Solution, stop: int) -> Optional[Tuple[int, int]]:
+    """Kapasiteye sığan en ucuz (rota, konum); yoksa None"""
+    matrix = solution.matrix
+    demand = solution.demands[stop]
+    to_stop = [row[stop] for row in matrix]
+    from_stop = matrix[stop]
+    best_delta = float('inf')
+    best = None
+
+    for r, route in enumerate(solution.routes):
+        if solution.loads[r] + demand > solution.capacities[r]:
+            continue
+        previous = 0
+        for position in range(len(route) + 1):
+            following = route[position] if position < len(route) else 0
+            delta = to_stop[previous] + from_stop[following] - matrix[previous][following]
+            if delta < best_delta:
+                best_delta = delta
+                best = (r, position)
+            previous = following
+
+    return best
+
+
+def _recreate(solution: _Solution, stops: List[int], rng: Optional[random.Random]) -> Set[int]:
+    """
+    Durakları en ucuz konumlarına ekler (büyük talepliler önce)
+
+    Returns:
+        Değişen rotalar
+    """
+    stops = list(stops)
+    if rng is not None:
+        rng.shuffle(stops)
+    stops.sort(key=lambda stop: -solution.demands[stop])
+
+    changed = set()
+    for stop in stops:
+        best = _best_insertion(solution, stop)
+        if best is None:
+            if stop not in solution.unassigned:
+                solution.unassigned.append(stop)
+            continue
+        if stop in solution.unassigned:
+            solution.unassigned.remove(stop)
+        solution.insert(stop, *best)
+        changed.add(best[0])
+    return changed
+
+
+def _ruin(solution: _Solution, rng: random.Random) -> Tuple[List[int], Set[int]]:
+    """
+    Rastgele bir durak ve ona en yakın durakları rotalarından söker
+
+    Returns:
+        (sökülen duraklar, değişen rotalar)
+    """
+    matrix = solution.matrix
+    assigned = [stop for stop in range(1, len(matrix)) if solution.route_of[stop] >= 0]
+    count = min(len(assigned), max(RUIN_MIN, min(RUIN_MAX, int(len(assigned) * RUIN_FRACTION))))
+    seed = rng.choice(assigned)
+    nearest = sorted(assigned, key=lambda stop: matrix[seed][stop] + matrix[stop][seed])[:count]
+
+    changed = set()
+    for stop in nearest:
+        changed.add(solution.remove(stop))
+    return nearest, changed
+
+
+def _improve_route(solution: _Solution, r: int, deadline: float) -> bool:
+    """Rota içi 2-opt ve Or-opt (depo iki uçta sabit)"""
+    route = solution.routes[r]
+    if len(route) < 3:
+        return False
+    tour = [0] + route + [0]
+    improved = False
+    while time.perf_counter() < deadline:
+        changed = two_opt(solution.matrix, tour, deadline)
+        changed = or_opt(solution.matrix, tour, deadline) or changed
+        if not changed:
+            break
+        improved = True
+    if improved:
+        route[:] = tour[1:-1]
+    return improved
+
+
+def _relocate(solution: _Solution, active: Set[int], deadline: float) -> Set[int]:
+    """
+    Rotalar arası taşıma: her durak başka bir rotadaki en iyi konuma taşınır
+
+    Returns:
+        Değişen rotalar
+    """
+    matrix = solution.matrix
+    routes = solution.routes
+    changed = set()
+
+    for source_route in range(len(routes)):
+        for stop in list(routes[source_route]):
+            if time.perf_counter() > deadline:
+                return changed
+            r = solution.route_of[stop]
+            route = routes[r]
+            i = route.index(stop)
+            previous = route[i - 1] if i > 0 else 0
+            following = route[i + 1] if i + 1 < len(route) else 0
+            gain = matrix[previous][stop] + matrix[stop][following] - matrix[previous][following]
+
+            demand = solution.demands[stop]
+            to_stop = [row[stop] for row in matrix]
+            from_stop = matrix[stop]
+            best_delta = -1e-9
+            best = None
+            for t, other in enumerate(routes):
+                if t == r or (r not in active and t not in active):
+                    continue
+                if solution.loads[t] + demand > solution.capacities[t]:
+                    continue
+                before = 0
+                for position in range(len(other) + 1):
+                    after = other[position] if position < len(other) else 0
+                    delta = to_stop[before] + from_stop[after] - matrix[before][after] - gain
+                    if delta < best_delta:
+                        best_delta = delta
+                        best = (t, position)
+                    before = after
+
+            if best is not None:
+                solution.remove(stop)
+                solution.insert(stop, *best)
+                changed.add(r)
+                changed.add(best[0])
+
+    return changed
+
+
+def _exchange(solution: _Solution, active: Set[int], deadline: float) -> Set[int]:
+    """
+    Rotalar arası takas: iki farklı rotadaki duraklar yer değiştirir
+
+    Returns:
+        Değişen rotalar
+    """
+    matrix = solution.matrix
+    demands = solution.demands
+    routes = solution.routes
+    loads = solution.loads
+    capacities = solution.capacities
+    changed = set()
+
+    for a in range(len(routes)):
+        for b in range(a + 1, len(routes)):
+            if a not in active and b not in active:
+                continue
+            first = routes[a]
+            second = routes[b]
+            for i in range(len(first)):
+                if time.perf_counter() > deadline:
+                    return changed
+                x = first[i]
+                px = first[i - 1] if i > 0 else 0
+                nx = first[i + 1] if i + 1 < len(first) else 0
+                x_cost = matrix[px][x] + matrix[x][nx]
+                for j in range(len(second)):
+                    y = second[j]
+                    balance = demands[y] - demands[x]
+                    if loads[a] + balance > capacities[a] or loads[b] - balance > capacities[b]:
+                        continue
+                    py = second[j - 1] if j > 0 else 0
+                    ny = second[j + 1] if j + 1 < len(second) else 0
+                    delta = (matrix[px][y] + matrix[y][nx] + matrix[py][x] + matrix[x][ny]
+                             - x_cost - matrix[py][y] - matrix[y][ny])
+                    if delta < -1e-9:
+                        first[i] = y
+                        second[j] = x
+                        loads[a] += balance
+                        loads[b] -= balance
+                        solution.route_of[x] = b
+                        solution.route_of[y] = a
+                        changed.add(a)
+                        changed.add(b)
+                        # Takastan sonra bu konumdaki yeni durakla devam edilir
+                        x = y
+                        x_cost = matrix[px][x] + matrix[x][nx]
+
+    return changed
+
+
+def _local_search(solution: _Solution, deadline: float, active: Optional[Set[int]] = None):
+    """
+    Hamleleri iyileşme kalmayana veya süre bitene kadar uygular
+
+    Sadece bir önceki turda değişen (active) rotaları içeren hamleler denenir.
+    """
+    if active is None:
+        active = set(range(len(solution.routes)))
+
+    while active and time.perf_counter() < deadline:
+        changed = {r for r in active if _improve_route(solution, r, deadline)}
+        changed |= _relocate(solution, active, deadline)
+        changed |= _exchange(solution, active, deadline)
+        active = changed
+
+
+def _solve(matrix: List[List[float]], demands: List[float], capacities: List[float],
+           deadline: float, seed: int) -> _Solution:
+    """Tek bir yeniden başlatma: kuruluş + yerel arama + ruin & recreate"""
+    rng = random.Random(seed)
+    # İlk tohum tasarrufları bozmadan kullanır
+    best = savings_construction(matrix, demands, capacities, None if seed == RANDOM_SEED else rng)
+    _local_search(best, deadline)
+
+    while len(matrix) - 1 > RUIN_MIN and time.perf_counter() < deadline:
+        candidate = best.copy()
+        removed, changed = _ruin(candidate, rng)
+        changed |= _recreate(candidate, removed + candidate.unassigned, rng)
+        _local_search(candidate, deadline, changed)
+        if candidate.better_than(best):
+            best = candidate
+
+    return best
+
+
+def _init_worker(problem: Tuple):
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _worker_solve(seed: int, time_limit: float,
+                  problem: Optional[Tuple] = None) -> Tuple[List[List[int]], List[int]]:
+    # Paylaşılan havuzda problem argüman olarak gelir, kendi havuzunda devralınır
+    matrix, demands, capacities = problem or _worker_problem
+    solution = _solve(matrix, demands, capacities, time.perf_counter() + time_limit, seed)
+    return solution.routes, solution.unassigned
+
+
+def solve_vrp(matrix: List[List[float]], demands: List[float], capacities: List[Optional[float]],
+              time_limit: float = DEFAULT_TIME_LIMIT, workers: Optional[int] = None,
+              executor: Optional[ProcessPoolExecutor] = None) -> Tuple[List[List[int]], List[int], float]:
+    """
+    Kapasiteli araç rotalama problemini sezgisel olarak çözer
+
+    Args:
+        matrix: n x n maliyet matrisi (0 = depo); asimetrik olabilir,
+                ulaşılamayan çiftler float('inf') olabilir
+        demands: Durak talepleri (demands[0] kullanılmaz)
+        capacities: Araç kapasiteleri (None = sınırsız)
+        time_limit: Her yeniden başlatmanın süre bütçesi (saniye)
+        workers: İşlem sayısı (None = distance_matrix.PARALLEL_WORKERS); yeniden
+                 başlatmalar MAX_PARALLEL_RESTARTS ile sınırlıdır
+        executor: Kullanılacak işlem havuzu (verilmezse gerektiğinde geçici açılır)
+
+    Returns:
+        (araç başına durak sırası (depo hariç), atanamayan duraklar, toplam maliyet)
+    """
+    inf = float('inf')
+    finite = [[UNREACHABLE_COST if cost == inf else cost for cost in row] for row in matrix]
+    demands = [0] + list(demands[1:])
+    capacities = [inf if capacity is None else capacity for capacity in capacities]
+
+    if workers is None:
+        workers = distance_matrix.PARALLEL_WORKERS
+    restarts = min(workers, MAX_PARALLEL_RESTARTS)
+
+    if restarts <= 1 or len(matrix) - 1 < MIN_PARALLEL_STOPS:
+        solution = _solve(finite, demands, capacities, time.perf_counter() + time_limit, RANDOM_SEED)
+        results = [(solution.routes, solution.unassigned)]
+    elif executor is not None:
+        problem = (finite, demands, capacities)
+        futures = [executor.submit(_worker_solve, RANDOM_SEED + k, time_limit, problem)
+                   for k in range(restarts)]
+        try:
+            results = [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+    else:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+        executor = ProcessPoolExecutor(max_workers=restarts, mp_context=context,
+                                       initializer=_init_worker,
+                                       initargs=((finite, demands, capacities),))
+        try:
+            futures = [executor.submit(_worker_solve, RANDOM_SEED + k, time_limit)
+                       for k in range(restarts)]
+            results = [future.result() for future in futures]
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def key(result):
+        routes, unassigned = result
+        return len(unassigned), sum(tour_cost(finite, route) for route in routes)
+
+    routes, unassigned = min(results, key=key)
+    cost = sum(tour_cost(matrix, route) for route in routes)
+    return routes, sorted(unassigned), cost
+
+
+def stop_distance_table(graph: Graph, indices: List[int],
+                        workers: Optional[int] = None) -> List[List[float]]:
+    """
+    Farklı duraklar arası tam mesafe tablosu (ulaşılamazsa inf)
+
+    CH yüklüyse bucket tablosu, değilse her durak için bir one-to-many
+    arama (CPU çekirdeklerine dağıtılır) kullanılır.
+    """
+    if graph.hierarchy is not None:
+        return graph.hierarchy.distance_table(indices, indices)
+
+    inf = float('inf')
+    rows = dict(iter_source_rows(graph, {source: indices for source in indices}, False, workers))
+    return [[inf if distance is None else distance for distance in rows[source]['distances']]
+            for source in indices]
+
+
+def _leg_segments(graph: Graph, legs: List[Tuple[str, str]], cache=None,
+                  workers: Optional[int] = None) -> Dict[Tuple[str, str], Optional[Dict]]:
+    """Durak çiftleri arasındaki yolları açar (find_optimal_route_tsp ile aynı önbellek anahtarları)"""
+    version = graph.version
+    node_index = graph.node_index
+    segments = {}
+    missing = []
+    for leg in legs:
+        segment = MISSING if cache is None else cache.get('route', version, leg)
+        if segment is MISSING:
+            missing.append(leg)
+        else:
+            segments[leg] = segment
+
+    if graph.hierarchy is not None:
+        for a, b in missing:
+            path_indices, distance = graph.hierarchy.query(node_index[a], node_index[b])
+            segments[(a, b)] = None if path_indices is None else build_path_result(graph, path_indices, distance)
+    elif missing:
+        # Aynı duraktan çıkan parçalar tek bir aramayı paylaşır
+        groups = {}
+        for a, b in missing:
+            groups.setdefault(node_index[a], []).append(node_index[b])
+        node_ids = graph.node_ids
+        for source, row in iter_source_rows(graph, groups, True, workers):
+            for target, segment in zip(groups[source], row['paths']):
+                segments[(node_ids[source], node_ids[target])] = segment
+
+    if cache is not None:
+        for leg in missing:
+            cache.put('route', version, leg, segments[leg])
+    return segments
+
+
+def find_vehicle_routes(graph: Graph, depot: str, stops: List[str], demands: List[float],
+                        capacities: List[Optional[float]], time_limit: float = DEFAULT_TIME_LIMIT,
+                        round_trip: bool = True, cache=None,
+                        workers: Optional[int] = None) -> Dict:
+    """
+    Depodan çıkan araçlar için durakları paylaştırır ve sıralar
+
+    Args:
+        graph: Graph objesi
+        depot: Depo düğüm ID'si
+        stops: Durak düğüm ID'leri (aynı düğüm birden fazla kez olabilir)
+        demands: Durak başına talep
+        capacities: Araç başına kapasite (None = sınırsız)
+        time_limit: Çözücü süre bütçesi (saniye, mesafe tablosu hariç)
+        round_trip: False ise araçlar son durakta biter (depoya dönüş yok)
+        cache: route_cache.RouteCache (opsiyonel, yol parçaları için)
+        workers: İşlem sayısı (None = distance_matrix.PARALLEL_WORKERS)
+
+    Returns:
+        {
+            'routes': [{'vehicle', 'capacity', 'load', 'stops': [durak sırası],
+                        'optimal_order': [depo, node_id, ..., depo],
+                        'total_distance', 'segments', 'coordinates'}, ...],  # araç başına
+            'total_distance': float,
+            'unassigned': [durak sırası, ...],   # kapasiteye sığmayan duraklar
+            'unreachable': [durak sırası, ...]   # depodan ulaşılamayan duraklar
+        }
+
+    Raises:
+        ValueError: Bilinmeyen düğüm
+    """
+    for node_id in [depot] + list(stops):
+        if not graph.node_exists(node_id):
+            raise ValueError(f"Düğüm bulunamadı: {node_id}")
+
+    print(f"🚚 VRP: {len(stops)} durak, {len(capacities)} araç")
+    inf = float('inf')
+
+    unique = list(dict.fromkeys([depot] + list(stops)))
+    column = {node_id: k for k, node_id in enumerate(unique)}
+    with metrics.phase('search'):
+        table = stop_distance_table(graph, [graph.node_index[node_id] for node_id in unique], workers)
+
+    home = column[depot]
+    reachable = []
+    unreachable = []
+    for position, stop in enumerate(stops):
+        c = column[stop]
+        if table[home][c] == inf or (round_trip and table[c][home] == inf):
+            unreachable.append(position)
+        else:
+            reachable.append(position)
+
+    columns = [home] + [column[stops[position]] for position in reachable]
+    matrix = [[round(table[a][b], 3) for b in columns] for a in columns]
+    if not round_trip:
+        # Depoya dönüş ücretsiz: rota son durakta biter
+        for row in matrix:
+            row[0] = 0.0
+
+    # Yeniden başlatmalar process'in paylaşılan havuzunda çalışır (istek başına fork yok)
+    if workers is None:
+        workers = distance_matrix.PARALLEL_WORKERS
+    executor = None
+    if workers > 1 and len(reachable) >= MIN_PARALLEL_STOPS:
+        executor = shared_graph_executor(graph, workers)
+
+    with metrics.phase('vrp_order'):
+        routes, unassigned, total = solve_vrp(matrix, [0] + [demands[p] for p in reachable],
+                                              capacities, time_limit, workers, executor)
+
+    orders = []
+    for route in routes:
+        order = [depot] + [stops[reachable[k - 1]] for k in route]
+        if round_trip and route:
+            order.append(depot)
+        orders.append(order)
+
+    with metrics.phase('reconstruct'):
+        legs = list(dict.fromkeys((order[i], order[i + 1])
+                                  for order in orders for i in range(len(order) - 1)))
+        segments = _leg_segments(graph, legs, cache, workers)
+
+    vehicles = []
+    for vehicle, (route, order) in enumerate(zip(routes, orders)):
+        route_segments = [segments[(order[i], order[i + 1])] for i in range(len(order) - 1)]
+        coordinates = []
+        for segment in route_segments:
+            if segment is not None:
+                coordinates.extend(segment['coordinates'])
+        vehicles.append({
+            'vehicle': vehicle,
+            'capacity': capacities[vehicle],
+            'load': sum(demands[reachable[k - 1]] for k in route),
+            'stops': [reachable[k - 1] for k in route],
+            'optimal_order': order,
+            'total_distance': round(tour_cost(matrix, route), 3),
+            'segments': route_segments,
+            'coordinates': coordinates
+        })
+
+    unassigned = [reachable[k - 1] for k in unassigned]
+    used = sum(1 for route in routes if route)
+    print(f"✅ VRP: {used} araç, toplam {total:.3f} km, "
+          f"{len(unassigned)} atanamayan, {len(unreachable)} ulaşılamayan durak")
+
+    return {
+        'routes': vehicles,
+        'total_distance': round(total, 3),
+        'unassigned': unassigned,
+        'unreachable': unreachable
+    }